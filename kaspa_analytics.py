@@ -0,0 +1,292 @@
+"""Analytics engines for Kaspa Analytics Pro.
+
+Pure NumPy/pandas so results can be cached per data version by the app and
+reused by anything else reading the price store.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Power law
+KASPA_GENESIS = pd.Timestamp('2021-11-07')
+NS_PER_DAY = 86_400 * 10**9
+
+def days_since_genesis(timestamps):
+    """Fractional days since the Kaspa genesis block for datetime-like values"""
+    values = np.asarray(pd.to_datetime(timestamps).astype('datetime64[ns]')).view('int64')
+    return (values - KASPA_GENESIS.value) / NS_PER_DAY
+
+def _log_xy(timestamps, prices):
+    days = days_since_genesis(timestamps)
+    prices = np.asarray(prices, dtype=np.float64)
+    valid = (days > 0) & (prices > 0)
+    return np.log10(days[valid]), np.log10(prices[valid])
+
+class PowerLawFit:
+    """Least-squares fit of log10(price) = intercept + slope * log10(days since genesis).
+
+    Only running sums are kept, so appending rows costs O(new rows) and the
+    fit never has to revisit older history.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.sx = self.sy = self.sxx = self.sxy = self.syy = 0.0
+
+    def update(self, timestamps, prices):
+        """Fold new observations into the fit; returns self"""
+        x, y = _log_xy(timestamps, prices)
+        self.n += len(x)
+        self.sx += x.sum()
+        self.sy += y.sum()
+        self.sxx += (x * x).sum()
+        self.sxy += (x * y).sum()
+        self.syy += (y * y).sum()
+        return self
+
+    def copy(self):
+        fit = PowerLawFit()
+        fit.__dict__.update(self.__dict__)
+        return fit
+
+    @property
+    def is_ready(self):
+        return self.n >= 2 and self.n * self.sxx - self.sx ** 2 > 0
+
+    @property
+    def slope(self):
+        return (self.n * self.sxy - self.sx * self.sy) / (self.n * self.sxx - self.sx ** 2)
+
+    @property
+    def intercept(self):
+        return (self.sy - self.slope * self.sx) / self.n
+
+    @property
+    def residual_std(self):
+        """Standard deviation of log10 residuals"""
+        sse = self.syy - self.intercept * self.sy - self.slope * self.sxy
+        return float(np.sqrt(max(sse, 0.0) / max(self.n - 2, 1)))
+
+    @property
+    def r_squared(self):
+        total = self.syy - self.sy ** 2 / self.n
+        sse = self.syy - self.intercept * self.sy - self.slope * self.sxy
+        return float(1 - sse / total) if total > 0 else 0.0
+
+    def predict(self, timestamps):
+        """Trend price at each timestamp"""
+        return 10 ** (self.intercept + self.slope * np.log10(days_since_genesis(timestamps)))
+
+    def bands(self, timestamps, sigmas=(1, 2)):
+        """Trend plus residual bands: {'trend': ..., '+1σ': ..., '-1σ': ..., ...}"""
+        log_trend = self.intercept + self.slope * np.log10(days_since_genesis(timestamps))
+        bands = {'trend': 10 ** log_trend}
+        for sigma in sigmas:
+            bands[f'+{sigma}σ'] = 10 ** (log_trend + sigma * self.residual_std)
+            bands[f'-{sigma}σ'] = 10 ** (log_trend - sigma * self.residual_std)
+        return bands
+
+    def deviation_pct(self, timestamps, prices):
+        """Percent distance of price from trend (positive = above trend)"""
+        return (np.asarray(prices, dtype=np.float64) / self.predict(timestamps) - 1) * 100
+
+class IncrementalPowerLaw:
+    """Keeps a PowerLawFit in step with an append-only price history"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.fit = PowerLawFit()
+        self.rows = 0
+        self.first_timestamp = None
+
+    def sync(self, df):
+        """Fold in rows appended since the last sync and return a snapshot of the fit.
+
+        If the history shrank or its first row changed, it was rewritten and
+        the fit starts over.
+        """
+        with self._lock:
+            first = df['timestamp'].iloc[0] if len(df) else None
+            if len(df) < self.rows or (self.rows and first != self.first_timestamp):
+                self._reset()
+
+            new_rows = df.iloc[self.rows:]
+            self.fit.update(new_rows['timestamp'], new_rows['price'])
+            self.rows = len(df)
+            self.first_timestamp = first
+            return self.fit.copy()
+
+def rolling_power_law(timestamps, prices, window):
+    """Slope, intercept and R² of the power law re-fit over each trailing `window` rows.
+
+    Computed from cumulative sums in one pass; the first window - 1 entries are NaN.
+    """
+    days = days_since_genesis(timestamps)
+    prices = np.asarray(prices, dtype=np.float64)
+    valid = (days > 0) & (prices > 0)
+    x = np.where(valid, np.log10(np.where(valid, days, 1)), 0.0)
+    y = np.where(valid, np.log10(np.where(valid, prices, 1)), 0.0)
+
+    def window_sum(values):
+        csum = np.concatenate(([0.0], np.cumsum(values)))
+        out = np.full(len(values), np.nan)
+        out[window - 1:] = csum[window:] - csum[:-window]
+        return out
+
+    n = window_sum(valid.astype(np.float64))
+    sx, sy = window_sum(x), window_sum(y)
+    sxx, sxy, syy = window_sum(x * x), window_sum(x * y), window_sum(y * y)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        denom = n * sxx - sx ** 2
+        slope = (n * sxy - sx * sy) / denom
+        intercept = (sy - slope * sx) / n
+        sse = syy - intercept * sy - slope * sxy
+        total = syy - sy ** 2 / n
+        r_squared = 1 - sse / total
+
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        'slope': slope,
+        'intercept': intercept,
+        'r_squared': r_squared,
+    })
+
+# Technical indicators
+INDICATORS = {}
+
+def register_indicator(name):
+    """Decorator adding `fn(ctx, **params)` to the indicator registry.
+
+    Indicators receive the shared IndicatorContext, so custom ones can reuse
+    the same EMAs, rolling windows and diffs as the built-ins.
+    """
+    def decorator(fn):
+        INDICATORS[name] = fn
+        return fn
+    return decorator
+
+class IndicatorContext:
+    """Close (and optional volume) series plus memoized intermediates for one data version.
+
+    Every intermediate (diff, EMA, rolling mean/std/min/max) and every
+    indicator result is computed at most once per parameter set.
+    """
+
+    def __init__(self, close, volume=None):
+        self.close = pd.Series(np.asarray(close, dtype=np.float64))
+        self.volume = None if volume is None else pd.Series(np.asarray(volume, dtype=np.float64))
+        self._memo = {}
+        self._lock = threading.RLock()
+
+    def memo(self, key, compute):
+        with self._lock:
+            if key not in self._memo:
+                self._memo[key] = compute()
+            return self._memo[key]
+
+    def diff(self):
+        return self.memo(('diff',), lambda: self.close.diff())
+
+    def ema(self, span, series='close'):
+        return self.memo(('ema', span, series),
+                         lambda: getattr(self, series).ewm(span=span, adjust=False).mean())
+
+    def wilder(self, key, values, period):
+        """Wilder smoothing (RMA) of an intermediate series"""
+        return self.memo(('wilder', key, period), lambda: values.ewm(alpha=1 / period, adjust=False).mean())
+
+    def rolling(self, window, stat):
+        return self.memo(('rolling', window, stat), lambda: getattr(self.close.rolling(window), stat)())
+
+    def indicator(self, name, **params):
+        """Result of a registered indicator, memoized per parameter set"""
+        if name not in INDICATORS:
+            raise KeyError(f"Unknown indicator: {name}")
+        key = ('indicator', name, tuple(sorted(params.items())))
+        return self.memo(key, lambda: INDICATORS[name](self, **params))
+
+@register_indicator('sma')
+def indicator_sma(ctx, window=20):
+    return ctx.rolling(window, 'mean')
+
+@register_indicator('ema')
+def indicator_ema(ctx, span=20):
+    return ctx.ema(span)
+
+@register_indicator('rsi')
+def indicator_rsi(ctx, period=14):
+    change = ctx.diff()
+    avg_gain = ctx.wilder('gain', change.clip(lower=0), period)
+    avg_loss = ctx.wilder('loss', -change.clip(upper=0), period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    return rsi.where(avg_loss > 0, 100.0)
+
+@register_indicator('macd')
+def indicator_macd(ctx, fast=12, slow=26, signal=9):
+    macd = ctx.ema(fast) - ctx.ema(slow)
+    signal_line = macd.ewm(span=signal, adjust=False).mean()
+    return pd.DataFrame({'macd': macd, 'signal': signal_line, 'histogram': macd - signal_line})
+
+@register_indicator('bollinger')
+def indicator_bollinger(ctx, window=20, num_std=2):
+    middle = ctx.rolling(window, 'mean')
+    std = ctx.rolling(window, 'std')
+    return pd.DataFrame({'middle': middle, 'upper': middle + num_std * std, 'lower': middle - num_std * std})
+
+@register_indicator('atr')
+def indicator_atr(ctx, period=14):
+    # Close-only history, so the true range is the absolute close-to-close move
+    return ctx.wilder('true_range', ctx.diff().abs(), period)
+
+@register_indicator('support_resistance')
+def indicator_support_resistance(ctx, window=5, lookback=90):
+    """Nearest pivot low below and pivot high above the latest close"""
+    close = ctx.close
+    span = 2 * window + 1
+    pivot_lows = close[close == close.rolling(span, center=True).min()]
+    pivot_highs = close[close == close.rolling(span, center=True).max()]
+
+    recent_start = len(close) - lookback
+    last = close.iloc[-1]
+    supports = pivot_lows[(pivot_lows.index >= recent_start) & (pivot_lows < last)]
+    resistances = pivot_highs[(pivot_highs.index >= recent_start) & (pivot_highs > last)]
+    recent = close.iloc[max(recent_start, 0):]
+
+    return {
+        'support': float(supports.max()) if len(supports) else float(recent.min()),
+        'resistance': float(resistances.min()) if len(resistances) else float(recent.max()),
+    }
+
+def technical_summary(ctx):
+    """Latest RSI, MACD state and pivot support/resistance for the overview"""
+    rsi = float(ctx.indicator('rsi').iloc[-1])
+    macd = ctx.indicator('macd')
+    histogram = macd['histogram'].to_numpy()
+    levels = ctx.indicator('support_resistance')
+
+    if rsi >= 70:
+        rsi_label = 'Overbought'
+    elif rsi <= 30:
+        rsi_label = 'Oversold'
+    else:
+        rsi_label = 'Neutral'
+
+    # A sign change in the last few bars counts as a fresh crossover
+    bullish = histogram[-1] > 0
+    crossed = len(histogram) > 3 and np.any(np.sign(histogram[-4:-1]) != np.sign(histogram[-1]))
+    macd_label = ('Bullish' if bullish else 'Bearish') + (' crossover' if crossed else '')
+
+    return {
+        'rsi': rsi,
+        'rsi_label': rsi_label,
+        'macd': float(macd['macd'].iloc[-1]),
+        'macd_label': macd_label,
+        'support': levels['support'],
+        'resistance': levels['resistance'],
+    }
@@ -0,0 +1,370 @@
+"""Headless JSON API for Kaspa Analytics Pro.
+
+A plain ASGI app serving price history, power-law fits and indicators from
+the same price store and analytics engines as the Streamlit app, for pro
+clients that should not pay for a Streamlit session per request.
+
+    uvicorn kaspa_api:app --port 8502      (or: python kaspa_api.py)
+
+Every data endpoint takes optional `start`/`end` (ISO date/datetime or epoch
+milliseconds) selecting the [start, end) range. Responses carry an ETag
+derived from the data version and query, so unchanged data revalidates with
+a bodyless 304, and are gzipped when the client accepts it. A 304 still
+needs a valid key, but carries no data and is not counted against the
+daily quota.
+
+API keys are random tokens issued per user (issue_api_key); the user store
+keeps only their SHA-256, so a leaked database reveals no usable key and a
+single key can be revoked without touching the others.
+"""
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qsl
+
+import numpy as np
+import pandas as pd
+
+from kaspa_analytics import INDICATORS, IncrementalPowerLaw, IndicatorContext, PowerLawFit
+from kaspa_data import (PriceStore, TimeSeriesIndex, create_price_provider, get_tier_limits,
+                        load_app_config, load_data_settings, price_columns)
+from kaspa_metering import UsageMeter
+from kaspa_users import UserStore, user_db_path
+
+DEFAULT_API_SETTINGS = {
+    'host': '127.0.0.1',
+    'port': 8502,
+    'refresh_seconds': 60,
+    'cache_entries': 256,
+}
+
+# Bodies smaller than this are not worth compressing
+GZIP_MIN_BYTES = 1024
+DEFAULT_INDICATORS = ['sma', 'ema', 'rsi', 'macd', 'bollinger', 'atr']
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+# Active keys a user may hold at once
+MAX_API_KEYS = 5
+API_KEY_PREFIX = 'kas_'
+
+def load_api_settings(app_config):
+    """api block of config.yaml over the defaults"""
+    settings = dict(DEFAULT_API_SETTINGS)
+    settings.update(app_config.get('api') or {})
+    return settings
+
+def hash_api_key(api_key):
+    # Keys are 256-bit random tokens, so a fast unsalted hash is enough to look them up by
+    return hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+
+def issue_api_key(users, username):
+    """New random key for `username`, or None if they already hold MAX_API_KEYS; only its hash is stored"""
+    if len(users.api_keys(username)) >= MAX_API_KEYS:
+        return None
+    api_key = API_KEY_PREFIX + secrets.token_urlsafe(32)
+    users.add_api_key(username, hash_api_key(api_key), api_key[:len(API_KEY_PREFIX) + 6])
+    return api_key
+
+def _parse_time(value, name):
+    """Epoch nanoseconds from an ISO date/datetime or epoch milliseconds"""
+    if value is None:
+        return None
+    try:
+        if value.isdigit():
+            return int(value) * 1_000_000
+        return pd.Timestamp(value).value
+    except ValueError:
+        raise ApiError(400, f"Invalid {name}: {value}")
+
+def _json_list(values):
+    # JSON has no NaN; warm-up rows of indicators become null
+    values = np.asarray(values, dtype=np.float64)
+    return np.where(np.isnan(values), None, values).tolist()
+
+class PriceDataLayer:
+    """The Streamlit app's store/provider pairing, with derived results cached per data version"""
+
+    def __init__(self, data_settings, refresh_seconds=60):
+        self.settings = data_settings
+        self.refresh_seconds = refresh_seconds
+        self.store = PriceStore(data_settings['store_path'])
+        self.provider = create_price_provider(data_settings)
+        self.tracker = IncrementalPowerLaw()
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._version = None
+        self._columns = None
+        self._derived = {}
+
+    def snapshot(self):
+        """(version, columns) - the store is refreshed at most every `refresh_seconds`"""
+        with self._lock:
+            now = time.time()
+            if self._version is None or now - self._checked_at >= self.refresh_seconds:
+                try:
+                    meta = self.store.refresh(self.provider, float(self.settings['max_age_seconds']))
+                    version, columns = meta['version'], self.store.columns(meta)
+                except OSError:
+                    # Read-only filesystem - serve straight from the provider, like the app does
+                    version = f"live-{int(now // self.refresh_seconds)}"
+                    columns = self._columns if version == self._version else price_columns(self.provider.fetch())
+                if version != self._version:
+                    self._derived = {}
+                self._version, self._columns, self._checked_at = version, columns, now
+            return self._version, self._columns
+
+    def derived(self, version, name, compute):
+        """Result of `compute()` memoized for the current data version"""
+        with self._lock:
+            if version == self._version and name in self._derived:
+                return self._derived[name]
+        result = compute()
+        with self._lock:
+            if version == self._version:
+                self._derived[name] = result
+        return result
+
+    def frame(self, version, columns):
+        return self.derived(version, 'frame', lambda: pd.DataFrame({
+            'timestamp': np.asarray(columns['timestamp']).view('datetime64[ns]'),
+            'price': columns['price'],
+            'volume': columns['volume'],
+        }))
+
+class KaspaAPI:
+    """ASGI application; heavy resources are created on the first request"""
+
+    def __init__(self, app_config=None):
+        self.app_config = app_config
+        self.routes = {
+            '/v1/health': self.health,
+            '/v1/prices': self.prices,
+            '/v1/power-law': self.power_law,
+            '/v1/indicators': self.indicators,
+        }
+        self._init_lock = threading.Lock()
+        self._ready = False
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def _setup(self):
+        with self._init_lock:
+            if self._ready:
+                return
+            app_config = self.app_config if self.app_config is not None else load_app_config()
+            self.settings = load_api_settings(app_config)
+            self.tier_config = app_config
+            self.data = PriceDataLayer(load_data_settings(app_config=app_config),
+                                       float(self.settings['refresh_seconds']))
+            user_settings = app_config.get('user_store') or {}
+            metering = app_config.get('metering') or {}
+            self.users = UserStore(user_db_path(user_settings), pool_size=int(user_settings.get('pool_size', 4)))
+            self.meter = UsageMeter(self.users.pool,
+                                    flush_interval=float(metering.get('flush_interval_seconds', 5)),
+                                    retention_days=int(metering.get('retention_days', 90)))
+            self._ready = True
+
+    # ASGI
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    await asyncio.to_thread(self._setup)
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    if self._ready:
+                        self.meter.close()
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+        if scope['type'] != 'http':
+            return
+
+        headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+        status, response_headers, body = await asyncio.to_thread(
+            self.handle, scope['method'], scope['path'], scope.get('query_string', b'').decode('latin-1'), headers
+        )
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(name.encode('latin-1'), value.encode('latin-1')) for name, value in response_headers],
+        })
+        await send({'type': 'http.response.body', 'body': b'' if scope['method'] == 'HEAD' else body})
+
+    def handle(self, method, path, query_string, headers):
+        """(status, headers, body) for one request"""
+        self._setup()
+        try:
+            if method not in ('GET', 'HEAD'):
+                raise ApiError(405, "Only GET is supported")
+            route = self.routes.get(path.rstrip('/'))
+            if route is None:
+                raise ApiError(404, f"Unknown endpoint: {path}")
+            account = self.authorize(headers) if route != self.health else None
+
+            version, columns = self.data.snapshot()
+            params = dict(parse_qsl(query_string))
+            query = '&'.join(f"{key}={value}" for key, value in sorted(params.items()))
+            etag = '"' + hashlib.sha1(f"{version}|{path}|{query}".encode('utf-8')).hexdigest()[:20] + '"'
+            response_headers = [
+                ('content-type', 'application/json'),
+                ('etag', etag),
+                ('cache-control', 'private, no-cache'),
+                ('vary', 'Accept-Encoding, Authorization'),
+            ]
+
+            if etag in [tag.strip() for tag in headers.get('if-none-match', '').split(',')]:
+                return 304, response_headers, b''
+            if account is not None:
+                self.consume(*account)
+
+            body, compressed = self._cached_body(etag, lambda: route(version, columns, params))
+            if compressed is not None and 'gzip' in headers.get('accept-encoding', ''):
+                response_headers.append(('content-encoding', 'gzip'))
+                body = compressed
+            response_headers.append(('content-length', str(len(body))))
+            return 200, response_headers, body
+
+        except ApiError as e:
+            body = json.dumps({'error': e.message}).encode('utf-8')
+            return e.status, [('content-type', 'application/json'), ('content-length', str(len(body)))], body
+
+    def authorize(self, headers):
+        """(username, subscription, daily limit) for the request's API key if its plan includes the API"""
+        authorization = headers.get('authorization', '')
+        api_key = authorization[7:] if authorization.lower().startswith('bearer ') else headers.get('x-api-key')
+        username = self.users.username_for_api_key(hash_api_key(api_key)) if api_key else None
+        user = self.users.get(username) if username else None
+        if user is None:
+            raise ApiError(401, "Missing or invalid API key")
+
+        subscription = user.get('subscription', 'free')
+        limit = get_tier_limits(self.tier_config, subscription).get('api_calls_per_day', 0)
+        if not limit:
+            raise ApiError(403, f"API access is not included in the {subscription} plan")
+        return username, subscription, limit
+
+    def consume(self, username, subscription, limit):
+        """Meter one call that returns data, or refuse it once the daily quota is used up"""
+        if not self.meter.try_consume(username, subscription, limit, 'api_calls', 'day'):
+            raise ApiError(429, f"Daily limit of {limit} API calls reached")
+
+    def _cached_body(self, etag, build):
+        """(body, gzipped body or None) for an ETag, serialized once and kept in an LRU"""
+        with self._cache_lock:
+            if etag in self._cache:
+                self._cache.move_to_end(etag)
+                return self._cache[etag]
+
+        body = json.dumps(build(), separators=(',', ':')).encode('utf-8')
+        entry = (body, gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_BYTES else None)
+        with self._cache_lock:
+            self._cache[etag] = entry
+            while len(self._cache) > int(self.settings['cache_entries']):
+                self._cache.popitem(last=False)
+        return entry
+
+    @staticmethod
+    def _range(columns, params):
+        """Row bounds of [start, end) located by binary search on the timestamp column"""
+        return TimeSeriesIndex(columns).bounds(_parse_time(params.get('start'), 'start'),
+                                               _parse_time(params.get('end'), 'end'))
+
+    # Endpoints
+    def health(self, version, columns, params):
+        return {'status': 'ok', 'version': version, 'rows': len(columns['timestamp'])}
+
+    def prices(self, version, columns, params):
+        lo, hi = self._range(columns, params)
+        return {
+            'version': version,
+            'rows': hi - lo,
+            'timestamp': (np.asarray(columns['timestamp'][lo:hi]) // 1_000_000).tolist(),
+            'price': _json_list(columns['price'][lo:hi]),
+            'volume': _json_list(columns['volume'][lo:hi]),
+        }
+
+    def power_law(self, version, columns, params):
+        lo, hi = self._range(columns, params)
+        if hi - lo < 2:
+            raise ApiError(400, "Not enough data in range")
+
+        timestamps = np.asarray(columns['timestamp'][lo:hi]).view('datetime64[ns]')
+        prices = columns['price'][lo:hi]
+        if 'start' in params or 'end' in params:
+            fit = PowerLawFit().update(timestamps, prices)
+        else:
+            # Full history comes from the incremental tracker
+            fit = self.data.derived(version, 'power_law',
+                                    lambda: self.data.tracker.sync(self.data.frame(version, columns)))
+        if not fit.is_ready:
+            raise ApiError(400, "Not enough data in range")
+
+        latest = timestamps[-1:]
+        return {
+            'version': version,
+            'points': fit.n,
+            'slope': fit.slope,
+            'intercept': fit.intercept,
+            'r_squared': fit.r_squared,
+            'residual_std': fit.residual_std,
+            'latest': {
+                'timestamp': int(latest.view('int64')[0] // 1_000_000),
+                'price': float(prices[-1]),
+                'trend': float(fit.predict(latest)[0]),
+                'deviation_pct': float(fit.deviation_pct(latest, prices[-1:])[0]),
+            },
+        }
+
+    def indicators(self, version, columns, params):
+        names = [name for name in params.get('names', ','.join(DEFAULT_INDICATORS)).split(',') if name]
+        unknown = [name for name in names if name not in INDICATORS]
+        if unknown:
+            raise ApiError(400, f"Unknown indicators: {', '.join(unknown)}")
+
+        # Indicators run over the full history so the range edges have no warm-up gap
+        ctx = self.data.derived(version, 'indicators', lambda: IndicatorContext(columns['price'], columns['volume']))
+        lo, hi = self._range(columns, params)
+        result = {
+            'version': version,
+            'rows': hi - lo,
+            'timestamp': (np.asarray(columns['timestamp'][lo:hi]) // 1_000_000).tolist(),
+        }
+        for name in names:
+            values = ctx.indicator(name)
+            if isinstance(values, pd.DataFrame):
+                result[name] = {column: _json_list(values[column].to_numpy()[lo:hi]) for column in values.columns}
+            elif isinstance(values, pd.Series):
+                result[name] = _json_list(values.to_numpy()[lo:hi])
+            else:
+                result[name] = values
+        return result
+
+app = KaspaAPI()
+
+def main(argv=None):
+    settings = load_api_settings(load_app_config())
+    parser = argparse.ArgumentParser(description="Kaspa Analytics Pro JSON API")
+    parser.add_argument('--host', default=settings['host'])
+    parser.add_argument('--port', type=int, default=int(settings['port']))
+    args = parser.parse_args(argv)
+
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("The API server needs an ASGI server. Install with: pip install uvicorn")
+    uvicorn.run(app, host=args.host, port=args.port)
+
+if __name__ == '__main__':
+    main()
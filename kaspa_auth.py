@@ -0,0 +1,56 @@
+"""streamlit-authenticator integration for Kaspa Analytics Pro.
+
+streamlit_app imports this module only once a visitor opens the login page
+or logs out: the library pulls in bcrypt, the cookie component and their
+dependencies, none of which a public visitor needs.
+"""
+import streamlit as st
+import streamlit_authenticator as stauth
+from streamlit_authenticator.controllers import AuthenticationController
+
+def route_hashing(hasher):
+    """Send streamlit-authenticator's hash/verify through a PasswordHasher pool"""
+    stauth.Hasher.hash = classmethod(lambda cls, password: hasher.hash(password))
+    stauth.Hasher.check_pw = classmethod(lambda cls, password, hashed_password: hasher.check(password, hashed_password))
+
+class RateLimitedAuthenticationController(AuthenticationController):
+    """Turns away password logins the limiter rejects before they reach bcrypt"""
+
+    def __init__(self, *args, limiter=None, client_ip=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.limiter = limiter
+        self.client_ip = client_ip or (lambda: None)
+
+    def login(self, username=None, password=None, *args, **kwargs):
+        if not username or self.limiter is None:
+            # Cookie re-authentication - no password to check
+            return super().login(username, password, *args, **kwargs)
+
+        ip = self.client_ip()
+        retry_after = self.limiter.acquire(username, ip)
+        if retry_after > 0:
+            st.session_state['authentication_status'] = False
+            st.session_state['login_retry_after'] = retry_after
+            return False
+
+        result = super().login(username, password, *args, **kwargs)
+        if result:
+            self.limiter.record_success(username, ip)
+        elif result is False:
+            lockout = self.limiter.record_failure(username, ip)
+            if lockout:
+                st.session_state['login_retry_after'] = lockout
+        return result
+
+def create_authenticator(cookie, preauthorized, controller):
+    """A session's Authenticate (its own cookie state) sharing `controller` for everything else"""
+    authenticator = stauth.Authenticate(
+        {'usernames': {}},
+        cookie['name'],
+        cookie['key'],
+        cookie['expiry_days'],
+        preauthorized,
+        auto_hash=False
+    )
+    authenticator.authentication_controller = controller
+    return authenticator
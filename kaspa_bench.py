@@ -0,0 +1,352 @@
+"""Benchmarks for Kaspa Analytics Pro.
+
+Times the data-layer hot paths and full script reruns per page, headless,
+against synthetic data in a scratch directory (the real user database and
+price store are never touched). Results are written as JSON so runs can be
+compared over time:
+
+    python kaspa_bench.py
+    python kaspa_bench.py --only rerun --repeat 10
+    python kaspa_bench.py --compare data/benchmarks/<earlier run>.json
+    python kaspa_bench.py --only import --import-budget-ms 1200
+
+The import group exits non-zero when a public visitor's first run of the
+script in a fresh process goes over the budget or pulls in a module that is
+meant to load lazily.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(BASE_DIR, 'streamlit_app.py')
+RESULTS_DIR = os.path.join(BASE_DIR, 'data', 'benchmarks')
+
+# Session state key the patched sidebar menus read the selected page from
+BENCH_PAGE_KEY = '_bench_page'
+
+# Cold start: must stay out of a public visitor's first run
+LAZY_MODULES = ['plotly.express', 'streamlit_authenticator', 'bcrypt', 'kaspa_auth', 'kaspa_api', 'kaspa_rollups', 'kaspa_network']
+IMPORT_BUDGET_MS = 1500
+# Written to stderr right before the timed run, so import_profile can skip AppTest's own imports
+PROBE_MARKER = '-- first run --'
+# One full run of the script as __main__ (so main() renders the public overview), not just its import
+IMPORT_PROBE = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+print(%r, file=sys.stderr, flush=True)
+start = time.perf_counter()
+at = AppTest.from_file(%r, default_timeout=120)
+at.run()
+elapsed = time.perf_counter() - start
+print(json.dumps({'seconds': elapsed, 'lazy_loaded': [name for name in %r if name in sys.modules],
+                  'exceptions': [e.value for e in at.exception]}))
+""" % (PROBE_MARKER, APP_PATH, LAZY_MODULES)
+
+# (route, username, page) - username None is the public site
+RERUN_ROUTES = [
+    ('public/overview', None, 'overview'),
+    ('public/price_charts', None, 'price_charts'),
+    ('public/basic_analytics', None, 'basic_analytics'),
+    ('free/overview', 'free_user', 'overview'),
+    ('free/price_charts', 'free_user', 'price_charts'),
+    ('free/power_law_basic', 'free_user', 'power_law_basic'),
+    ('premium/overview', 'premium_user', 'overview'),
+    ('premium/price_charts', 'premium_user', 'price_charts'),
+    ('premium/power_law_advanced', 'premium_user', 'power_law_advanced'),
+    ('premium/data_export', 'premium_user', 'data_export'),
+    ('pro/overview', 'researcher', 'overview'),
+    ('pro/price_charts', 'researcher', 'price_charts'),
+    ('pro/power_law_advanced', 'researcher', 'power_law_advanced'),
+    ('pro/network_metrics', 'researcher', 'network_metrics'),
+    ('admin/overview', 'admin', 'overview'),
+    ('admin/admin_panel', 'admin', 'admin_panel'),
+]
+
+def summarize(samples):
+    """Timing statistics in milliseconds"""
+    ms = sorted(sample * 1000 for sample in samples)
+    return {
+        'n': len(ms),
+        'min_ms': round(ms[0], 3),
+        'median_ms': round(statistics.median(ms), 3),
+        'mean_ms': round(statistics.fmean(ms), 3),
+        'max_ms': round(ms[-1], 3),
+    }
+
+def measure(fn, repeat, setup=None):
+    """Wall time of `repeat` calls to `fn`, with `setup` (untimed) before each"""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def prepare_environment(workdir):
+    """Point the app at a scratch user database, price store and network rollup store, with synthetic data"""
+    os.environ['KASPA_USER_DB'] = os.path.join(workdir, 'users.db')
+    os.environ['KASPA_PRICE_STORE'] = os.path.join(workdir, 'price_store')
+    os.environ['KASPA_NETWORK_STORE'] = os.path.join(workdir, 'network_store')
+    os.environ['KASPA_DATA_PROVIDER'] = 'synthetic'
+    if BASE_DIR not in sys.path:
+        sys.path.insert(0, BASE_DIR)
+
+    # Bare-mode calls into cached functions would otherwise warn on every call
+    import streamlit.logger
+    from streamlit import config
+    config.get_option('logger.level')  # parse the config first, or it resets the level later
+    streamlit.logger.set_log_level('error')
+
+def patch_sidebar_menus():
+    """Let session state pick the page, since AppTest cannot click antd menus"""
+    import streamlit as st
+    import streamlit_antd_components as sac
+
+    menu = sac.menu
+    def select_page(*args, **kwargs):
+        page = st.session_state.get(BENCH_PAGE_KEY)
+        return page if page is not None else menu(*args, **kwargs)
+    sac.menu = select_page
+
+def clear_streamlit_caches():
+    import streamlit as st
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+def run_import_probe(*python_flags):
+    """First run of the app (public overview) in a fresh interpreter; returns (probe result, stderr)"""
+    proc = subprocess.run([sys.executable, *python_flags, '-c', IMPORT_PROBE], cwd=BASE_DIR,
+                          capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1]), proc.stderr
+
+def import_profile(limit=15):
+    """Slowest top-level imports of the script's first run (cumulative ms, from python -X importtime)"""
+    _, stderr = run_import_probe('-X', 'importtime')
+    imports, started = [], False
+    for line in stderr.splitlines():
+        if line == PROBE_MARKER:
+            started = True
+            continue
+        # "import time: self [us] | cumulative | <2 spaces per level>package", children before parents
+        parts = line.split('|')
+        if not started or not line.startswith('import time:') or len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name, ms = parts[2][1:], int(parts[1]) / 1000
+        if not name.startswith(' '):
+            imports.append((name.strip(), ms))
+    return dict(sorted(imports, key=lambda item: item[1], reverse=True)[:limit])
+
+# Benchmarks - each returns {name: samples}
+def bench_import(repeat, workdir):
+    """A public visitor's first run of the script (imports, module-level code and main()) in fresh interpreters"""
+    # Warm-up: byte-compiles the app and creates the scratch databases and price store
+    result, _ = run_import_probe()
+    if result['exceptions']:
+        raise RuntimeError(f"First run raised: {result['exceptions'][0]}")
+    if result['lazy_loaded']:
+        raise RuntimeError(f"First run loaded lazy modules: {', '.join(result['lazy_loaded'])}")
+    return {'import/first_run': [run_import_probe()[0]['seconds'] for _ in range(repeat)]}
+
+def bench_fetch(repeat, workdir):
+    """fetch_kaspa_price_data from an empty store, with cold caches over a built store, and warm"""
+    import streamlit_app as app
+    store_path = os.environ['KASPA_PRICE_STORE']
+
+    def empty_store():
+        clear_streamlit_caches()
+        shutil.rmtree(store_path, ignore_errors=True)
+
+    results = {
+        'fetch_price_data/cold_store': measure(app.fetch_kaspa_price_data, repeat, setup=empty_store),
+        'fetch_price_data/cold_cache': measure(app.fetch_kaspa_price_data, repeat, setup=clear_streamlit_caches),
+    }
+    app.fetch_kaspa_price_data()
+    results['fetch_price_data/warm'] = measure(app.fetch_kaspa_price_data, repeat * 20)
+    return results
+
+def bench_network(repeat, workdir):
+    """Network rollups: full build from raw blocks, resuming after an hour of new blocks, and a warm read"""
+    import streamlit_app as app
+    from kaspa_network import NetworkStore, SyntheticBlockSource
+
+    settings = app.get_network_settings()
+    store = NetworkStore(os.path.join(workdir, 'network_bench'))
+    now = time.time()
+
+    def source(end):
+        # Synthetic DAG at the configured rate, whatever source the app uses
+        return SyntheticBlockSource(float(settings['synthetic_days']),
+                                    float(settings['synthetic_blocks_per_second']), now=end)
+
+    def empty_store():
+        shutil.rmtree(store.path, ignore_errors=True)
+
+    def resume_last_hour():
+        empty_store()
+        store.refresh(source(now - 3600), 0)
+
+    results = {
+        'network_rollups/full_build': measure(lambda: store.refresh(source(now), 0), repeat, setup=empty_store),
+        'network_rollups/resume_1h': measure(lambda: store.refresh(source(now), 0), repeat, setup=resume_last_hour),
+    }
+    # The app builds its rollups on a background thread
+    app.get_network_refresher().wait()
+    app.get_network_metrics()
+    results['network_rollups/warm'] = measure(app.get_network_metrics, repeat * 20)
+    return results
+
+def bench_registration(repeat, workdir):
+    """add_new_user_to_config: uniqueness checks, bcrypt hash and insert"""
+    import streamlit_app as app
+    counter = iter(range(10**9))
+
+    def register():
+        n = next(counter)
+        if not app.add_new_user_to_config(f"bench_user_{n}", f"bench_{n}@example.com",
+                                          'Bench', 'User', 'BenchPassword1'):
+            raise RuntimeError("benchmark registration was rejected")
+
+    return {'registration/bcrypt': measure(register, repeat)}
+
+def bench_overview_figure(repeat, workdir):
+    """Plotly figure construction for the overview chart, per tier (points already downsampled).
+
+    'cold' includes validating the figure skeleton, as on the first render
+    after a restart; 'warm' reuses the shared template, as every later render does.
+    """
+    import streamlit_app as app
+    if not app.PLOTLY_AVAILABLE:
+        return {}
+    metrics = app.get_price_metrics()
+    version = app.refresh_price_data()
+    x_range = app.get_price_index(version).trailing(None)
+    results = {}
+    for tier in ['free', 'premium', 'pro']:
+        if tier == 'free':
+            points = app.overview_chart_points(metrics['windows'][30]['frame'], tier)
+        else:
+            points = app.get_overview_chart_points(version, tier, app.DEFAULT_CHART_WIDTH_PX, x_range)
+        build = lambda: app.build_overview_figure(points, tier)
+        results[f'overview_figure/{tier}/cold'] = measure(build, repeat, setup=app.get_figure_template.clear)
+        build()
+        results[f'overview_figure/{tier}/warm'] = measure(build, repeat)
+    return results
+
+def bench_reruns(repeat, workdir):
+    """Full script rerun (main()) per page, after one warm-up run per route"""
+    from streamlit.testing.v1 import AppTest
+    import streamlit_app as app
+
+    patch_sidebar_menus()
+    results = {}
+    for route, username, page in RERUN_ROUTES:
+        at = AppTest.from_file(APP_PATH, default_timeout=120)
+        at.session_state[BENCH_PAGE_KEY] = page
+        if username is not None:
+            user = app.get_user_store().get(username) or {}
+            at.session_state['authentication_status'] = True
+            at.session_state['username'] = username
+            at.session_state['name'] = f"{user.get('first_name', '')} {user.get('last_name', '')}".strip()
+
+        at.run()
+        if at.exception:
+            raise RuntimeError(f"{route}: {at.exception[0].value}")
+        results[f'rerun/{route}'] = measure(at.run, repeat)
+    return results
+
+BENCHMARKS = {
+    'import': bench_import,
+    'fetch': bench_fetch,
+    'network': bench_network,
+    'registration': bench_registration,
+    'overview_figure': bench_overview_figure,
+    'rerun': bench_reruns,
+}
+
+def environment_info():
+    """Enough context to tell whether two result files are comparable"""
+    info = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+    }
+    try:
+        info['commit'] = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                                        capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        info['commit'] = None
+    for package in ['streamlit', 'pandas', 'numpy', 'plotly', 'bcrypt']:
+        try:
+            info[package] = __import__(package).__version__
+        except (ImportError, AttributeError):
+            info[package] = None
+    return info
+
+def compare(results, baseline_path):
+    """Print the median change against an earlier results file"""
+    with open(baseline_path) as fh:
+        baseline = json.load(fh)['results']
+    print(f"\nvs {baseline_path}")
+    for name, stats in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]['median_ms'], stats['median_ms']
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"  {name:<40} {before:>10.3f} -> {after:>10.3f} ms  ({change:+.1f}%)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kaspa Analytics Pro benchmarks")
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per benchmark')
+    parser.add_argument('--only', action='append', choices=sorted(BENCHMARKS),
+                        help='Run only these benchmark groups (repeatable)')
+    parser.add_argument('--output', help='Results file (default: data/benchmarks/<timestamp>.json)')
+    parser.add_argument('--compare', help='Earlier results file to compare medians against')
+    parser.add_argument('--import-budget-ms', type=float, default=IMPORT_BUDGET_MS,
+                        help="Fail if the median first run of the script in a fresh process is slower than this")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='kaspa_bench_')
+    prepare_environment(workdir)
+    results = {}
+    report = {}
+    try:
+        for group in args.only or BENCHMARKS:
+            print(f"Running {group}...", flush=True)
+            for name, samples in BENCHMARKS[group](args.repeat, workdir).items():
+                results[name] = summarize(samples)
+                print(f"  {name:<40} median {results[name]['median_ms']:>10.3f} ms", flush=True)
+            if group == 'import':
+                report['import_profile_ms'] = import_profile()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = args.output or os.path.join(RESULTS_DIR, time.strftime('%Y%m%dT%H%M%S') + '.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as fh:
+        json.dump({'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'), 'repeat': args.repeat,
+                   'environment': environment_info(), 'results': results, **report}, fh, indent=2)
+    print(f"Wrote {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+    cold_import = results.get('import/first_run')
+    if cold_import and cold_import['median_ms'] > args.import_budget_ms:
+        print(f"\nFirst run took {cold_import['median_ms']:.0f} ms, over the {args.import_budget_ms:.0f} ms budget. Slowest imports:")
+        for name, ms in report['import_profile_ms'].items():
+            print(f"  {name:<40} {ms:>10.1f} ms")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""Chart helpers for Kaspa Analytics Pro.
+
+Server-side downsampling so Plotly traces stay bounded by what the browser
+can actually draw, however much history sits behind them, and figure
+templates so a rerun only swaps data arrays into an already-validated figure.
+"""
+import numpy as np
+
+# Wide layout renders charts at roughly this many CSS pixels
+DEFAULT_CHART_WIDTH_PX = 1600
+MIN_POINTS = 3
+
+def chart_point_budget(width_px=DEFAULT_CHART_WIDTH_PX, points_per_pixel=1.0):
+    """Number of points worth sending for a chart `width_px` wide"""
+    return max(int(width_px * points_per_pixel), MIN_POINTS)
+
+def lttb_indices(x, y, threshold):
+    """Largest-Triangle-Three-Buckets: indices of the `threshold` points that
+    best preserve the visual shape of y(x). First and last points are kept."""
+    n = len(y)
+    if threshold >= n or threshold < MIN_POINTS:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Interior points split into threshold - 2 buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+
+        # The third vertex is the mean of the next bucket (or the last point)
+        if i < threshold - 3:
+            next_start, next_end = edges[i + 1], edges[i + 2]
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        bucket_x = x[start:end]
+        bucket_y = y[start:end]
+        areas = np.abs((x[a] - avg_x) * (bucket_y - y[a]) - (x[a] - bucket_x) * (avg_y - y[a]))
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+
+    return selected
+
+def minmax_indices(y, n_buckets):
+    """Indices of the min and max of each bucket, in order - keeps every spike"""
+    n = len(y)
+    if 2 * n_buckets >= n or n_buckets < 1:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=np.float64)
+    size = -(-n // n_buckets)
+    padded = np.full(size * n_buckets, np.nan)
+    padded[:n] = y
+    buckets = padded.reshape(n_buckets, size)
+
+    # Buckets past the end of the data are all padding
+    valid = ~np.isnan(buckets).all(axis=1)
+    offsets = np.arange(n_buckets)[valid] * size
+    lows = offsets + np.nanargmin(buckets[valid], axis=1)
+    highs = offsets + np.nanargmax(buckets[valid], axis=1)
+
+    return np.unique(np.concatenate(([0, n - 1], lows, highs)))
+
+def downsample_for_chart(df, y_col, x_col='timestamp', width_px=DEFAULT_CHART_WIDTH_PX,
+                         x_range=None, method='lttb'):
+    """Rows of `df` to plot for `y_col`, clipped to the visible `x_range` and
+    reduced to the point budget for a chart `width_px` wide.
+
+    `x_range` is the zoom window as (start, end), end exclusive, in epoch ns
+    or anything np.datetime64 accepts. `method` is 'lttb' for smooth lines
+    such as price, or 'minmax' for spiky series such as volume where peaks
+    must survive.
+    """
+    if x_range is not None:
+        x_values = df[x_col].to_numpy()
+        lo = np.searchsorted(x_values, np.datetime64(x_range[0], 'ns'), side='left')
+        hi = np.searchsorted(x_values, np.datetime64(x_range[1], 'ns'), side='left')
+        df = df.iloc[lo:hi]
+
+    budget = chart_point_budget(width_px)
+    if len(df) <= budget:
+        return df
+
+    if method == 'minmax':
+        idx = minmax_indices(df[y_col].to_numpy(), budget // 2)
+    elif method == 'lttb':
+        x_values = df[x_col].to_numpy()
+        if np.issubdtype(x_values.dtype, np.datetime64):
+            x_values = x_values.view('int64')
+        idx = lttb_indices(x_values, df[y_col].to_numpy(), budget)
+    else:
+        raise ValueError(f"Unknown downsampling method: {method}")
+
+    return df.iloc[idx]
+
+# Trace keys that carry data rather than styling
+DATA_KEYS = ('x', 'y', 'open', 'high', 'low', 'close')
+
+class FigureTemplate:
+    """Validated layout and trace styling of a Plotly figure, refilled with data per render.
+
+    Building a figure through go.Figure/add_trace/update_layout validates
+    every property (and expands the layout template) on each call. The
+    skeleton is validated once; `figure` then only attaches new arrays and
+    builds the figure with validation off. NumPy arrays are passed through
+    as-is, so they are encoded as typed arrays instead of Python lists.
+    """
+
+    def __init__(self, figure):
+        skeleton = figure.to_plotly_json()
+        self.traces = [{key: value for key, value in trace.items() if key not in DATA_KEYS}
+                       for trace in skeleton['data']]
+        self.layout = skeleton['layout']
+
+    def figure(self, *trace_data, layout=None):
+        """New figure with `trace_data[i]` ({'x': ..., 'y': ...}) filled into trace i.
+
+        `layout` entries replace top-level layout keys and must already be in
+        validated form (e.g. {'title': {'text': ...}}).
+        """
+        import plotly.graph_objects as go
+        data = [dict(trace, **values) for trace, values in zip(self.traces, trace_data)]
+        return go.Figure(data=data, layout=dict(self.layout, **layout) if layout else self.layout,
+                         _validate=False)
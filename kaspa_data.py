@@ -0,0 +1,834 @@
+"""Market data layer for Kaspa Analytics Pro.
+
+Kept free of Streamlit imports so worker processes, CLI helpers and the app
+can all share the same providers and on-disk price store.
+"""
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+import yaml
+from yaml.loader import SafeLoader
+
+try:
+    import fcntl
+except ImportError:  # Windows - store refreshes are not serialized across processes
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# requests is only imported by the http provider (it adds ~60 ms to a cold start)
+REQUESTS_AVAILABLE = importlib.util.find_spec('requests') is not None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PRICE_COLUMNS = ['timestamp', 'price', 'volume']
+HISTORY_START = '2022-01-01'
+
+DEFAULT_DATA_SETTINGS = {
+    'provider': 'synthetic',
+    'snapshot_path': 'data/kaspa_prices.csv',
+    'http_url': 'http://127.0.0.1:8765/prices',
+    'http_timeout': 10,
+    'store_path': 'data/price_store',
+    'max_age_seconds': 300,
+}
+
+# Environment overrides, handy for running several workers against one store
+DATA_SETTINGS_ENV = {
+    'provider': 'KASPA_DATA_PROVIDER',
+    'snapshot_path': 'KASPA_SNAPSHOT_PATH',
+    'http_url': 'KASPA_DATA_URL',
+    'store_path': 'KASPA_PRICE_STORE',
+}
+
+def load_app_config(config_path=None):
+    """Parsed config.yaml next to the app, or {} if it is missing"""
+    config_path = config_path or os.path.join(BASE_DIR, 'config.yaml')
+    if not os.path.exists(config_path):
+        return {}
+    with open(config_path) as fh:
+        return yaml.load(fh, Loader=SafeLoader) or {}
+
+def get_tier_limits(app_config, subscription):
+    """limits block of a subscription tier from config.yaml ({} if unknown)"""
+    tier = (app_config.get('subscription_tiers') or {}).get(subscription) or {}
+    return tier.get('limits') or {}
+
+def load_data_settings(config_path=None, app_config=None):
+    """Read the data_source block from config.yaml (or an already-parsed `app_config`), with env overrides"""
+    if app_config is None:
+        app_config = load_app_config(config_path)
+    settings = dict(DEFAULT_DATA_SETTINGS)
+    settings.update(app_config.get('data_source') or {})
+
+    for key, env_name in DATA_SETTINGS_ENV.items():
+        if os.environ.get(env_name):
+            settings[key] = os.environ[env_name]
+
+    # Relative paths are resolved against the app directory, not the CWD
+    for key in ['snapshot_path', 'store_path']:
+        if not os.path.isabs(settings[key]):
+            settings[key] = os.path.join(BASE_DIR, settings[key])
+
+    return settings
+
+def generate_synthetic_price_data(dates, seed=42, base_price=0.02, start_step=0):
+    """Build the synthetic price path for `dates` in one vectorized pass.
+
+    With start_step > 0 the walk continues from `base_price` at that step,
+    drawing from its own seeded stream so appended rows are deterministic.
+    """
+    rng = np.random.RandomState(seed if start_step == 0 else seed + start_step)
+    n = len(dates)
+
+    # Same draws, same order as the old per-day loop: n normals, then n lognormals
+    steps = np.arange(start_step, start_step + n)
+    trend = 0.001 * np.sin(steps / 50) + 0.0005
+    volatility = rng.normal(0, 0.05, n)
+
+    # Seed the product with base_price so multiplication order matches the loop exactly
+    factors = np.concatenate(([base_price], 1 + trend + volatility))
+    prices = np.maximum(np.cumprod(factors)[1:], 0.001)
+
+    volumes = rng.lognormal(15, 1, n)
+
+    return pd.DataFrame({
+        'timestamp': dates,
+        'price': prices,
+        'volume': volumes
+    })
+
+def normalize_price_frame(df):
+    """Coerce a provider frame to timestamp/price/volume with sorted ns timestamps"""
+    missing = [col for col in PRICE_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Price data is missing columns: {', '.join(missing)}")
+
+    df = df[PRICE_COLUMNS].copy()
+    df['timestamp'] = pd.to_datetime(df['timestamp']).astype('datetime64[ns]')
+    df['price'] = df['price'].astype('float64')
+    df['volume'] = df['volume'].astype('float64')
+    return df.sort_values('timestamp', kind='stable').reset_index(drop=True)
+
+def price_columns(df):
+    """Column arrays of a price frame in store layout (int64 ns timestamps)"""
+    return {
+        'timestamp': df['timestamp'].to_numpy().astype('datetime64[ns]').view('int64'),
+        'price': df['price'].to_numpy(),
+        'volume': df['volume'].to_numpy(),
+    }
+
+def last_timestamp(history):
+    """Last timestamp of a dict of store columns, as a pandas Timestamp"""
+    return pd.Timestamp(int(history['timestamp'][-1]))
+
+# Providers
+class PriceDataProvider:
+    """Base class for market data sources"""
+    name = 'base'
+
+    def fetch(self):
+        """Return the full price history as a timestamp/price/volume frame"""
+        raise NotImplementedError
+
+    def fetch_since(self, history):
+        """Return only rows newer than the last row of `history` (dict of column arrays).
+
+        The default refetches and filters; providers that can do better override it.
+        """
+        df = self.fetch()
+        return df[df['timestamp'] > last_timestamp(history)].reset_index(drop=True)
+
+class SyntheticPriceProvider(PriceDataProvider):
+    """Deterministic demo data - the app's original data source"""
+    name = 'synthetic'
+
+    def __init__(self, start=HISTORY_START, freq='D', seed=42):
+        self.start = start
+        self.freq = freq
+        self.seed = seed
+
+    def fetch(self):
+        dates = pd.date_range(start=self.start, end=datetime.now(), freq=self.freq)
+        return normalize_price_frame(generate_synthetic_price_data(dates, seed=self.seed))
+
+    def fetch_since(self, history):
+        # Continue the walk from the last stored price instead of regenerating history
+        dates = pd.date_range(start=last_timestamp(history), end=datetime.now(), freq=self.freq)[1:]
+        df = generate_synthetic_price_data(dates, seed=self.seed,
+                                           base_price=float(history['price'][-1]),
+                                           start_step=len(history['price']))
+        return normalize_price_frame(df)
+
+class SnapshotPriceProvider(PriceDataProvider):
+    """Local CSV or Parquet snapshot"""
+    name = 'snapshot'
+
+    def __init__(self, path):
+        self.path = path
+
+    def fetch(self):
+        if self.path.endswith('.parquet'):
+            df = pd.read_parquet(self.path)
+        else:
+            df = pd.read_csv(self.path)
+        return normalize_price_frame(df)
+
+class HttpPriceProvider(PriceDataProvider):
+    """JSON-over-HTTP source returning a list of timestamp/price/volume records"""
+    name = 'http'
+
+    def __init__(self, url, timeout=10):
+        if not REQUESTS_AVAILABLE:
+            raise RuntimeError("The http provider needs requests. Install with: pip install requests")
+        self.url = url
+        self.timeout = timeout
+
+    def fetch(self, params=None):
+        import requests
+        response = requests.get(self.url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return normalize_price_frame(pd.DataFrame(response.json(), columns=PRICE_COLUMNS))
+
+    def fetch_since(self, history):
+        since = last_timestamp(history)
+        df = self.fetch(params={'since': since.isoformat()})
+        return df[df['timestamp'] > since].reset_index(drop=True)
+
+def create_price_provider(settings):
+    """Build the provider selected in the data settings"""
+    provider = settings.get('provider', 'synthetic')
+    if provider == 'synthetic':
+        return SyntheticPriceProvider()
+    if provider == 'snapshot':
+        return SnapshotPriceProvider(settings['snapshot_path'])
+    if provider == 'http':
+        return HttpPriceProvider(settings['http_url'], timeout=float(settings.get('http_timeout', 10)))
+    raise ValueError(f"Unknown data provider: {provider}")
+
+# On-disk columnar store
+STORE_DTYPES = {'timestamp': np.int64, 'price': np.float64, 'volume': np.float64}
+
+class VersionedStore:
+    """Versioned directory of column files shared by every worker on the host.
+
+    Metadata (version, row counts) lives in CURRENT and is published by
+    atomic replace. A new version is staged under a temporary name and moved
+    into a fresh vNNNNNNNN/ directory, so readers never see a partial write;
+    the oldest versions are pruned. Subclasses define the column layout
+    (`_map`) and how a refresh brings it up to date (`_update`).
+
+    A failed refresh is recorded in CURRENT (failed_at, failures, last_error)
+    and the source is not contacted again until an exponential backoff of
+    `retry_seconds` (doubling per failure, at most `max_retry_seconds`) ends.
+    """
+    FAILURE_KEYS = ('failed_at', 'failures', 'last_error')
+
+    def __init__(self, path, keep_versions=2, retry_seconds=30, max_retry_seconds=600):
+        self.path = path
+        self.keep_versions = keep_versions
+        self.retry_seconds = retry_seconds
+        self.max_retry_seconds = max_retry_seconds
+        self._mapped = None
+        self._mapped_lock = threading.Lock()
+
+    @property
+    def _current_path(self):
+        return os.path.join(self.path, 'CURRENT')
+
+    def read_meta(self):
+        """Metadata of the published version, or None for an empty store"""
+        try:
+            with open(self._current_path) as fh:
+                return json.load(fh)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def is_fresh(self, max_age, meta=None):
+        meta = meta if meta is not None else self.read_meta()
+        return meta is not None and time.time() - meta['updated_at'] < max_age
+
+    def retry_at(self, meta=None):
+        """Time (epoch seconds) before which a failing source is not contacted again, or None"""
+        meta = meta if meta is not None else self.read_meta()
+        if meta is None or 'failed_at' not in meta:
+            return None
+        backoff = min(self.retry_seconds * 2 ** (meta['failures'] - 1), self.max_retry_seconds)
+        return meta['failed_at'] + backoff
+
+    def _should_wait(self, max_age, meta):
+        # Fresh, or stale but still backing off from a failed refresh
+        retry_at = self.retry_at(meta)
+        return self.is_fresh(max_age, meta) or (retry_at is not None and time.time() < retry_at)
+
+    @contextmanager
+    def lock(self):
+        """Exclusive cross-process lock so only one worker refreshes at a time"""
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, '.lock'), 'w') as fh:
+            if fcntl is not None:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _write_meta(self, meta):
+        tmp_current = f"{self._current_path}.{os.getpid()}"
+        with open(tmp_current, 'w') as fh:
+            json.dump(meta, fh)
+        os.replace(tmp_current, self._current_path)
+        return meta
+
+    def _publish(self, meta):
+        # A successful update clears any recorded failure
+        for key in self.FAILURE_KEYS:
+            meta.pop(key, None)
+        meta['updated_at'] = time.time()
+        return self._write_meta(meta)
+
+    def _record_failure(self, meta, error):
+        meta['failed_at'] = time.time()
+        meta['failures'] = meta.get('failures', 0) + 1
+        meta['last_error'] = f"{type(error).__name__}: {error}"
+        return self._write_meta(meta)
+
+    def _publish_version(self, write_files, **meta):
+        """Stage a new version with `write_files(directory)`, then publish it with `meta`"""
+        os.makedirs(self.path, exist_ok=True)
+
+        previous = self.read_meta()
+        version = previous['version'] + 1 if previous else 1
+        version_dir = f"v{version:08d}"
+        staging = os.path.join(self.path, f".{version_dir}.{os.getpid()}")
+
+        os.makedirs(staging, exist_ok=True)
+        write_files(staging)
+        os.replace(staging, os.path.join(self.path, version_dir))
+
+        meta = self._publish({'version': version, 'dir': version_dir, **meta})
+        self._prune(version)
+        return meta
+
+    def _prune(self, version):
+        # Other processes may still have older versions mapped; unlinking is safe on POSIX
+        for entry in os.listdir(self.path):
+            if entry.startswith('v') and entry[1:].isdigit():
+                if int(entry[1:]) <= version - self.keep_versions:
+                    shutil.rmtree(os.path.join(self.path, entry), ignore_errors=True)
+
+    def columns(self, meta=None):
+        """Memory-mapped columns of the published version, or None if empty"""
+        meta = meta if meta is not None else self.read_meta()
+        if meta is None:
+            return None
+
+        with self._mapped_lock:
+            if self._mapped is None or self._mapped[0] != meta['version']:
+                self._mapped = (meta['version'], self._map(os.path.join(self.path, meta['dir']), meta))
+            return self._mapped[1]
+
+    def _map(self, version_dir, meta):
+        """Map the column files of one version"""
+        raise NotImplementedError
+
+    def refresh(self, source, max_age, incremental=True, force=False):
+        """Bring the store up to date from `source` if stale and return the current metadata.
+
+        Workers that miss their cache together queue on the lock; the first
+        one refreshes and the rest find a fresh version once they get in.
+        While a failed source is backing off, the stale version is returned
+        without taking the lock. `force` refreshes regardless.
+        """
+        meta = self.read_meta()
+        if not force and self._should_wait(max_age, meta):
+            return meta
+
+        with self.lock():
+            meta = self.read_meta()
+            if force or not self._should_wait(max_age, meta):
+                try:
+                    meta = self._update(source, meta, incremental)
+                except Exception as e:
+                    # Serve stale data rather than nothing if the source is down
+                    if meta is None:
+                        raise
+                    meta = self._record_failure(meta, e)
+                    logger.warning("Refreshing %s from %s failed (%d in a row), serving version %s until %s: %s",
+                                   self.path, source.name, meta['failures'], meta['version'],
+                                   datetime.fromtimestamp(self.retry_at(meta)).isoformat(timespec='seconds'),
+                                   meta['last_error'])
+
+        return meta
+
+    def _update(self, source, meta, incremental):
+        """Publish a version brought up to date from `source`; called under lock()"""
+        raise NotImplementedError
+
+class PriceStore(VersionedStore):
+    """Append-only price history in a VersionedStore, one raw column file per field.
+
+    Readers map exactly `rows` elements of each column, and appends only ever
+    write past that point (files are never truncated), so an existing mapping
+    is never disturbed; a full rewrite goes to a fresh version directory.
+    """
+
+    def write(self, df, source='unknown'):
+        """Publish `df` as a new store version in a fresh directory"""
+        df = normalize_price_frame(df)
+
+        def write_files(directory):
+            for name, values in price_columns(df).items():
+                values.astype(STORE_DTYPES[name], copy=False).tofile(os.path.join(directory, f"{name}.bin"))
+
+        return self._publish_version(write_files, rows=len(df), source=source)
+
+    def append(self, df, source='unknown'):
+        """Append rows newer than the stored history and bump the version.
+
+        Must be called under lock(). Cost is proportional to the new rows.
+        """
+        meta = self.read_meta()
+        if meta is None:
+            return self.write(df, source)
+
+        df = normalize_price_frame(df)
+        if df.empty:
+            return self._publish(meta)
+
+        version_dir = os.path.join(self.path, meta['dir'])
+        for name, values in price_columns(df).items():
+            dtype = np.dtype(STORE_DTYPES[name])
+            with open(os.path.join(version_dir, f"{name}.bin"), 'r+b') as fh:
+                # Write past the published rows only - never truncate a file readers may have mapped.
+                # A tail left by an append that crashed before publishing is simply overwritten.
+                fh.seek(meta['rows'] * dtype.itemsize)
+                fh.write(values.astype(dtype, copy=False).tobytes())
+
+        meta['version'] += 1
+        meta['rows'] += len(df)
+        meta['source'] = source
+        return self._publish(meta)
+
+    def _map(self, version_dir, meta):
+        cols = {}
+        for name, dtype in STORE_DTYPES.items():
+            if meta['rows']:
+                cols[name] = np.memmap(os.path.join(version_dir, f"{name}.bin"),
+                                       dtype=dtype, mode='r', shape=(meta['rows'],))
+            else:
+                cols[name] = np.empty(0, dtype=dtype)
+        return cols
+
+    def load(self):
+        """Published version as a DataFrame, or None if the store is empty"""
+        cols = self.columns()
+        if cols is None:
+            return None
+        return pd.DataFrame({
+            'timestamp': cols['timestamp'].view('datetime64[ns]'),
+            'price': cols['price'],
+            'volume': cols['volume'],
+        })
+
+    def _update(self, provider, meta, incremental):
+        # With `incremental`, only rows newer than the stored history are fetched and appended
+        if incremental and meta is not None and meta['rows']:
+            return self.append(provider.fetch_since(self.columns(meta)), source=provider.name)
+        return self.write(provider.fetch(), source=provider.name)
+
+# Derived metrics
+METRIC_WINDOWS = (7, 30)
+
+def compute_price_metrics(df, windows=METRIC_WINDOWS):
+    """Window aggregates the overview, public pages and sidebars display.
+
+    The result is shared between sessions, so callers must treat it as read-only.
+    Returns None for an empty frame.
+    """
+    if df is None or df.empty:
+        return None
+
+    price = df['price'].to_numpy()
+    volume = df['volume'].to_numpy()
+    metrics = {
+        'rows': len(df),
+        'current_timestamp': df['timestamp'].iloc[-1],
+        'current_price': float(price[-1]),
+        'current_volume': float(volume[-1]),
+        'windows': {},
+    }
+
+    for window in windows:
+        prices = price[-window:]
+        metrics['windows'][window] = {
+            'frame': df.iloc[-window:].reset_index(drop=True),
+            'mean': float(prices.mean()),
+            'min': float(prices.min()),
+            'max': float(prices.max()),
+            'first': float(prices[0]),
+            'last': float(prices[-1]),
+            'change_pct': float((prices[-1] / prices[0] - 1) * 100),
+        }
+
+    return metrics
+
+# Range queries
+NS_PER_DAY = 86_400 * 10**9
+TIME_RANGE_DAYS = {'1D': 1, '7D': 7, '30D': 30, '1Y': 365, 'ALL': None}
+
+class TimeRangeIndex:
+    """Range queries over a sorted price history.
+
+    Subclasses provide `__len__`, `start`, `end`, `bounds` and `window`
+    (timestamp/price/volume arrays for a range); time-range pickers, retention
+    limits and frames are built on those alone.
+    """
+
+    def __len__(self):
+        raise NotImplementedError
+
+    @property
+    def start(self):
+        """First timestamp (ns)"""
+        raise NotImplementedError
+
+    @property
+    def end(self):
+        """Exclusive end just past the last timestamp (ns)"""
+        raise NotImplementedError
+
+    def bounds(self, start=None, end=None):
+        """Row range [lo, hi) of timestamps in [start, end); bounds are ns ints or anything pd.Timestamp takes"""
+        raise NotImplementedError
+
+    def window(self, start=None, end=None):
+        """Column arrays for [start, end)"""
+        raise NotImplementedError
+
+    def retention_start(self, retention_days):
+        """Earliest visible timestamp for a retention limit in days (0/None = unlimited)"""
+        if not retention_days or not len(self):
+            return self.start if len(self) else None
+        return max(self.start, self.end - int(retention_days) * NS_PER_DAY)
+
+    def trailing(self, days, floor=None):
+        """(start, end) of the last `days` days (None = all), never earlier than `floor`"""
+        start = self.start if days is None else self.end - int(days) * NS_PER_DAY
+        if floor is not None:
+            start = max(start, floor)
+        return start, self.end
+
+    def frame(self, start=None, end=None):
+        """[start, end) as a DataFrame over the column views"""
+        window = self.window(start, end)
+        return pd.DataFrame({
+            'timestamp': np.asarray(window['timestamp']).view('datetime64[ns]'),
+            'price': window['price'],
+            'volume': window['volume'],
+        }, copy=False)
+
+class TimeSeriesIndex(TimeRangeIndex):
+    """Binary-search index over store columns (sorted int64 epoch-ns timestamps).
+
+    Windows are [start, end) slices of the underlying arrays - memory-map or
+    ndarray views, never copies - found in O(log n).
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.timestamps = columns['timestamp']
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def start(self):
+        return int(self.timestamps[0])
+
+    @property
+    def end(self):
+        return int(self.timestamps[-1]) + 1
+
+    def bounds(self, start=None, end=None):
+        lo = 0 if start is None else int(np.searchsorted(self.timestamps, _epoch_ns(start), side='left'))
+        hi = len(self.timestamps) if end is None else int(np.searchsorted(self.timestamps, _epoch_ns(end), side='left'))
+        return lo, max(lo, hi)
+
+    def window(self, start=None, end=None):
+        """Column views for [start, end)"""
+        lo, hi = self.bounds(start, end)
+        return {name: values[lo:hi] for name, values in self.columns.items()}
+
+# Relative error allowed when narrowing a value column to float32
+COMPACT_RTOL = 1e-6
+
+def _readonly(values):
+    values.setflags(write=False)
+    return values
+
+def _compact_values(values):
+    """float32 copy of a column if it round-trips within COMPACT_RTOL, else float64"""
+    values = np.asarray(values, dtype=np.float64)
+    with np.errstate(over='ignore', invalid='ignore'):
+        narrowed = values.astype(np.float32)
+        fits = np.allclose(narrowed, values, rtol=COMPACT_RTOL, atol=0, equal_nan=True)
+    return _readonly(narrowed if fits else values.copy())
+
+class CompactPriceHistory(TimeRangeIndex):
+    """Read-only in-memory price history, small enough to share between sessions.
+
+    Timestamps are stored as a base plus offsets from it in units of their
+    greatest common step (daily data fits in uint16), and price/volume are
+    narrowed to float32 when that loses no meaningful precision. Range
+    queries binary-search the offsets directly. Only storage is narrowed:
+    windows decode their own timestamps and widen values back to float64,
+    so analytics never run on float32.
+    """
+
+    def __init__(self, base, unit, offsets, price, volume):
+        self.base = base
+        self.unit = unit
+        self.offsets = _readonly(offsets)
+        self.price = price
+        self.volume = volume
+
+    @classmethod
+    def from_columns(cls, columns):
+        timestamps = np.asarray(columns['timestamp'], dtype=np.int64)
+        base = int(timestamps[0]) if len(timestamps) else 0
+        relative = timestamps - base
+        unit = int(np.gcd.reduce(relative)) if len(relative) > 1 else 1
+        unit = unit or 1
+        scaled = relative // unit
+
+        max_offset = int(scaled[-1]) if len(scaled) else 0
+        dtype = next(dtype for dtype in (np.uint16, np.uint32, np.uint64) if max_offset <= np.iinfo(dtype).max)
+        return cls(base, unit, scaled.astype(dtype), _compact_values(columns['price']),
+                   _compact_values(columns['volume']))
+
+    @property
+    def nbytes(self):
+        return self.offsets.nbytes + self.price.nbytes + self.volume.nbytes
+
+    def __len__(self):
+        return len(self.offsets)
+
+    @property
+    def start(self):
+        return self.base
+
+    @property
+    def end(self):
+        return self.base + int(self.offsets[-1]) * self.unit + 1
+
+    def _rank(self, value):
+        # Number of rows with timestamps before `value`
+        steps = -(-(_epoch_ns(value) - self.base) // self.unit)
+        if steps <= 0 or not len(self):
+            return 0
+        if steps > int(self.offsets[-1]):
+            return len(self)
+        return int(np.searchsorted(self.offsets, steps, side='left'))
+
+    def bounds(self, start=None, end=None):
+        lo = 0 if start is None else self._rank(start)
+        hi = len(self) if end is None else self._rank(end)
+        return lo, max(lo, hi)
+
+    def decode_timestamps(self, lo=0, hi=None):
+        """Decoded epoch-ns timestamps of rows [lo, hi)"""
+        return self.base + self.offsets[lo:hi].astype(np.int64) * self.unit
+
+    def window(self, start=None, end=None):
+        lo, hi = self.bounds(start, end)
+        return {
+            'timestamp': self.decode_timestamps(lo, hi),
+            'price': np.asarray(self.price[lo:hi], dtype=np.float64),
+            'volume': np.asarray(self.volume[lo:hi], dtype=np.float64),
+        }
+
+def _epoch_ns(value):
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return pd.Timestamp(value).value
+
+# Streaming export
+EXPORT_CHUNK_ROWS = 50_000
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'JSON': ('json', 'application/json'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+def iter_price_chunks(columns, start=None, end=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Yield [start, end) of store columns as DataFrames of at most `chunk_rows` rows.
+
+    The range is located by binary search and only one chunk is ever
+    materialized, however long the history is. An empty range still yields
+    one empty (typed) chunk so exports can write their header or schema.
+    """
+    timestamps = columns['timestamp']
+    lo, hi = TimeSeriesIndex(columns).bounds(start, end)
+    hi = max(hi, lo)
+
+    for offset in range(lo, hi, chunk_rows) or [lo]:
+        stop = min(offset + chunk_rows, hi)
+        yield pd.DataFrame({
+            'timestamp': np.asarray(timestamps[offset:stop]).view('datetime64[ns]'),
+            'price': columns['price'][offset:stop],
+            'volume': columns['volume'][offset:stop],
+        })
+
+class _ChunkSink:
+    """Minimal writable file that hands back whatever was written since the last drain"""
+
+    def __init__(self):
+        self.closed = False
+        self._parts = []
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+def stream_export(chunks, fmt):
+    """Serialize DataFrame chunks to CSV, JSON (array of records) or Parquet bytes, chunk by chunk"""
+    if fmt == 'CSV':
+        header = True
+        for chunk in chunks:
+            yield chunk.to_csv(index=False, header=header, date_format='%Y-%m-%dT%H:%M:%S').encode('utf-8')
+            header = False
+
+    elif fmt == 'JSON':
+        yield b'['
+        first = True
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            body = chunk.to_json(orient='records', date_format='iso', double_precision=15)[1:-1]
+            yield (body if first else ',' + body).encode('utf-8')
+            first = False
+        yield b']'
+
+    elif fmt == 'Parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        sink = _ChunkSink()
+        writer = None
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(sink, table.schema)
+            writer.write_table(table)
+            yield sink.drain()
+        if writer is not None:
+            writer.close()
+            yield sink.drain()
+
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+# Stand-in HTTP source for offline development
+def make_fixture_handler(df):
+    """Request handler serving `df` as JSON records at /prices (optional ?since=)"""
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path != '/prices':
+                self.send_error(404)
+                return
+
+            rows = df
+            since = parse_qs(url.query).get('since')
+            if since:
+                rows = df[df['timestamp'] > pd.Timestamp(since[0])]
+            records = rows.assign(timestamp=rows['timestamp'].dt.strftime('%Y-%m-%dT%H:%M:%S'))
+            payload = json.dumps(records.to_dict(orient='records')).encode('utf-8')
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FixtureHandler
+
+def start_fixture_server(df=None, host='127.0.0.1', port=0):
+    """Serve price data over HTTP in a background thread; returns (server, url)"""
+    if df is None:
+        df = SyntheticPriceProvider().fetch()
+    server = ThreadingHTTPServer((host, port), make_fixture_handler(normalize_price_frame(df)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}/prices"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kaspa price data utilities")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build-store', help='Refresh the on-disk price store')
+    build.add_argument('--force', action='store_true', help='Refresh even if the store is fresh')
+    build.add_argument('--full', action='store_true', help='Rewrite full history instead of appending')
+
+    snapshot = commands.add_parser('write-snapshot', help='Write provider data to a CSV/Parquet file')
+    snapshot.add_argument('path')
+
+    serve = commands.add_parser('serve-fixture', help='Serve a snapshot as a local HTTP source')
+    serve.add_argument('--snapshot', help='CSV/Parquet file to serve (default: synthetic data)')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+
+    args = parser.parse_args(argv)
+    settings = load_data_settings()
+
+    if args.command == 'build-store':
+        store = PriceStore(settings['store_path'])
+        meta = store.refresh(create_price_provider(settings), float(settings['max_age_seconds']),
+                             incremental=not args.full, force=args.force)
+        print(f"Store at {store.path}: {meta['rows']} rows, version {meta['version']}")
+    elif args.command == 'write-snapshot':
+        df = create_price_provider(settings).fetch()
+        if args.path.endswith('.parquet'):
+            df.to_parquet(args.path, index=False)
+        else:
+            df.to_csv(args.path, index=False)
+        print(f"Wrote {len(df)} rows to {args.path}")
+    else:
+        df = SnapshotPriceProvider(args.snapshot).fetch() if args.snapshot else None
+        server, url = start_fixture_server(df, args.host, args.port)
+        print(f"Serving price fixture at {url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+"""Live price feed for Kaspa Analytics Pro.
+
+One ingester thread per process subscribes to a price feed and writes ticks
+into a fixed-size ring buffer that every session reads, so the sidebar
+ticker and overview metrics update between store refreshes without each
+session opening its own connection. Feeds are pluggable: a replay of a
+local CSV/Parquet file (or a synthetic walk), or a websocket server such as
+`python kaspa_feed.py serve`.
+
+The feed is off unless enabled in config.yaml (or KASPA_PRICE_FEED): the
+default replay is a synthetic walk, not market data. websockets is an
+optional extra (`pip install websockets`), needed only by the websocket
+source and the stand-in server.
+
+Memory stays bounded end to end: the ring buffer overwrites its oldest
+ticks, and the websocket client holds at most `max_queue` unread messages -
+beyond that it stops reading and TCP flow control pushes back on the server.
+"""
+import argparse
+import atexit
+import importlib.util
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from kaspa_data import BASE_DIR, SnapshotPriceProvider, load_app_config
+
+# websockets is optional - only the websocket source and the stand-in server need it
+WEBSOCKETS_AVAILABLE = importlib.util.find_spec('websockets') is not None
+
+DEFAULT_FEED_SETTINGS = {
+    'enabled': False,
+    'source': 'replay',
+    'replay_path': None,
+    'replay_interval_seconds': 2,
+    'websocket_url': 'ws://127.0.0.1:8766',
+    'buffer_size': 10000,
+    'max_queue': 64,
+    'reconnect_max_seconds': 30,
+}
+FEED_SOURCES = ['replay', 'websocket']
+
+def load_feed_settings(app_config=None):
+    """price_feed block of config.yaml with defaults; KASPA_PRICE_FEED (off|on|replay|websocket) and KASPA_PRICE_FEED_URL override it"""
+    if app_config is None:
+        app_config = load_app_config()
+    settings = dict(DEFAULT_FEED_SETTINGS)
+    settings.update(app_config.get('price_feed') or {})
+
+    override = os.environ.get('KASPA_PRICE_FEED', '').lower()
+    if override in ('0', 'false', 'off', 'no'):
+        settings['enabled'] = False
+    elif override in ('1', 'true', 'on', 'yes'):
+        # Switched on with the configured source
+        settings['enabled'] = True
+    elif override:
+        settings['enabled'] = True
+        settings['source'] = override
+    if os.environ.get('KASPA_PRICE_FEED_URL'):
+        settings['websocket_url'] = os.environ['KASPA_PRICE_FEED_URL']
+
+    # Relative paths are resolved against the app directory, not the CWD
+    if settings['replay_path'] and not os.path.isabs(settings['replay_path']):
+        settings['replay_path'] = os.path.join(BASE_DIR, settings['replay_path'])
+    return settings
+
+# Wire format: one JSON object per message, {"timestamp": epoch seconds, "price": ..., "volume": ...}
+def encode_tick(timestamp_ns, price, volume):
+    return json.dumps({'timestamp': timestamp_ns / 1e9, 'price': price, 'volume': volume})
+
+def decode_tick(message):
+    """(epoch ns, price, volume) from a wire message; ISO timestamps are accepted too"""
+    data = json.loads(message)
+    timestamp = data['timestamp']
+    if isinstance(timestamp, str):
+        timestamp_ns = pd.Timestamp(timestamp).value
+    else:
+        timestamp_ns = int(float(timestamp) * 1e9)
+    return timestamp_ns, float(data['price']), float(data.get('volume', 0.0))
+
+class TickRingBuffer:
+    """The last `capacity` ticks as preallocated column arrays; appends overwrite the oldest.
+
+    Written by one ingester thread and read by every session, so both sides
+    take the lock - but only for a few array stores or one small copy.
+    """
+
+    def __init__(self, capacity=10000):
+        self.capacity = capacity
+        self.timestamp = np.zeros(capacity, dtype=np.int64)
+        self.price = np.zeros(capacity, dtype=np.float64)
+        self.volume = np.zeros(capacity, dtype=np.float64)
+        # Ticks ever written; the next slot is written % capacity
+        self.written = 0
+        self._lock = threading.Lock()
+
+    def append(self, timestamp_ns, price, volume=0.0):
+        with self._lock:
+            slot = self.written % self.capacity
+            self.timestamp[slot] = timestamp_ns
+            self.price[slot] = price
+            self.volume[slot] = volume
+            self.written += 1
+
+    def __len__(self):
+        return min(self.written, self.capacity)
+
+    @property
+    def dropped(self):
+        """Ticks overwritten so far - the buffer only keeps the last `capacity`"""
+        return max(self.written - self.capacity, 0)
+
+    def window(self, n=None):
+        """Copy of the last `n` ticks (default: all buffered), oldest first, as store-layout columns"""
+        with self._lock:
+            size = len(self)
+            n = size if n is None else min(n, size)
+            end = self.written % self.capacity
+            order = np.arange(end - n, end) % self.capacity
+            return {
+                'timestamp': self.timestamp[order],
+                'price': self.price[order],
+                'volume': self.volume[order],
+            }
+
+    def quote(self):
+        """Latest price with its change since the previous tick, or None before the first tick"""
+        with self._lock:
+            if not self.written:
+                return None
+            last = (self.written - 1) % self.capacity
+            previous = (self.written - 2) % self.capacity if self.written > 1 else last
+            price, previous_price = float(self.price[last]), float(self.price[previous])
+            timestamp = int(self.timestamp[last])
+        return {
+            'price': price,
+            'change_pct': (price / previous_price - 1) * 100 if previous_price else 0.0,
+            'timestamp': pd.Timestamp(timestamp),
+        }
+
+# Feeds
+class PriceFeed:
+    """Base class for tick sources"""
+    name = 'base'
+
+    def ticks(self, stop):
+        """Yield (epoch ns, price, volume) until the source ends or `stop` (threading.Event) is set"""
+        raise NotImplementedError
+
+def synthetic_tick_frame(n=1440, seed=7, base_price=0.1):
+    """A small seeded random walk to replay when no replay file is configured"""
+    rng = np.random.RandomState(seed)
+    prices = base_price * np.cumprod(1 + rng.normal(0, 0.002, n))
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=n, freq='min'),
+        'price': prices,
+        'volume': rng.lognormal(8, 1, n),
+    })
+
+class ReplayFeed(PriceFeed):
+    """Replays a price file's moves every `interval` seconds, stamped with the current time.
+
+    With an `anchor_price` the file's prices are rescaled so the replay starts
+    there (e.g. at the latest stored price); when looping, each pass continues
+    from the last replayed price instead of jumping back.
+    """
+    name = 'replay'
+
+    def __init__(self, frame=None, interval=2.0, anchor_price=None, loop=True):
+        frame = synthetic_tick_frame() if frame is None else frame
+        self.prices = frame['price'].to_numpy(dtype=np.float64)
+        self.volumes = frame['volume'].to_numpy(dtype=np.float64)
+        self.interval = interval
+        self.anchor_price = anchor_price
+        self.loop = loop
+
+    @classmethod
+    def from_path(cls, path, **kwargs):
+        return cls(SnapshotPriceProvider(path).fetch() if path else None, **kwargs)
+
+    def ticks(self, stop):
+        if not len(self.prices):
+            return
+        scale = self.anchor_price / self.prices[0] if self.anchor_price else 1.0
+        start = 0
+        while True:
+            for price, volume in zip(self.prices[start:], self.volumes[start:]):
+                yield time.time_ns(), float(price * scale), float(volume)
+                if stop.wait(self.interval):
+                    return
+            if not self.loop or len(self.prices) < 2:
+                return
+            # The next pass starts where this one ended (its first row is this tick)
+            scale = price * scale / self.prices[0]
+            start = 1
+
+class WebSocketFeed(PriceFeed):
+    """Ticks from a websocket server, one JSON message per tick"""
+    name = 'websocket'
+
+    def __init__(self, url, max_queue=64, open_timeout=10):
+        if not WEBSOCKETS_AVAILABLE:
+            raise ImportError("The websocket price feed needs the websockets package: pip install websockets")
+        self.url = url
+        self.max_queue = max_queue
+        self.open_timeout = open_timeout
+
+    def ticks(self, stop):
+        from websockets.sync.client import connect
+
+        with connect(self.url, open_timeout=self.open_timeout, max_queue=self.max_queue) as ws:
+            while not stop.is_set():
+                try:
+                    message = ws.recv(timeout=1)
+                except TimeoutError:
+                    continue
+                yield decode_tick(message)
+
+def create_price_feed(settings, anchor_price=None):
+    """Instantiate the feed named by settings['source']"""
+    source = settings['source']
+    if source == 'replay':
+        return ReplayFeed.from_path(settings['replay_path'],
+                                    interval=float(settings['replay_interval_seconds']),
+                                    anchor_price=anchor_price)
+    if source == 'websocket':
+        return WebSocketFeed(settings['websocket_url'], max_queue=int(settings['max_queue']))
+    raise ValueError(f"Unknown price feed source: {source} (expected one of {', '.join(FEED_SOURCES)})")
+
+class FeedIngester:
+    """Background thread copying ticks from a feed into a TickRingBuffer.
+
+    A dropped connection (or a feed that runs out) is retried with
+    exponential backoff up to `reconnect_max` seconds; the wait resets once
+    ticks flow again.
+    """
+
+    def __init__(self, feed, buffer, reconnect_max=30.0):
+        self.feed = feed
+        self.buffer = buffer
+        self.reconnect_max = reconnect_max
+        self.connected = False
+        self.connects = 0
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f'price-feed-{feed.name}', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self):
+        delay = 1.0
+        while not self._stop.is_set():
+            try:
+                self.connects += 1
+                for timestamp_ns, price, volume in self.feed.ticks(self._stop):
+                    self.connected = True
+                    self.buffer.append(timestamp_ns, price, volume)
+                    delay = 1.0
+            except Exception as e:
+                # Keep the thread alive; the next attempt may succeed
+                self.last_error = f"{type(e).__name__}: {e}"
+            finally:
+                # Disconnected however the attempt ended
+                self.connected = False
+            if self._stop.wait(delay):
+                break
+            delay = min(delay * 2, self.reconnect_max)
+
+    def stats(self):
+        """Connection state and buffer counters for status displays"""
+        return {
+            'source': self.feed.name,
+            'connected': self.connected,
+            'connects': self.connects,
+            'ticks': self.buffer.written,
+            'buffered': len(self.buffer),
+            'dropped': self.buffer.dropped,
+            'last_error': self.last_error,
+        }
+
+    def close(self, timeout=2.0):
+        self._stop.set()
+        self._thread.join(timeout)
+
+# Stand-in websocket source for offline development
+def start_feed_server(feed_factory=None, host='127.0.0.1', port=0):
+    """Serve a replay over websocket in a background thread; returns (server, url).
+
+    Every connection gets its own feed from `feed_factory()` (default: the
+    synthetic replay). Sends block while a client is not reading, so a slow
+    client slows its own replay rather than growing a queue.
+    """
+    from websockets.sync.server import serve
+
+    feed_factory = feed_factory or ReplayFeed
+
+    def handler(ws):
+        stop = threading.Event()
+        try:
+            for tick in feed_factory().ticks(stop):
+                ws.send(encode_tick(*tick))
+        except Exception:
+            # Client went away
+            pass
+        finally:
+            stop.set()
+
+    server = serve(handler, host, port)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"ws://{host}:{server.socket.getsockname()[1]}"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kaspa live price feed utilities")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve = commands.add_parser('serve', help='Replay a price file as a local websocket feed')
+    serve.add_argument('--replay', help='CSV/Parquet file to replay (default: synthetic walk)')
+    serve.add_argument('--interval', type=float, default=1.0, help='Seconds between ticks')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8766)
+
+    tail = commands.add_parser('tail', help='Print ticks from the configured feed')
+    tail.add_argument('--count', type=int, default=10)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        frame = SnapshotPriceProvider(args.replay).fetch() if args.replay else None
+        server, url = start_feed_server(lambda: ReplayFeed(frame, interval=args.interval), args.host, args.port)
+        print(f"Serving price feed at {url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.shutdown()
+    else:
+        feed = create_price_feed(load_feed_settings())
+        stop = threading.Event()
+        for i, (timestamp_ns, price, volume) in enumerate(feed.ticks(stop)):
+            print(f"{pd.Timestamp(timestamp_ns)}  {price:.6f}  {volume:,.0f}")
+            if i + 1 >= args.count:
+                stop.set()
+                break
+
+if __name__ == "__main__":
+    main()
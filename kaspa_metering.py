@@ -0,0 +1,203 @@
+"""Usage metering for Kaspa Analytics Pro.
+
+Metered requests only bump an in-memory counter; a background thread folds
+the counters into SQLite every few seconds, so a restart loses at most one
+flush interval. Periods are UTC days ('2026-10-18') or months ('2026-10').
+"""
+import atexit
+import sqlite3
+import threading
+import time
+
+USAGE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage_counters (
+    period TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    username TEXT NOT NULL,
+    tier TEXT,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (period, metric, username)
+);
+CREATE INDEX IF NOT EXISTS usage_top ON usage_counters (period, metric, count DESC);
+"""
+
+PERIOD_FORMATS = {'day': '%Y-%m-%d', 'month': '%Y-%m'}
+
+class UsageMeter:
+    """Per-user counters by (period, metric) with per-tier aggregates.
+
+    `record` and `try_consume` are a single locked dict update; the database
+    is only read the first time a user is seen in a period (to pick up the
+    persisted total) and written by the flush thread.
+    """
+
+    def __init__(self, pool=None, flush_interval=5.0, retention_days=90):
+        self.pool = pool
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self._pending = {}
+        self._flushed = {}
+        self._tiers = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._rollover_at = 0.0
+        self._periods = {}
+
+        if pool is not None:
+            with pool.connection() as conn:
+                conn.executescript(USAGE_SCHEMA)
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='usage-meter-flush', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _roll(self, now):
+        day = int(now // 86400)
+        start = time.gmtime(day * 86400)
+        self._periods = {name: time.strftime(fmt, start) for name, fmt in PERIOD_FORMATS.items()}
+        self._rollover_at = (day + 1) * 86400
+
+    def period(self, kind='day'):
+        """Current period key; recomputed only when the UTC day rolls over"""
+        now = time.time()
+        if now >= self._rollover_at:
+            self._roll(now)
+        return self._periods[kind]
+
+    def record(self, username, tier, metric='api_calls', period='day', n=1):
+        """Count `n` units of `metric` for `username` in the current period"""
+        # Hot path: the period check is inlined and the lock only guards one dict update
+        if time.time() >= self._rollover_at:
+            self._roll(time.time())
+        key = (self._periods[period], metric, username)
+        self._tiers[username] = tier
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + n
+
+    def used(self, username, metric='api_calls', period='day'):
+        """Units used in the current period, including counts not yet flushed"""
+        key = (self.period(period), metric, username)
+        if key not in self._flushed:
+            self._load(key)
+        return self._flushed.get(key, 0) + self._pending.get(key, 0)
+
+    def try_consume(self, username, tier, limit, metric='api_calls', period='day', n=1):
+        """Record usage unless it would exceed `limit` (0 = unlimited); returns False when over quota"""
+        key = (self.period(period), metric, username)
+        if key not in self._flushed:
+            self._load(key)
+        self._tiers[username] = tier
+        with self._lock:
+            used = self._flushed.get(key, 0) + self._pending.get(key, 0)
+            if limit and used + n > limit:
+                return False
+            self._pending[key] = self._pending.get(key, 0) + n
+            return True
+
+    def _load(self, key):
+        # Persisted total from earlier flushes (this process, a previous run, or another worker)
+        count = 0
+        if self.pool is not None:
+            with self.pool.connection() as conn:
+                row = conn.execute("SELECT count FROM usage_counters WHERE period = ? AND metric = ? AND username = ?",
+                                   key).fetchone()
+            count = row['count'] if row else 0
+        with self._lock:
+            self._flushed.setdefault(key, count)
+
+    def flush(self):
+        """Write pending counts to the database"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                for key, count in pending.items():
+                    self._flushed[key] = self._flushed.get(key, 0) + count
+            if not pending or self.pool is None:
+                self._prune()
+                return
+
+            rows = [(*key, self._tiers.get(key[2]), count) for key, count in pending.items()]
+            try:
+                with self.pool.transaction() as conn:
+                    conn.executemany(
+                        "INSERT INTO usage_counters (period, metric, username, tier, count) VALUES (?, ?, ?, ?, ?) "
+                        "ON CONFLICT (period, metric, username) DO UPDATE SET "
+                        "count = count + excluded.count, tier = excluded.tier",
+                        rows
+                    )
+                    totals = {key: conn.execute(
+                        "SELECT count FROM usage_counters WHERE period = ? AND metric = ? AND username = ?", key
+                    ).fetchone()['count'] for key in pending}
+            except sqlite3.Error:
+                # Keep the counts for the next attempt
+                with self._lock:
+                    for key, count in pending.items():
+                        self._pending[key] = self._pending.get(key, 0) + count
+                        self._flushed[key] -= count
+                return
+
+            # Persisted totals also include other workers' usage
+            with self._lock:
+                self._flushed.update(totals)
+            self._prune()
+
+    def _prune(self):
+        # Drop cached totals from periods that have rolled over
+        current = {self.period(kind) for kind in PERIOD_FORMATS}
+        with self._lock:
+            for key in [key for key in self._flushed if key[0] not in current]:
+                del self._flushed[key]
+
+    def _run(self):
+        last_day = None
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+            day = self.period('day')
+            if day != last_day and self.pool is not None:
+                self._expire()
+                last_day = day
+
+    def _expire(self):
+        cutoff = time.gmtime(time.time() - self.retention_days * 86400)
+        with self.pool.transaction() as conn:
+            conn.execute("DELETE FROM usage_counters WHERE (length(period) = 10 AND period < ?) "
+                         "OR (length(period) = 7 AND period < ?)",
+                         (time.strftime(PERIOD_FORMATS['day'], cutoff), time.strftime(PERIOD_FORMATS['month'], cutoff)))
+
+    def close(self):
+        """Stop the flush thread and write what is left"""
+        self._stop.set()
+        self.flush()
+
+    # Aggregates (pending counts are flushed first)
+    def top_consumers(self, metric='api_calls', period='day', limit=10):
+        """[(username, tier, count), ...] for the current period, heaviest users first"""
+        self.flush()
+        period_key = self.period(period)
+        if self.pool is None:
+            rows = [(key[2], self._tiers.get(key[2]), count) for key, count in list(self._flushed.items())
+                    if key[:2] == (period_key, metric)]
+            return sorted(rows, key=lambda row: row[2], reverse=True)[:limit]
+        with self.pool.connection() as conn:
+            rows = conn.execute("SELECT username, tier, count FROM usage_counters WHERE period = ? AND metric = ? "
+                                "ORDER BY count DESC LIMIT ?", (period_key, metric, limit)).fetchall()
+        return [(row['username'], row['tier'], row['count']) for row in rows]
+
+    def tier_totals(self, metric='api_calls', period='day'):
+        """{tier: {'users': n, 'count': total}} for the current period"""
+        self.flush()
+        period_key = self.period(period)
+        if self.pool is None:
+            rows = [(self._tiers.get(key[2]), 1, count) for key, count in list(self._flushed.items())
+                    if key[:2] == (period_key, metric)]
+        else:
+            with self.pool.connection() as conn:
+                rows = conn.execute("SELECT tier, COUNT(*), SUM(count) FROM usage_counters "
+                                    "WHERE period = ? AND metric = ? GROUP BY tier", (period_key, metric)).fetchall()
+        aggregates = {}
+        for tier, users, count in rows:
+            entry = aggregates.setdefault(tier or 'unknown', {'users': 0, 'count': 0})
+            entry['users'] += users
+            entry['count'] += count
+        return aggregates
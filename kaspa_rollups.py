@@ -0,0 +1,147 @@
+"""OHLCV rollups for Kaspa Analytics Pro.
+
+Price ticks are folded into bars at several fixed resolutions as they are
+appended, so a chart of any range can be served from a pre-aggregated level
+whose bar count fits the chart instead of re-aggregating raw history.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from kaspa_charts import DEFAULT_CHART_WIDTH_PX, chart_point_budget
+
+NS_PER_SECOND = 10**9
+RESOLUTIONS = {
+    '1m': 60 * NS_PER_SECOND,
+    '1h': 3_600 * NS_PER_SECOND,
+    '1d': 86_400 * NS_PER_SECOND,
+    '1w': 7 * 86_400 * NS_PER_SECOND,
+}
+# The epoch is a Thursday; weekly bars start on Monday
+BUCKET_OFFSETS = {'1w': 4 * 86_400 * NS_PER_SECOND}
+OHLCV_FIELDS = ['open', 'high', 'low', 'close', 'volume']
+# A candle needs a few pixels to stay readable
+PIXELS_PER_CANDLE = 4
+
+class OHLCVLevel:
+    """Append-only bars at one resolution, stored as growable column arrays"""
+
+    def __init__(self, resolution_ns, offset_ns=0, capacity=1024):
+        self.resolution = resolution_ns
+        self.offset = offset_ns
+        self.size = 0
+        self.timestamp = np.empty(capacity, dtype=np.int64)
+        self.fields = {name: np.empty(capacity, dtype=np.float64) for name in OHLCV_FIELDS}
+
+    def bucket(self, timestamps):
+        """Start of the bar each epoch-ns timestamp falls into"""
+        return timestamps - (timestamps - self.offset) % self.resolution
+
+    def _reserve(self, extra):
+        needed = self.size + extra
+        if needed <= len(self.timestamp):
+            return
+        capacity = max(needed, 2 * len(self.timestamp))
+        self.timestamp = np.resize(self.timestamp, capacity)
+        self.fields = {name: np.resize(values, capacity) for name, values in self.fields.items()}
+
+    def update(self, timestamps, prices, volumes):
+        """Fold sorted ticks (all at or after the last bar) into the level"""
+        buckets = self.bucket(timestamps)
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+        ends = np.concatenate((starts[1:], [len(buckets)]))
+
+        bars = {
+            'open': prices[starts],
+            'high': np.maximum.reduceat(prices, starts),
+            'low': np.minimum.reduceat(prices, starts),
+            'close': prices[ends - 1],
+            'volume': np.add.reduceat(volumes, starts),
+        }
+        bar_times = buckets[starts]
+
+        # The first group may continue the last stored bar
+        if self.size and bar_times[0] == self.timestamp[self.size - 1]:
+            last = self.size - 1
+            self.fields['high'][last] = max(self.fields['high'][last], bars['high'][0])
+            self.fields['low'][last] = min(self.fields['low'][last], bars['low'][0])
+            self.fields['close'][last] = bars['close'][0]
+            self.fields['volume'][last] += bars['volume'][0]
+            bar_times = bar_times[1:]
+            bars = {name: values[1:] for name, values in bars.items()}
+
+        n = len(bar_times)
+        self._reserve(n)
+        self.timestamp[self.size:self.size + n] = bar_times
+        for name, values in bars.items():
+            self.fields[name][self.size:self.size + n] = values
+        self.size += n
+
+    def bounds(self, start, end):
+        """Bar rows [lo, hi) of bars overlapping [start, end)"""
+        timestamps = self.timestamp[:self.size]
+        return (int(np.searchsorted(timestamps, self.bucket(start), side='left')),
+                int(np.searchsorted(timestamps, end, side='left')))
+
+    def frame(self, lo, hi):
+        """Copy of bars [lo, hi) - the last bar may still change in place"""
+        data = {'timestamp': self.timestamp[lo:hi].view('datetime64[ns]')}
+        data.update({name: values[lo:hi] for name, values in self.fields.items()})
+        return pd.DataFrame(data).copy()
+
+class RollupCube:
+    """OHLCV pyramid kept in step with an append-only tick history"""
+
+    def __init__(self, resolutions=tuple(RESOLUTIONS)):
+        self.resolutions = list(resolutions)
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.levels = {name: OHLCVLevel(RESOLUTIONS[name], BUCKET_OFFSETS.get(name, 0))
+                       for name in self.resolutions}
+        self.rows = 0
+        self.first_timestamp = None
+
+    def sync(self, columns):
+        """Fold in ticks appended to store `columns` since the last sync.
+
+        If the history shrank or its first tick changed, it was rewritten and
+        the cube is rebuilt.
+        """
+        timestamps = columns['timestamp']
+        with self._lock:
+            first = int(timestamps[0]) if len(timestamps) else None
+            if len(timestamps) < self.rows or (self.rows and first != self.first_timestamp):
+                self._reset()
+
+            if len(timestamps) > self.rows:
+                new_ts = np.asarray(timestamps[self.rows:], dtype=np.int64)
+                new_prices = np.asarray(columns['price'][self.rows:], dtype=np.float64)
+                new_volumes = np.asarray(columns['volume'][self.rows:], dtype=np.float64)
+                for level in self.levels.values():
+                    level.update(new_ts, new_prices, new_volumes)
+            self.rows = len(timestamps)
+            self.first_timestamp = first
+            return self
+
+    def select(self, start, end, width_px=DEFAULT_CHART_WIDTH_PX, resolution=None):
+        """Bars covering [start, end) (epoch ns) and the resolution they came from.
+
+        Unless a `resolution` is forced, the level giving the most bars that
+        still fit the chart width is used; levels that add no detail over a
+        coarser one (e.g. minute bars of daily data) lose the tie.
+        """
+        budget = chart_point_budget(width_px, 1 / PIXELS_PER_CANDLE)
+        with self._lock:
+            if resolution is None:
+                best = None
+                for name in reversed(self.resolutions):
+                    lo, hi = self.levels[name].bounds(start, end)
+                    if best is None or best[1] < hi - lo <= budget:
+                        best = (name, hi - lo, lo, hi)
+                resolution, _, lo, hi = best
+            else:
+                lo, hi = self.levels[resolution].bounds(start, end)
+            return self.levels[resolution].frame(lo, hi), resolution
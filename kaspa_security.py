@@ -0,0 +1,175 @@
+"""Login rate limiting and lockouts for Kaspa Analytics Pro.
+
+Token buckets cap how fast any one IP or username can submit passwords, and
+sliding-window failure counters lock a key out after repeated failures, so
+credential-stuffing bursts are turned away before they cost a bcrypt verify.
+"""
+import threading
+import time
+
+LOCKOUT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS login_lockouts (
+    key TEXT PRIMARY KEY,
+    locked_until REAL NOT NULL
+);
+"""
+
+class TokenBucket:
+    """`capacity` attempts back to back, refilled at `rate` per second"""
+    __slots__ = ('tokens', 'updated')
+
+    def __init__(self, capacity, now):
+        self.tokens = float(capacity)
+        self.updated = now
+
+    def take(self, capacity, rate, now):
+        """Spend one token; returns 0 if allowed, else seconds until one is available"""
+        self.tokens = min(capacity, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / rate
+
+    def is_full(self, capacity, rate, now):
+        return self.tokens + (now - self.updated) * rate >= capacity
+
+class SlidingWindowCounter:
+    """Events in the trailing `window` seconds, weighted from the current and previous fixed windows"""
+    __slots__ = ('start', 'current', 'previous')
+
+    def __init__(self, window, now):
+        self.start = now - now % window
+        self.current = 0
+        self.previous = 0
+
+    def _roll(self, window, now):
+        start = now - now % window
+        if start == self.start:
+            return
+        self.previous = self.current if start - self.start == window else 0
+        self.current = 0
+        self.start = start
+
+    def add(self, window, now):
+        self._roll(window, now)
+        self.current += 1
+
+    def count(self, window, now):
+        self._roll(window, now)
+        return self.previous * (1 - (now - self.start) / window) + self.current
+
+class LoginRateLimiter:
+    """Per-IP and per-username login throttling shared by every session in the process.
+
+    Lockouts are checked without taking the lock, so a key that is not locked
+    out only pays for one short critical section to spend a bucket token.
+    With a ConnectionPool, lockouts are also written to SQLite and reloaded on
+    start-up so a restart does not lift them.
+    """
+
+    def __init__(self, max_failed_attempts=5, lockout_seconds=1800, burst=10,
+                 attempts_per_minute=6, pool=None, max_keys=100_000):
+        self.max_failed_attempts = max_failed_attempts
+        self.lockout_seconds = lockout_seconds
+        self.burst = burst
+        self.rate = attempts_per_minute / 60
+        self.pool = pool
+        self.max_keys = max_keys
+        self._buckets = {}
+        self._failures = {}
+        self._lockouts = {}
+        self._lock = threading.Lock()
+
+        if pool is not None:
+            with pool.connection() as conn:
+                conn.executescript(LOCKOUT_SCHEMA)
+                rows = conn.execute("SELECT key, locked_until FROM login_lockouts WHERE locked_until > ?",
+                                    (time.time(),)).fetchall()
+            self._lockouts.update((row['key'], row['locked_until']) for row in rows)
+
+    @staticmethod
+    def keys(username, ip=None):
+        """Limiter keys for a login attempt; the IP is skipped when unknown"""
+        keys = [f"user:{(username or '').strip().lower()}"]
+        if ip:
+            keys.append(f"ip:{ip}")
+        return keys
+
+    def locked_for(self, keys, now=None):
+        """Seconds until every key's lockout has expired (0 if none is locked)"""
+        now = time.time() if now is None else now
+        return max([self._lockouts.get(key, 0) - now for key in keys] + [0.0])
+
+    def acquire(self, username, ip=None):
+        """Admit one password check: returns 0 if allowed, else seconds to wait"""
+        now = time.time()
+        keys = self.keys(username, ip)
+        wait = self.locked_for(keys, now)
+        if wait > 0:
+            return wait
+
+        with self._lock:
+            for key in keys:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = self._buckets[key] = TokenBucket(self.burst, now)
+                wait = max(wait, bucket.take(self.burst, self.rate, now))
+            if len(self._buckets) > self.max_keys:
+                self._sweep(now)
+        return wait
+
+    def record_failure(self, username, ip=None):
+        """Count a failed password; returns the lockout in seconds if one started"""
+        now = time.time()
+        locked = []
+        with self._lock:
+            for key in self.keys(username, ip):
+                counter = self._failures.get(key)
+                if counter is None:
+                    counter = self._failures[key] = SlidingWindowCounter(self.lockout_seconds, now)
+                counter.add(self.lockout_seconds, now)
+                if counter.count(self.lockout_seconds, now) >= self.max_failed_attempts:
+                    self._lockouts[key] = now + self.lockout_seconds
+                    del self._failures[key]
+                    locked.append(key)
+            if len(self._failures) > self.max_keys:
+                self._sweep(now)
+
+        if locked and self.pool is not None:
+            with self.pool.transaction() as conn:
+                conn.executemany("INSERT OR REPLACE INTO login_lockouts (key, locked_until) VALUES (?, ?)",
+                                 [(key, self._lockouts[key]) for key in locked])
+        return self.lockout_seconds if locked else 0.0
+
+    def record_success(self, username, ip=None):
+        """Forget the username's failures; the IP keeps its history"""
+        key = self.keys(username)[0]
+        with self._lock:
+            self._failures.pop(key, None)
+
+    def unlock(self, username):
+        """Lift a username lockout (admin action)"""
+        key = self.keys(username)[0]
+        with self._lock:
+            self._failures.pop(key, None)
+            self._lockouts.pop(key, None)
+        if self.pool is not None:
+            with self.pool.transaction() as conn:
+                conn.execute("DELETE FROM login_lockouts WHERE key = ?", (key,))
+
+    def active_lockouts(self):
+        """{key: seconds remaining} for current lockouts"""
+        now = time.time()
+        return {key: until - now for key, until in list(self._lockouts.items()) if until > now}
+
+    def _sweep(self, now):
+        # Under a flood of distinct keys, drop everything that carries no state
+        self._buckets = {key: bucket for key, bucket in self._buckets.items()
+                         if not bucket.is_full(self.burst, self.rate, now)}
+        self._failures = {key: counter for key, counter in self._failures.items()
+                          if counter.count(self.lockout_seconds, now) > 0}
+        self._lockouts = {key: until for key, until in self._lockouts.items() if until > now}
+        if self.pool is not None:
+            with self.pool.transaction() as conn:
+                conn.execute("DELETE FROM login_lockouts WHERE locked_until <= ?", (now,))
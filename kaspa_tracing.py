@@ -0,0 +1,214 @@
+"""Lightweight rerun tracing for Kaspa Analytics Pro.
+
+Named spans time the steps of one script run (data fetch, metrics, figure
+building, chart serialization); when the run ends its page, total time and
+per-span totals go into a bounded ring buffer that the admin panel turns
+into percentiles and a Prometheus text export. The export's _sum/_count are
+process-lifetime counters kept beside the buffer, so they only ever grow, as
+Prometheus summaries require. With tracing disabled a span
+is a shared no-op context manager, so instrumented code costs one attribute
+check.
+"""
+import collections
+import contextlib
+import functools
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_TRACING_SETTINGS = {
+    'enabled': True,
+    'buffer_size': 2000,
+    'textfile_path': None,
+    'textfile_interval_seconds': 15,
+}
+QUANTILES = [0.5, 0.95, 0.99]
+
+NULL_SPAN = contextlib.nullcontext()
+
+def load_tracing_settings(app_config):
+    """tracing block of config.yaml with defaults; KASPA_TRACING=0 turns it off"""
+    settings = dict(DEFAULT_TRACING_SETTINGS)
+    settings.update(app_config.get('tracing') or {})
+    if os.environ.get('KASPA_TRACING'):
+        settings['enabled'] = os.environ['KASPA_TRACING'].lower() not in ('0', 'false', 'off', 'no')
+    # Relative paths are resolved against the app directory, not the CWD
+    if settings['textfile_path'] and not os.path.isabs(settings['textfile_path']):
+        settings['textfile_path'] = os.path.join(BASE_DIR, settings['textfile_path'])
+    return settings
+
+class RunTrace:
+    """Timings of one script run; only touched by the thread running it"""
+    __slots__ = ('page', 'started', 'spans')
+
+    def __init__(self):
+        self.page = None
+        self.started = time.perf_counter()
+        self.spans = {}
+
+class Span:
+    __slots__ = ('run', 'name', 'started')
+
+    def __init__(self, run, name):
+        self.run = run
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.started
+        spans = self.run.spans
+        spans[self.name] = spans.get(self.name, 0.0) + elapsed
+        return False
+
+class Tracer:
+    """Per-run span timings kept in a ring buffer of the last `buffer_size` runs.
+
+    Each Streamlit session runs its script on its own thread, so the current
+    run lives in a thread-local; only finishing a run takes the lock.
+    """
+
+    def __init__(self, enabled=True, buffer_size=2000, textfile_path=None, textfile_interval=15.0):
+        self.enabled = enabled
+        self.buffer_size = buffer_size
+        self.textfile_path = textfile_path
+        self.textfile_interval = textfile_interval
+        self._runs = collections.deque(maxlen=buffer_size)
+        # {('page' | 'span', name): [count, seconds]} since process start - never trimmed or cleared
+        self._totals = collections.defaultdict(lambda: [0, 0.0])
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._textfile_due = 0.0
+
+    @contextlib.contextmanager
+    def _run(self, page):
+        run = self._local.run = RunTrace()
+        run.page = page
+        try:
+            yield run
+        finally:
+            self._local.run = None
+            if run.page is not None:
+                self.record(run.page, time.perf_counter() - run.started, run.spans)
+
+    def run(self, page=None):
+        """Context manager around one script run; runs that never set a page are dropped.
+
+        Inside a run already in progress (e.g. a fragment called during a full
+        script run) this is a no-op, so the time is counted once, by the outer run.
+        """
+        if not self.enabled or getattr(self._local, 'run', None) is not None:
+            return NULL_SPAN
+        return self._run(page)
+
+    def set_page(self, page):
+        """Name the page the current run rendered"""
+        run = getattr(self._local, 'run', None)
+        if run is not None:
+            run.page = page
+
+    def span(self, name):
+        """Time a block under `name`; outside a traced run (or disabled) this is a no-op"""
+        run = getattr(self._local, 'run', None) if self.enabled else None
+        if run is None:
+            return NULL_SPAN
+        return Span(run, name)
+
+    def traced(self, name):
+        """Decorator form of `span`"""
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def record(self, page, total, spans):
+        """Add one finished run to the ring buffer"""
+        with self._lock:
+            self._runs.append((time.time(), page, total, dict(spans)))
+            for key, seconds in [(('page', page), total), *((('span', name), value) for name, value in spans.items())]:
+                entry = self._totals[key]
+                entry[0] += 1
+                entry[1] += seconds
+        if self.textfile_path and time.time() >= self._textfile_due:
+            self._textfile_due = time.time() + self.textfile_interval
+            self.write_textfile(self.textfile_path)
+
+    def runs(self):
+        """Snapshot of buffered runs, oldest first: [(unix time, page, seconds, {span: seconds}), ...]"""
+        with self._lock:
+            return list(self._runs)
+
+    def clear(self):
+        """Drop the buffered runs (the percentiles); the cumulative export counters keep counting"""
+        with self._lock:
+            self._runs.clear()
+
+    def summary(self):
+        """({page: stats}, {span: stats}) where stats has count, sum and the QUANTILES in seconds"""
+        pages = collections.defaultdict(list)
+        spans = collections.defaultdict(list)
+        for _, page, total, run_spans in self.runs():
+            pages[page].append(total)
+            for name, seconds in run_spans.items():
+                spans[name].append(seconds)
+        return ({page: _stats(samples) for page, samples in sorted(pages.items())},
+                {name: _stats(samples) for name, samples in sorted(spans.items())})
+
+    def prometheus_text(self):
+        """Timings as Prometheus summaries (text exposition format).
+
+        Quantiles cover the buffered runs; _sum and _count are cumulative since
+        the process started.
+        """
+        page_stats, span_stats = self.summary()
+        with self._lock:
+            totals = {key: tuple(entry) for key, entry in self._totals.items()}
+        lines = []
+        for metric, label, stats, help_text in [
+            ('kaspa_page_render_seconds', 'page', page_stats, 'Script run time per page'),
+            ('kaspa_span_seconds', 'span', span_stats, 'Time per traced step within a script run'),
+        ]:
+            lines.append(f"# HELP {metric} {help_text} (quantiles over the last {self.buffer_size} runs)")
+            lines.append(f"# TYPE {metric} summary")
+            for (kind, key), (count, seconds) in sorted(totals.items()):
+                if kind != label:
+                    continue
+                value = _escape_label(key)
+                if key in stats:
+                    for quantile in QUANTILES:
+                        lines.append(f'{metric}{{{label}="{value}",quantile="{quantile}"}} {stats[key][quantile]:.6f}')
+                lines.append(f'{metric}_sum{{{label}="{value}"}} {seconds:.6f}')
+                lines.append(f'{metric}_count{{{label}="{value}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        """Atomically write the Prometheus text, e.g. for node_exporter's textfile collector"""
+        directory = os.path.dirname(os.path.abspath(path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as fh:
+                fh.write(self.prometheus_text())
+            os.replace(tmp_path, path)
+        except OSError:
+            # Metrics export must never break a page render
+            pass
+
+def _stats(samples):
+    values = np.asarray(samples)
+    stats = {'count': len(values), 'sum': float(values.sum())}
+    stats.update(zip(QUANTILES, np.quantile(values, QUANTILES).tolist()))
+    return stats
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
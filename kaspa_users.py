@@ -0,0 +1,434 @@
+"""User store for Kaspa Analytics Pro.
+
+SQLite (WAL mode) repository shared by every session and worker process,
+exposed to streamlit-authenticator as a lazy credentials mapping so no
+session ever holds a copy of the user table.
+"""
+import json
+import multiprocessing
+import os
+import queue
+import re
+import sqlite3
+import threading
+from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SUBSCRIPTION_TIERS = ['free', 'premium', 'pro']
+
+# Fields with their own column; anything else stauth stores goes in `extra`
+USER_FIELDS = ['email', 'first_name', 'last_name', 'password', 'subscription',
+               'failed_login_attempts', 'logged_in', 'created_at']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    email TEXT NOT NULL DEFAULT '',
+    email_key TEXT,
+    first_name TEXT,
+    last_name TEXT,
+    password TEXT,
+    subscription TEXT NOT NULL DEFAULT 'free',
+    failed_login_attempts INTEGER NOT NULL DEFAULT 0,
+    logged_in INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT,
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE UNIQUE INDEX IF NOT EXISTS users_email_key ON users(email_key) WHERE email_key IS NOT NULL;
+
+CREATE TABLE IF NOT EXISTS tier_counts (
+    subscription TEXT PRIMARY KEY,
+    users INTEGER NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS users_count_insert AFTER INSERT ON users BEGIN
+    INSERT OR IGNORE INTO tier_counts VALUES (NEW.subscription, 0);
+    UPDATE tier_counts SET users = users + 1 WHERE subscription = NEW.subscription;
+END;
+
+CREATE TRIGGER IF NOT EXISTS users_count_delete AFTER DELETE ON users BEGIN
+    UPDATE tier_counts SET users = users - 1 WHERE subscription = OLD.subscription;
+END;
+
+CREATE TABLE IF NOT EXISTS api_keys (
+    key_hash TEXT PRIMARY KEY,
+    username TEXT NOT NULL,
+    prefix TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    revoked_at TEXT
+);
+CREATE INDEX IF NOT EXISTS api_keys_username ON api_keys(username);
+
+CREATE TRIGGER IF NOT EXISTS users_delete_api_keys AFTER DELETE ON users BEGIN
+    DELETE FROM api_keys WHERE username = OLD.username;
+END;
+
+CREATE TRIGGER IF NOT EXISTS users_count_update AFTER UPDATE OF subscription ON users
+WHEN OLD.subscription IS NOT NEW.subscription BEGIN
+    UPDATE tier_counts SET users = users - 1 WHERE subscription = OLD.subscription;
+    INSERT OR IGNORE INTO tier_counts VALUES (NEW.subscription, 0);
+    UPDATE tier_counts SET users = users + 1 WHERE subscription = NEW.subscription;
+END;
+"""
+
+def normalize_username(username):
+    # streamlit-authenticator lowercases usernames on login
+    return (username or '').strip().lower()
+
+def normalize_email(email):
+    return (email or '').strip().lower()
+
+# Password hashing
+BCRYPT_HASH = re.compile(r'^\$2[aby]\$\d+\$.{53}$')
+
+def is_bcrypt_hash(value):
+    return isinstance(value, str) and bool(BCRYPT_HASH.match(value))
+
+def _bcrypt_hash(password):
+    import bcrypt
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+def _bcrypt_check(password, hashed_password):
+    import bcrypt
+    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+def _load_bcrypt():
+    import bcrypt
+
+class PasswordHasher:
+    """Pool of `max_workers` worker processes for bcrypt hashing and verification.
+
+    The bcrypt work runs outside the app process, so a signup or login burst
+    queues here and costs the server's script threads no CPU. Workers are
+    forked once, when the hasher is created: spawned workers would re-import
+    __main__, which under Streamlit is the app script itself. Where fork is
+    unavailable (Windows) the pool falls back to threads, which still hash
+    in parallel because bcrypt releases the GIL.
+    Values that are already bcrypt hashes are returned as-is, never re-hashed.
+    """
+
+    def __init__(self, max_workers=2):
+        self.max_workers = max_workers
+        if 'fork' in multiprocessing.get_all_start_methods():
+            self._executor = ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context('fork'))
+            # The first task forks every worker; do it now rather than inside someone's login
+            self._executor.submit(_load_bcrypt).result()
+        else:
+            self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix='bcrypt')
+
+    def hash(self, password):
+        if is_bcrypt_hash(password):
+            return password
+        return self._executor.submit(_bcrypt_hash, password).result()
+
+    def hash_many(self, passwords):
+        """Hash a batch in parallel across the pool, skipping existing hashes"""
+        futures = [None if is_bcrypt_hash(password) else self._executor.submit(_bcrypt_hash, password)
+                   for password in passwords]
+        return [password if future is None else future.result()
+                for password, future in zip(passwords, futures)]
+
+    def check(self, password, hashed_password):
+        return self._executor.submit(_bcrypt_check, password, hashed_password).result()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+def user_db_path(settings):
+    """Database path from the user_store settings (KASPA_USER_DB overrides), relative to the app directory"""
+    db_path = os.environ.get('KASPA_USER_DB') or settings.get('db_path', 'data/users.db')
+    if not os.path.isabs(db_path):
+        db_path = os.path.join(BASE_DIR, db_path)
+    return db_path
+
+class ConnectionPool:
+    """Bounded pool of SQLite connections shared across script threads"""
+
+    def __init__(self, path, size=4):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            conn = self._connect() if can_create else self._idle.get(timeout=30)
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    @contextmanager
+    def transaction(self):
+        """Connection inside BEGIN IMMEDIATE ... COMMIT (rolled back on error)"""
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+class UserRecord(dict):
+    """One user's credentials; item assignment writes through to the database"""
+
+    def __init__(self, store, username, data):
+        super().__init__(data)
+        self._store = store
+        self._username = username
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._store.update_field(self._username, key, value)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._store.update_field(self._username, key, None)
+
+class CredentialsMapping(MutableMapping):
+    """`credentials['usernames']` for streamlit-authenticator, backed by the store.
+
+    Lookups hit SQLite one user at a time; only iteration scans the table,
+    and the authenticator does that only for optional features.
+    """
+
+    def __init__(self, store):
+        self._store = store
+
+    def __getitem__(self, username):
+        record = self._store.get(username)
+        if record is None:
+            raise KeyError(username)
+        return record
+
+    def __setitem__(self, username, user_data):
+        self._store.upsert(username, user_data)
+
+    def __delitem__(self, username):
+        if not self._store.delete(username):
+            raise KeyError(username)
+
+    def __contains__(self, username):
+        return isinstance(username, str) and self._store.exists(username)
+
+    def __iter__(self):
+        return self._store.iter_usernames()
+
+    def __len__(self):
+        return self._store.count()
+
+class UserStore:
+    """SQLite user repository with username/email indexes and trigger-maintained tier counts"""
+
+    def __init__(self, path, pool_size=4):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.pool = ConnectionPool(path, pool_size)
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+
+    # Row conversion
+    @staticmethod
+    def _row_to_user(row):
+        user = {field: row[field] for field in USER_FIELDS}
+        user['logged_in'] = bool(user['logged_in'])
+        user.update(json.loads(row['extra'] or '{}'))
+        return user
+
+    @staticmethod
+    def _user_to_columns(user_data):
+        columns = {field: user_data.get(field) for field in USER_FIELDS}
+        columns['email'] = columns['email'] or ''
+        columns['email_key'] = normalize_email(columns['email']) or None
+        columns['subscription'] = columns['subscription'] or 'free'
+        columns['failed_login_attempts'] = int(columns['failed_login_attempts'] or 0)
+        columns['logged_in'] = int(bool(columns['logged_in']))
+        columns['extra'] = json.dumps({key: value for key, value in user_data.items() if key not in USER_FIELDS})
+        return columns
+
+    # Lookups
+    def get(self, username):
+        """UserRecord for `username`, or None"""
+        username = normalize_username(username)
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT * FROM users WHERE username = ?", (username,)).fetchone()
+        return UserRecord(self, username, self._row_to_user(row)) if row else None
+
+    def exists(self, username):
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT 1 FROM users WHERE username = ?",
+                                (normalize_username(username),)).fetchone() is not None
+
+    def email_exists(self, email):
+        return self.username_for_email(email) is not None
+
+    def username_for_email(self, email):
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT username FROM users WHERE email_key = ?",
+                               (normalize_email(email),)).fetchone()
+        return row['username'] if row else None
+
+    def iter_usernames(self, batch_size=500):
+        """All usernames in signup order, fetched in batches"""
+        last_rowid = 0
+        while True:
+            with self.pool.connection() as conn:
+                rows = conn.execute("SELECT rowid, username FROM users WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                                    (last_rowid, batch_size)).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield row['username']
+            last_rowid = rows[-1]['rowid']
+
+    def count(self):
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT COALESCE(SUM(users), 0) FROM tier_counts").fetchone()[0]
+
+    def tier_counts(self):
+        with self.pool.connection() as conn:
+            return {row['subscription']: row['users'] for row in conn.execute("SELECT * FROM tier_counts")}
+
+    def page(self, page_number, page_size):
+        """(username, user_info) pairs for a 1-based page, in signup order"""
+        with self.pool.connection() as conn:
+            rows = conn.execute("SELECT * FROM users ORDER BY rowid LIMIT ? OFFSET ?",
+                                (page_size, (page_number - 1) * page_size)).fetchall()
+        return [(row['username'], self._row_to_user(row)) for row in rows]
+
+    # Writes
+    def add_user(self, username, email, first_name, last_name, hashed_password, subscription='free'):
+        """Insert a user; False if the username or email is already taken"""
+        try:
+            self._insert(username, {
+                'email': email,
+                'first_name': first_name,
+                'last_name': last_name,
+                'password': hashed_password,
+                'subscription': subscription,
+                'failed_login_attempts': 0,
+                'logged_in': False,
+                'created_at': datetime.now().isoformat()
+            })
+            return True
+        except sqlite3.IntegrityError:
+            return False
+
+    def upsert(self, username, user_data):
+        """Insert or replace a full user record (used by the authenticator)"""
+        columns = self._user_to_columns(user_data)
+        assignments = ', '.join(f"{name} = excluded.{name}" for name in columns)
+        with self.pool.transaction() as conn:
+            conn.execute(
+                f"INSERT INTO users (username, {', '.join(columns)}) VALUES (?{', ?' * len(columns)}) "
+                f"ON CONFLICT(username) DO UPDATE SET {assignments}",
+                (normalize_username(username), *columns.values())
+            )
+
+    def update_field(self, username, key, value):
+        """Persist one field of a user record"""
+        username = normalize_username(username)
+        with self.pool.transaction() as conn:
+            if key == 'email':
+                conn.execute("UPDATE users SET email = ?, email_key = ? WHERE username = ?",
+                             (value or '', normalize_email(value) or None, username))
+            elif key == 'logged_in':
+                conn.execute("UPDATE users SET logged_in = ? WHERE username = ?", (int(bool(value)), username))
+            elif key in USER_FIELDS:
+                conn.execute(f"UPDATE users SET {key} = ? WHERE username = ?", (value, username))
+            else:
+                row = conn.execute("SELECT extra FROM users WHERE username = ?", (username,)).fetchone()
+                if row is None:
+                    return
+                extra = json.loads(row['extra'] or '{}')
+                if value is None:
+                    extra.pop(key, None)
+                else:
+                    extra[key] = value
+                conn.execute("UPDATE users SET extra = ? WHERE username = ?", (json.dumps(extra), username))
+
+    def update_subscription(self, username, new_subscription):
+        """Move a user to another tier (tier counters follow via trigger)"""
+        with self.pool.transaction() as conn:
+            cursor = conn.execute("UPDATE users SET subscription = ? WHERE username = ?",
+                                  (new_subscription, normalize_username(username)))
+            return cursor.rowcount > 0
+
+    def delete(self, username):
+        with self.pool.transaction() as conn:
+            return conn.execute("DELETE FROM users WHERE username = ?",
+                                (normalize_username(username),)).rowcount > 0
+
+    def seed(self, usernames, hash_passwords):
+        """Insert users that don't exist yet, hashing their plain-text passwords in one batch"""
+        missing = {username: dict(user_info) for username, user_info in usernames.items()
+                   if not self.exists(username)}
+        hashed = hash_passwords([user_data['password'] for user_data in missing.values()])
+
+        for (username, user_data), password in zip(missing.items(), hashed):
+            user_data['password'] = password
+            user_data.setdefault('created_at', datetime.now().isoformat())
+            try:
+                self._insert(username, user_data)
+            except sqlite3.IntegrityError:
+                pass  # Another worker seeded it first
+
+    def _insert(self, username, user_data):
+        columns = self._user_to_columns(user_data)
+        with self.pool.transaction() as conn:
+            conn.execute(
+                f"INSERT INTO users (username, {', '.join(columns)}) VALUES (?{', ?' * len(columns)})",
+                (normalize_username(username), *columns.values())
+            )
+
+    # API keys - only a hash of each key is stored, so a key is shown once and revoked on its own
+    def add_api_key(self, username, key_hash, prefix):
+        with self.pool.transaction() as conn:
+            conn.execute("INSERT INTO api_keys (key_hash, username, prefix, created_at) VALUES (?, ?, ?, ?)",
+                         (key_hash, normalize_username(username), prefix, datetime.now().isoformat()))
+
+    def username_for_api_key(self, key_hash):
+        """Owner of an active (unrevoked) key, or None"""
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT username FROM api_keys WHERE key_hash = ? AND revoked_at IS NULL",
+                               (key_hash,)).fetchone()
+        return row['username'] if row else None
+
+    def api_keys(self, username):
+        """A user's active keys, oldest first: [{'key_hash', 'prefix', 'created_at'}, ...]"""
+        with self.pool.connection() as conn:
+            rows = conn.execute("SELECT key_hash, prefix, created_at FROM api_keys "
+                                "WHERE username = ? AND revoked_at IS NULL ORDER BY created_at",
+                                (normalize_username(username),)).fetchall()
+        return [dict(row) for row in rows]
+
+    def revoke_api_key(self, username, key_hash):
+        """Revoke one of a user's keys; False if it was not an active key of theirs"""
+        with self.pool.transaction() as conn:
+            return conn.execute("UPDATE api_keys SET revoked_at = ? "
+                                "WHERE key_hash = ? AND username = ? AND revoked_at IS NULL",
+                                (datetime.now().isoformat(), key_hash, normalize_username(username))).rowcount > 0
+
+    def credentials(self):
+        """Lazy `usernames` mapping for stauth.Authenticate"""
+        return CredentialsMapping(self)
@@ -1,28 +1,38 @@
 import streamlit as st
 import streamlit_antd_components as sac
-import streamlit_authenticator as stauth
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import yaml
-from yaml.loader import SafeLoader
 import os
+import time
+import functools
+import importlib.util
+import tempfile
+
+# streamlit-authenticator (kaspa_auth), kaspa_api, kaspa_rollups and kaspa_network are imported
+# where they are first needed, so a public visitor's cold start skips them
+from kaspa_analytics import (IncrementalPowerLaw, IndicatorContext, days_since_genesis,
+                             rolling_power_law, technical_summary)
+from kaspa_charts import DEFAULT_CHART_WIDTH_PX, FigureTemplate, downsample_for_chart
+from kaspa_users import SUBSCRIPTION_TIERS, PasswordHasher, UserStore, user_db_path
+from kaspa_metering import UsageMeter
+from kaspa_security import LoginRateLimiter
+from kaspa_tracing import Tracer, load_tracing_settings
+from kaspa_feed import FeedIngester, TickRingBuffer, create_price_feed, load_feed_settings
+from kaspa_data import (EXPORT_FORMATS, STORE_DTYPES, TIME_RANGE_DAYS, CompactPriceHistory, PriceStore,
+                        compute_price_metrics, create_price_provider, get_tier_limits, iter_price_chunks,
+                        load_app_config, load_data_settings, price_columns, stream_export)
 
 # Try to import Plotly, fallback to basic charts if not available
+# (plotly.graph_objects loads its figure classes on first use)
 try:
     import plotly.graph_objects as go
-    import plotly.express as px
+    from plotly.subplots import make_subplots
     PLOTLY_AVAILABLE = True
 except ImportError:
     PLOTLY_AVAILABLE = False
     st.warning("📊 Plotly not installed. Using basic charts. Install with: pip install plotly")
 
-try:
-    import requests
-    REQUESTS_AVAILABLE = True
-except ImportError:
-    REQUESTS_AVAILABLE = False
-
 # Configure page settings
 st.set_page_config(
     page_title="Kaspa Analytics Pro",
@@ -32,8 +42,9 @@ st.set_page_config(
 )
 
 # Authentication configuration with API key - EMBEDDED VERSION
+@st.cache_resource
 def get_auth_config():
-    """Get authentication configuration - embedded for Streamlit Cloud"""
+    """Get authentication configuration - embedded for Streamlit Cloud, built once per process (read-only)"""
     config = {
         'credentials': {
             'usernames': {
@@ -91,84 +102,146 @@ def get_auth_config():
     }
     return config
 
-# Simple config management functions for Streamlit Cloud
+# User management - accounts live in a SQLite store shared by all sessions and workers
+@st.cache_resource
+def get_app_config():
+    """config.yaml, parsed once per process"""
+    return load_app_config()
+
+APP_CONFIG = get_app_config()
+USER_STORE_SETTINGS = APP_CONFIG.get('user_store') or {}
+
+# Rerun tracing - per-page and per-step timings for the admin Performance tab
+@st.cache_resource
+def get_tracer():
+    """Process-wide span tracer holding the most recent script runs"""
+    settings = load_tracing_settings(APP_CONFIG)
+    return Tracer(
+        enabled=bool(settings['enabled']),
+        buffer_size=int(settings['buffer_size']),
+        textfile_path=settings['textfile_path'],
+        textfile_interval=float(settings['textfile_interval_seconds'])
+    )
+
+tracer = get_tracer()
+
+# Live updates - panels rerun as st.fragment units on their own schedule (live_updates block of config.yaml)
+LIVE_UPDATE_SETTINGS = APP_CONFIG.get('live_updates') or {}
+
+def refresh_interval(name, default):
+    """Seconds between automatic reruns of a panel, or None to refresh only with the page"""
+    seconds = float(LIVE_UPDATE_SETTINGS.get(f'{name}_seconds', default) or 0)
+    return seconds if seconds > 0 else None
+
+def live_fragment(name, default_interval=None):
+    """Run a panel as an st.fragment: its widgets and timer rerun just the panel.
+    
+    Fragment-only reruns are traced as page "fragment/<name>"; during a full
+    script run the panel's time counts towards the page as usual.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def traced(*args, **kwargs):
+            with tracer.run(f"fragment/{name}"):
+                return fn(*args, **kwargs)
+        return st.fragment(traced, run_every=refresh_interval(name, default_interval))
+    return decorate
+
+def render_plotly_chart(fig, **kwargs):
+    """st.plotly_chart, timed as the chart.serialize span (figure to JSON and out)"""
+    with tracer.span('chart.serialize'):
+        st.plotly_chart(fig, **kwargs)
+
+@st.cache_resource
+def get_password_hasher():
+    """Process-wide bcrypt worker pool, also used for the authenticator's checks"""
+    return PasswordHasher(max_workers=int(USER_STORE_SETTINGS.get('hash_workers', 2)))
+
+def hash_password(password):
+    """Hash a password (bcrypt, same as streamlit-authenticator) off the script thread"""
+    return get_password_hasher().hash(password)
+
+@st.cache_resource
+def get_user_store():
+    """Process-wide user store, seeded with the embedded demo accounts on first use"""
+    user_store = UserStore(user_db_path(USER_STORE_SETTINGS), pool_size=int(USER_STORE_SETTINGS.get('pool_size', 4)))
+    user_store.seed(get_auth_config()['credentials']['usernames'], get_password_hasher().hash_many)
+    return user_store
+
 def add_new_user_to_config(username, email, first_name, last_name, password, subscription='free'):
-    """Add new user to session state config with proper password hashing"""
-    if 'config' not in st.session_state:
-        st.session_state.config = get_auth_config()
-    
-    if username not in st.session_state.config['credentials']['usernames']:
-        # Hash the password using the same method as streamlit-authenticator
-        import bcrypt
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-        
-        st.session_state.config['credentials']['usernames'][username] = {
-            'email': email,
-            'first_name': first_name,
-            'last_name': last_name,
-            'password': hashed_password,  # Store hashed password
-            'subscription': subscription,
-            'failed_login_attempts': 0,
-            'logged_in': False,
-            'created_at': datetime.now().isoformat()
-        }
-        
-        # Also update the global config variable
-        global config
-        config = st.session_state.config
-        
-        return True
+    """Add new user to the shared user store with proper password hashing"""
+    user_store = get_user_store()
+    
+    if not user_store.exists(username) and not user_store.email_exists(email):
+        return user_store.add_user(username, email, first_name, last_name, hash_password(password), subscription)
     return False
 
 def update_user_subscription_in_config(username, new_subscription):
-    """Update user subscription in session state"""
-    if 'config' not in st.session_state:
-        st.session_state.config = get_auth_config()
-    
-    if username in st.session_state.config['credentials']['usernames']:
-        st.session_state.config['credentials']['usernames'][username]['subscription'] = new_subscription
-        return True
-    return False
+    """Update user subscription in the shared user store"""
+    return get_user_store().update_subscription(username, new_subscription)
+
+# Login throttling - security block of config.yaml
+SECURITY_SETTINGS = APP_CONFIG.get('security') or {}
+
+@st.cache_resource
+def get_login_limiter():
+    """Process-wide per-IP/per-username login limiter; lockouts optionally kept in the user database"""
+    return LoginRateLimiter(
+        max_failed_attempts=int(SECURITY_SETTINGS.get('max_failed_attempts', 5)),
+        lockout_seconds=float(SECURITY_SETTINGS.get('lockout_duration_minutes', 30)) * 60,
+        burst=int(SECURITY_SETTINGS.get('login_burst', 10)),
+        attempts_per_minute=float(SECURITY_SETTINGS.get('login_attempts_per_minute', 6)),
+        pool=get_user_store().pool if SECURITY_SETTINGS.get('persist_lockouts') else None
+    )
+
+def get_client_ip():
+    """Client address as seen by Streamlit (None when unknown, e.g. in tests)"""
+    return getattr(st.context, 'ip_address', None)
 
 # Initialize configuration
-if 'config' not in st.session_state:
-    st.session_state.config = get_auth_config()
-
-config = st.session_state.config
-
-# Initialize authenticator (without API key for compatibility)
-authenticator = stauth.Authenticate(
-    config['credentials'],
-    config['cookie']['name'],
-    config['cookie']['key'],
-    config['cookie']['expiry_days'],
-    config['preauthorized'],
-    auto_hash=True
-)
+config = get_auth_config()
 
-# Save config function - Streamlit Cloud version
-def save_config():
-    """Save configuration changes to session state (Streamlit Cloud compatible)"""
-    try:
-        # In Streamlit Cloud, we save to session state since we can't write files
-        # In production with persistent storage, you'd write to a database or file
-        
-        # For demo purposes, we just update the session state
-        if 'config' in st.session_state:
-            # Update the global config variable
-            global config
-            config = st.session_state.config
-            
-            # Show success message
-            st.success("✅ Configuration updated in session!")
-            return True
-        return False
-    except Exception as e:
-        st.error(f"Error saving config: {e}")
-        return False
+# Session keys streamlit-authenticator expects; the logout button deletes some of them
+AUTH_SESSION_KEYS = ['name', 'authentication_status', 'username', 'email', 'roles', 'logout']
+
+@st.cache_resource
+def get_authentication_controller():
+    """Process-wide login/registration logic over a lazy view of the user store"""
+    from kaspa_auth import RateLimitedAuthenticationController, route_hashing
+    
+    # Route streamlit-authenticator's hash/verify through the shared pool
+    route_hashing(get_password_hasher())
+    credentials = {'usernames': {}}
+    controller = RateLimitedAuthenticationController(
+        credentials,
+        config['preauthorized'],
+        auto_hash=False,
+        secret_key=config['cookie']['key'],
+        limiter=get_login_limiter(),
+        client_ip=get_client_ip
+    )
+    credentials['usernames'] = get_user_store().credentials()
+    return controller
+
+def get_authenticator():
+    """This session's authenticator: its own cookie state, the shared controller for everything else.
+    
+    Built on first use (login page, logout) rather than on every visitor's first run.
+    """
+    if 'authenticator' not in st.session_state:
+        from kaspa_auth import create_authenticator
+        st.session_state['authenticator'] = create_authenticator(
+            config['cookie'], config['preauthorized'], get_authentication_controller())
+    return st.session_state['authenticator']
+
+for key in AUTH_SESSION_KEYS:
+    st.session_state.setdefault(key, None)
 
 # Custom CSS for Kaspa theme
-st.markdown("""
+@st.cache_resource
+def get_theme_css():
+    """Theme stylesheet, built once per process and re-sent on each run"""
+    return """
 <style>
 .main-header {
     background: linear-gradient(135deg, #70C7BA 0%, #49A097 100%);
@@ -268,45 +341,267 @@ st.markdown("""
     text-align: center;
 }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+st.markdown(get_theme_css(), unsafe_allow_html=True)
+
+# Data fetching functions - providers and the shared store live in kaspa_data
+PUBLIC_RETENTION_DAYS = 7
+
+@st.cache_resource
+def get_data_settings():
+    """data_source settings from the already-parsed config.yaml"""
+    return load_data_settings(app_config=get_app_config())
+
+DATA_SETTINGS = get_data_settings()
+
+@st.cache_resource
+def get_price_provider():
+    """Market data provider selected in config.yaml (one per process)"""
+    return create_price_provider(DATA_SETTINGS)
+
+@st.cache_resource
+def get_price_store():
+    """Memory-mapped on-disk price store shared by all workers on this host"""
+    return PriceStore(DATA_SETTINGS['store_path'])
+
+@st.cache_data(ttl=300, show_spinner=False)
+def refresh_price_data():
+    """Incrementally refresh the shared store at most once per TTL; returns the data version"""
+    try:
+        meta = get_price_store().refresh(get_price_provider(), float(DATA_SETTINGS['max_age_seconds']))
+        return meta['version']
+    except OSError:
+        # Read-only filesystem - read straight from the provider, one version per TTL window
+        return f"live-{int(time.time() // 300)}"
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_price_history(version):
+    """Compact read-only history for a data version, shared by every session without copying"""
+    if isinstance(version, str):
+        columns = price_columns(get_price_provider().fetch())
+    else:
+        columns = get_price_store().columns() or {name: np.empty(0, dtype) for name, dtype in STORE_DTYPES.items()}
+    return CompactPriceHistory.from_columns(columns)
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_price_data(version):
+    """Price history for a data version as one shared float64 DataFrame decoded from the compact history - do not mutate"""
+    return get_price_history(version).frame()
+
+def get_price_columns(version):
+    """Full-precision column arrays for a data version - zero-copy memory maps when the store is in use"""
+    if isinstance(version, str):
+        return get_price_history(version).window()
+    return get_price_store().columns()
+
+def get_price_index(version):
+    """Range-query index for a data version (the compact history binary-searches its own timestamps)"""
+    return get_price_history(version)
+
+def get_retention_days(subscription_level):
+    """How far back a tier may look (0 = unlimited); public visitors get the last week"""
+    if subscription_level == 'public':
+        return PUBLIC_RETENTION_DAYS
+    return get_tier_limits(APP_CONFIG, subscription_level).get('data_retention_days', 0)
+
+def select_time_range(index, retention_days, key, default='7D'):
+    """Time-range picker limited to the tier's retention; returns (start, end) in epoch ns, end exclusive"""
+    floor = index.retention_start(retention_days)
+    options = [label for label, days in TIME_RANGE_DAYS.items()
+               if days is None or not retention_days or days <= retention_days]
+    options.append('Custom')
+    
+    time_range = st.selectbox("Time Range", options, index=options.index(default) if default in options else 0, key=key)
+    if time_range != 'Custom':
+        return index.trailing(TIME_RANGE_DAYS[time_range], floor)
+    
+    first_day = pd.Timestamp(floor).date()
+    last_day = pd.Timestamp(index.end - 1).date()
+    days = st.date_input("Custom Range", value=(max(first_day, last_day - timedelta(days=30)), last_day),
+                         min_value=first_day, max_value=last_day, key=f"{key}_custom")
+    start_day, end_day = (days[0], days[-1]) if days else (first_day, last_day)
+    return max(pd.Timestamp(start_day).value, floor), min(pd.Timestamp(end_day + timedelta(days=1)).value, index.end)
+
+# Page widths offered in the sidebar; the server can't measure the browser's
+CHART_WIDTH_OPTIONS_PX = [800, 1200, DEFAULT_CHART_WIDTH_PX, 2560]
+
+def chart_width_px(columns=1):
+    """CSS width of a chart in one of `columns` side-by-side columns, from the sidebar's chart width"""
+    return st.session_state.get('chart_width_px', DEFAULT_CHART_WIDTH_PX) // columns
 
-# Data fetching functions (same as before)
-@st.cache_data(ttl=300)
 def fetch_kaspa_price_data():
     """Fetch Kaspa price data"""
     try:
-        dates = pd.date_range(start='2022-01-01', end=datetime.now(), freq='D')
+        with tracer.span('data.fetch'):
+            return load_price_data(refresh_price_data())
         
-        np.random.seed(42)
-        base_price = 0.02
-        prices = []
-        current_price = base_price
-        
-        for i in range(len(dates)):
-            trend = 0.001 * np.sin(i / 50) + 0.0005
-            volatility = np.random.normal(0, 0.05)
-            current_price *= (1 + trend + volatility)
-            prices.append(max(current_price, 0.001))
+    except Exception as e:
+        st.error(f"Error fetching data: {e}")
+        return pd.DataFrame()
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_price_metrics_snapshot(version):
+    """Precomputed window aggregates, shared by all sessions for one data version"""
+    return compute_price_metrics(load_price_data(version))
+
+def get_price_metrics():
+    """Current price metrics snapshot (read-only), or None if no data is available"""
+    try:
+        with tracer.span('data.metrics'):
+            return get_price_metrics_snapshot(refresh_price_data())
         
-        volumes = np.random.lognormal(15, 1, len(dates))
+    except Exception as e:
+        st.error(f"Error fetching data: {e}")
+        return None
+
+@st.cache_resource
+def get_power_law_tracker():
+    """Process-wide power-law fit that advances as rows are appended"""
+    return IncrementalPowerLaw()
+
+@st.cache_resource
+def get_rollup_cube():
+    """Process-wide OHLCV pyramid (1m/1h/1d/1w) that advances as rows are appended"""
+    from kaspa_rollups import RollupCube
+    return RollupCube()
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_rollup_snapshot(version):
+    """Rollup cube synced to a data version"""
+    return get_rollup_cube().sync(get_price_columns(version))
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_power_law_snapshot(version):
+    """Power-law fit for a data version, folded in from the previous version's fit"""
+    df = load_price_data(version)
+    if df.empty:
+        return None
+    return get_power_law_tracker().sync(df)
+
+def get_power_law_fit():
+    """Current power-law fit (read-only), or None if no data is available"""
+    try:
+        with tracer.span('data.power_law'):
+            fit = get_power_law_snapshot(refresh_price_data())
+        return fit if fit is not None and fit.is_ready else None
         
-        df = pd.DataFrame({
-            'timestamp': dates,
-            'price': prices,
-            'volume': volumes
-        })
+    except Exception as e:
+        st.error(f"Error fitting power law: {e}")
+        return None
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def get_rolling_power_law(version, window):
+    """Rolling re-fit of the power law, cached per data version and window"""
+    df = load_price_data(version)
+    return rolling_power_law(df['timestamp'], df['price'], window)
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_indicator_context(version):
+    """Shared indicator intermediates for a data version; results are memoized per parameters"""
+    df = load_price_data(version)
+    return IndicatorContext(df['price'], df['volume'])
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_technical_summary_snapshot(version):
+    return technical_summary(get_indicator_context(version))
+
+def get_technical_summary():
+    """Latest RSI/MACD/support/resistance, or None if no data is available"""
+    try:
+        return get_technical_summary_snapshot(refresh_price_data())
         
-        return df
+    except Exception as e:
+        st.error(f"Error computing indicators: {e}")
+        return None
+
+# Live price feed - one subscription per process, shared by every session (price_feed block of config.yaml)
+FEED_SETTINGS = load_feed_settings(APP_CONFIG)
+
+@st.cache_resource
+def get_feed_ingester():
+    """Process-wide feed ingester writing ticks into a shared ring buffer, or None if the feed is off"""
+    if not FEED_SETTINGS['enabled']:
+        return None
+    # A replay picks up from the latest stored price
+    metrics = get_price_metrics_snapshot(refresh_price_data())
+    feed = create_price_feed(FEED_SETTINGS, anchor_price=metrics['current_price'] if metrics else None)
+    return FeedIngester(feed, TickRingBuffer(int(FEED_SETTINGS['buffer_size'])),
+                        reconnect_max=float(FEED_SETTINGS['reconnect_max_seconds']))
+
+# Network metrics - hourly/daily rollups of block statistics (network_metrics block of config.yaml)
+@st.cache_resource
+def get_network_settings():
+    from kaspa_network import load_network_settings
+    return load_network_settings(app_config=get_app_config())
+
+@st.cache_resource
+def get_network_store():
+    """On-disk rollup store shared by all workers on this host"""
+    from kaspa_network import NetworkStore
+    return NetworkStore(get_network_settings()['store_path'])
+
+@st.cache_resource
+def get_network_refresher():
+    """Process-wide thread folding new blocks into the shared rollups, so no request waits on a build.
+
+    Started by the first premium page that reads network metrics, never on a
+    public visitor's run; `python kaspa_network.py build-store` pre-builds the
+    rollups from a separate process.
+    """
+    from kaspa_network import RollupRefresher, create_block_source
+    settings = get_network_settings()
+    return RollupRefresher(get_network_store(), create_block_source(settings), float(settings['max_age_seconds']))
+
+def current_network_version():
+    """Version of the published rollups, or None until the first build has finished"""
+    get_network_refresher()
+    meta = get_network_store().read_meta()
+    return meta['version'] if meta else None
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_network_snapshot(version):
+    """({'1h': frame, '1d': frame}, 24h summary) for a rollup version, shared by all sessions - do not mutate"""
+    from kaspa_network import network_summary, rollup_frame
+    rollups = get_network_store().columns()
+    return {name: rollup_frame(columns) for name, columns in rollups.items()}, network_summary(rollups)
+
+def get_network_metrics():
+    """Current (rollup frames, summary), or (None, None) if no network data is available (yet)"""
+    try:
+        with tracer.span('data.network'):
+            version = current_network_version()
+            return get_network_snapshot(version) if version is not None else (None, None)
         
     except Exception as e:
-        st.error(f"Error fetching data: {e}")
-        return pd.DataFrame()
+        st.error(f"Error loading network metrics: {e}")
+        return None, None
+
+# Export quota tracking (process-wide, per user and calendar month)
+@st.cache_resource
+def get_usage_meter():
+    """Process-wide usage counters, flushed to the user database in the background"""
+    settings = APP_CONFIG.get('metering') or {}
+    return UsageMeter(
+        get_user_store().pool,
+        flush_interval=float(settings.get('flush_interval_seconds', 5)),
+        retention_days=int(settings.get('retention_days', 90))
+    )
+
+def get_export_count(username):
+    """Exports `username` has made this month"""
+    return get_usage_meter().used(username, 'exports', 'month')
+
+def record_export(username, subscription):
+    """Count an export against the tier's monthly limit; False if the quota is used up"""
+    limit = get_tier_limits(APP_CONFIG, subscription).get('export_limit_per_month', 0)
+    return get_usage_meter().try_consume(username, subscription, limit, 'exports', 'month')
 
 def get_user_subscription(username):
     """Get user subscription level"""
     if username == 'public':
         return 'public'
-    user_config = config['credentials']['usernames'].get(username, {})
+    user_config = get_user_store().get(username) or {}
     return user_config.get('subscription', 'free')
 
 def is_authenticated():
@@ -447,7 +742,7 @@ def render_authenticated_header(user):
                 
                 # Also try the authenticator logout
                 try:
-                    authenticator.logout()
+                    get_authenticator().logout()
                 except:
                     pass  # Continue with manual logout if authenticator fails
                 
@@ -483,10 +778,9 @@ def render_public_sidebar():
         # Quick stats (public version)
         st.markdown("---")
         st.markdown("**⚡ Market Stats**")
-        df = fetch_kaspa_price_data()
-        if not df.empty:
-            current_price = df['price'].iloc[-1]
-            st.metric("KAS Price", f"${current_price:.4f}")
+        metrics = get_price_metrics()
+        if metrics:
+            st.metric("KAS Price", f"${metrics['current_price']:.4f}")
             st.metric("24h Change", "+2.1%", delta_color="normal")
         
         # Call to action
@@ -542,16 +836,24 @@ def render_authenticated_sidebar(user):
         
         selected = sac.menu(menu_items, open_all=True, key='main_menu')
         
+        # Sizes the point budget of every chart to the screen
+        st.select_slider("Chart width", CHART_WIDTH_OPTIONS_PX, value=DEFAULT_CHART_WIDTH_PX,
+                         format_func=lambda px: f"{px} px", key='chart_width_px')
+        
         # Quick stats
         st.markdown("---")
         st.markdown("**⚡ Quick Stats**")
-        df = fetch_kaspa_price_data()
-        if not df.empty:
-            current_price = df['price'].iloc[-1]
-            st.metric("KAS Price", f"${current_price:.4f}")
+        render_quick_stats()
             
         return selected
 
+@live_fragment('ticker', 5)
+def render_quick_stats():
+    """Sidebar KAS price, refreshed with the ticker instead of the whole page"""
+    quote = get_live_quote()
+    if quote:
+        st.metric("KAS Price", f"${quote['price']:.4f}", f"{quote['change_pct']:+.2f}%")
+
 def show_authentication_page():
     """Enhanced authentication page with all login options"""
     st.markdown('<div class="main-header">', unsafe_allow_html=True)
@@ -614,14 +916,17 @@ def render_login_section():
         st.markdown("### 🔐 Login to Your Account")
         
         # Main login widget
-        authenticator.login()
+        get_authenticator().login()
         
         # Get authentication status
         name = st.session_state.get('name')
         authentication_status = st.session_state.get('authentication_status')
         username = st.session_state.get('username')
         
-        if authentication_status == False:
+        retry_after = st.session_state.pop('login_retry_after', None)
+        if retry_after:
+            st.error(f"🔒 Too many login attempts. Please try again in {max(int(retry_after // 60), 1)} minute(s).")
+        elif authentication_status == False:
             st.error("❌ Username/password is incorrect. Please try again.")
         elif authentication_status == None:
             st.info("ℹ️ Please enter your credentials to access the platform.")
@@ -684,13 +989,15 @@ def render_registration_section():
             
             if not new_username:
                 errors.append("Username is required")
-            elif new_username in config['credentials']['usernames']:
+            elif get_user_store().exists(new_username):
                 errors.append("Username already exists")
             
             if not new_email:
                 errors.append("Email is required")
             elif '@' not in new_email:
                 errors.append("Invalid email format")
+            elif get_user_store().email_exists(new_email):
+                errors.append("An account with this email already exists")
             
             if not new_first_name:
                 errors.append("First name is required")
@@ -731,7 +1038,7 @@ def render_registration_section():
                         st.write(f"**Account Type:** {new_subscription}")
                     
                 else:
-                    st.error("❌ Registration failed. Username may already exist.")
+                    st.error("❌ Registration failed. Username or email may already exist.")
         
         st.markdown('</div>', unsafe_allow_html=True)
     
@@ -877,20 +1184,22 @@ def render_public_overview():
     st.title("📊 Kaspa Market Overview")
     st.markdown("*Public access - Create an account for full features*")
     
-    df = fetch_kaspa_price_data()
-    if df.empty:
+    metrics = get_price_metrics()
+    if not metrics:
         st.error("Unable to load data")
         return
     
     # Key metrics row (limited)
     col1, col2, col3, col4 = st.columns(4)
-    current_price = df['price'].iloc[-1]
-    price_change = ((df['price'].iloc[-1] - df['price'].iloc[-7]) / df['price'].iloc[-7]) * 100
+    # Live price from the feed, 7-day change against the stored week's first close
+    quote = get_live_quote()
+    current_price = quote['price']
+    price_change = (current_price / metrics['windows'][7]['first'] - 1) * 100
     
     with col1:
         st.metric("Current Price", f"${current_price:.4f}", f"{price_change:+.2f}%")
     with col2:
-        st.metric("24h Volume", f"${df['volume'].iloc[-1]:,.0f}")
+        st.metric("24h Volume", f"${metrics['current_volume']:,.0f}")
     with col3:
         st.metric("Market Cap", "$2.1B", "Est.")
     with col4:
@@ -898,25 +1207,13 @@ def render_public_overview():
     
     # Chart section (limited to 7 days for public)
     st.subheader("📈 Price Chart (Last 7 Days)")
-    chart_data = df.tail(7)  # Only last 7 days for public
+    chart_data = metrics['windows'][7]['frame']  # Only last 7 days for public
     
     if PLOTLY_AVAILABLE:
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=chart_data['timestamp'], 
-            y=chart_data['price'], 
-            name='KAS Price',
-            line=dict(color='#70C7BA', width=2)
-        ))
-        
-        fig.update_layout(
-            title="Kaspa Price - Last 7 Days (Public View)",
-            xaxis_title="Date",
-            yaxis_title="Price (USD)",
-            height=400,
-            template="plotly_white"
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        with tracer.span('figure.public_overview'):
+            fig = get_figure_template('public_overview', 'public').figure(
+                {'x': chart_data['timestamp'].to_numpy(), 'y': chart_data['price'].to_numpy()})
+        render_plotly_chart(fig, use_container_width=True)
     else:
         st.line_chart(chart_data.set_index('timestamp')['price'])
     
@@ -971,8 +1268,12 @@ def render_public_price_charts():
     st.title("📈 Price Charts")
     st.markdown("*Public view - Limited to basic charts*")
     
-    df = fetch_kaspa_price_data()
-    if df.empty:
+    try:
+        index = get_price_index(refresh_price_data())
+    except Exception as e:
+        st.error(f"Error fetching data: {e}")
+        return
+    if not len(index):
         st.error("Unable to load data")
         return
     
@@ -982,20 +1283,19 @@ def render_public_price_charts():
     with col1:
         chart_type = st.selectbox("Chart Type", ["Line"])
     with col2:
-        time_range = st.selectbox("Time Range", ["7D"])
+        start, end = select_time_range(index, get_retention_days('public'), key="public_time_range")
     with col3:
         st.selectbox("Indicators", ["🔒 Login Required"])
     
-    # Filter data to last 7 days only
-    chart_data = df.tail(7)
+    # The window is a view of the shared columns, bounded by public retention
+    chart_data = index.frame(start, end)
     
     # Create basic chart
     if PLOTLY_AVAILABLE:
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(x=chart_data['timestamp'], y=chart_data['price'], 
-                               name='KAS Price', line=dict(color='#70C7BA')))
-        fig.update_layout(title="Kaspa Price - Last 7 Days (Public Access)", height=500)
-        st.plotly_chart(fig, use_container_width=True)
+        with tracer.span('figure.public_price_charts'):
+            fig = get_figure_template('public_price_charts', 'public').figure(
+                {'x': chart_data['timestamp'].to_numpy(), 'y': chart_data['price'].to_numpy()})
+        render_plotly_chart(fig, use_container_width=True)
     else:
         st.line_chart(chart_data.set_index('timestamp')['price'])
     
@@ -1007,30 +1307,27 @@ def render_public_basic_analytics():
     st.title("📊 Basic Analytics")
     st.markdown("*Public access - Simple analysis tools*")
     
-    df = fetch_kaspa_price_data()
-    if not df.empty:
+    metrics = get_price_metrics()
+    if metrics:
         # Very basic analytics
-        chart_data = df.tail(7)
+        week = metrics['windows'][7]
         
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            price_avg = chart_data['price'].mean()
-            st.metric("7-Day Average", f"${price_avg:.4f}")
+            st.metric("7-Day Average", f"${week['mean']:.4f}")
         
         with col2:
-            price_min = chart_data['price'].min()
-            st.metric("7-Day Low", f"${price_min:.4f}")
+            st.metric("7-Day Low", f"${week['min']:.4f}")
         
         with col3:
-            price_max = chart_data['price'].max()
-            st.metric("7-Day High", f"${price_max:.4f}")
+            st.metric("7-Day High", f"${week['max']:.4f}")
         
         # Simple trend analysis
         st.subheader("📈 Simple Trend Analysis")
-        recent_trend = "Upward" if chart_data['price'].iloc[-1] > chart_data['price'].iloc[0] else "Downward"
+        recent_trend = "Upward" if week['last'] > week['first'] else "Downward"
         st.write(f"**7-Day Trend:** {recent_trend}")
-        st.write(f"**Price Change:** {((chart_data['price'].iloc[-1] / chart_data['price'].iloc[0]) - 1) * 100:.2f}%")
+        st.write(f"**Price Change:** {week['change_pct']:.2f}%")
     
     # Show what advanced analytics offers
     st.subheader("🔒 Advanced Analytics Available")
@@ -1066,36 +1363,63 @@ def render_admin_panel():
         sac.TabsItem(label='User Management', icon='people'),
         sac.TabsItem(label='Add User', icon='person-plus'),
         sac.TabsItem(label='System Stats', icon='graph-up'),
+        sac.TabsItem(label='Performance', icon='speedometer2'),
     ], key='admin_tabs')
     
     if admin_tabs == 'User Management':
         st.subheader("👥 Current Users")
+        user_store = get_user_store()
         
-        # Display current users
-        for username, user_info in config['credentials']['usernames'].items():
-            with st.expander(f"👤 {username} ({user_info.get('subscription', 'free')})"):
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    st.write(f"**Name:** {user_info.get('first_name')} {user_info.get('last_name')}")
-                    st.write(f"**Email:** {user_info.get('email')}")
-                
-                with col2:
-                    st.write(f"**Subscription:** {user_info.get('subscription', 'free')}")
-                    st.write(f"**Failed Logins:** {user_info.get('failed_login_attempts', 0)}")
-                
-                with col3:
-                    new_subscription = st.selectbox(
-                        "Change Subscription:", 
-                        ['free', 'premium', 'pro'],
-                        index=['free', 'premium', 'pro'].index(user_info.get('subscription', 'free')),
-                        key=f"sub_{username}"
-                    )
-                    
-                    if st.button(f"Update {username}", key=f"update_{username}"):
-                        if update_user_subscription_in_config(username, new_subscription):
-                            st.success(f"✅ Updated {username} to {new_subscription}")
-                            st.rerun()
+        # One page of users as a single table instead of a widget set per user
+        page_size = 25
+        total_users = user_store.count()
+        total_pages = max(-(-total_users // page_size), 1)
+        page_number = st.number_input("Page", min_value=1, max_value=total_pages, value=1, step=1, key="admin_user_page")
+        st.caption(f"{total_users} users · page {page_number} of {total_pages}")
+        
+        st.dataframe(pd.DataFrame([
+            {
+                'Username': username,
+                'Name': f"{user_info.get('first_name')} {user_info.get('last_name')}",
+                'Email': user_info.get('email'),
+                'Subscription': user_info.get('subscription', 'free'),
+                'Failed Logins': user_info.get('failed_login_attempts', 0),
+            }
+            for username, user_info in user_store.page(page_number, page_size)
+        ]), hide_index=True, use_container_width=True)
+        
+        st.markdown("#### ✏️ Change Subscription")
+        with st.form("update_subscription_form"):
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                target_username = st.text_input("Username")
+            with col2:
+                new_subscription = st.selectbox("Change Subscription:", SUBSCRIPTION_TIERS)
+            
+            if st.form_submit_button("Update"):
+                if update_user_subscription_in_config(target_username, new_subscription):
+                    st.success(f"✅ Updated {target_username} to {new_subscription}")
+                    st.rerun()
+                else:
+                    st.error(f"❌ User {target_username} not found")
+        
+        st.markdown("#### 🔒 Login Lockouts")
+        login_limiter = get_login_limiter()
+        lockouts = login_limiter.active_lockouts()
+        if lockouts:
+            st.dataframe(pd.DataFrame([
+                {'Key': key, 'Minutes Left': round(seconds / 60, 1)}
+                for key, seconds in sorted(lockouts.items())
+            ]), hide_index=True, use_container_width=True)
+        else:
+            st.caption("No active lockouts")
+        
+        with st.form("unlock_user_form"):
+            unlock_username = st.text_input("Username to unlock")
+            if st.form_submit_button("Unlock") and unlock_username:
+                login_limiter.unlock(unlock_username)
+                st.success(f"✅ Unlocked {unlock_username}")
     
     elif admin_tabs == 'Add User':
         st.subheader("➕ Add New User")
@@ -1110,7 +1434,7 @@ def render_admin_panel():
             
             with col2:
                 new_last_name = st.text_input("Last Name")
-                new_subscription = st.selectbox("Subscription", ['free', 'premium', 'pro'])
+                new_subscription = st.selectbox("Subscription", SUBSCRIPTION_TIERS)
                 new_password = st.text_input("Password", type="password")
             
             if st.form_submit_button("➕ Add User"):
@@ -1119,19 +1443,16 @@ def render_admin_panel():
                         st.success(f"✅ User {new_username} added successfully!")
                         st.rerun()
                     else:
-                        st.error(f"❌ User {new_username} already exists!")
+                        st.error(f"❌ User {new_username} or email {new_email} already exists!")
                 else:
                     st.error("❌ Please fill in all required fields")
     
-    else:  # System Stats
+    elif admin_tabs == 'System Stats':
         st.subheader("📊 System Statistics")
         
-        total_users = len(config['credentials']['usernames'])
-        subscription_counts = {}
-        
-        for user_info in config['credentials']['usernames'].values():
-            sub = user_info.get('subscription', 'free')
-            subscription_counts[sub] = subscription_counts.get(sub, 0) + 1
+        user_store = get_user_store()
+        total_users = user_store.count()
+        subscription_counts = user_store.tier_counts()
         
         col1, col2, col3, col4 = st.columns(4)
         
@@ -1143,123 +1464,400 @@ def render_admin_panel():
             st.metric("Premium Users", subscription_counts.get('premium', 0))
         with col4:
             st.metric("Pro Users", subscription_counts.get('pro', 0))
+        
+        st.markdown("#### 📈 Usage")
+        usage_meter = get_usage_meter()
+        usage_view = st.radio("Metric", ["API calls today", "Exports this month"], horizontal=True, key="admin_usage_metric")
+        metric, period = ('api_calls', 'day') if usage_view == "API calls today" else ('exports', 'month')
+        
+        tier_usage = usage_meter.tier_totals(metric, period)
+        col1, col2, col3 = st.columns(3)
+        for col, tier in zip([col1, col2, col3], SUBSCRIPTION_TIERS):
+            with col:
+                entry = tier_usage.get(tier, {'users': 0, 'count': 0})
+                st.metric(f"{tier.title()} Tier", f"{entry['count']:,}", f"{entry['users']} users", delta_color="off")
+        
+        top_consumers = usage_meter.top_consumers(metric, period)
+        if top_consumers:
+            st.dataframe(pd.DataFrame(top_consumers, columns=['Username', 'Tier', 'Count']),
+                         hide_index=True, use_container_width=True)
+        else:
+            st.caption(f"No usage recorded for {usage_meter.period(period)}")
+        
+        st.markdown("#### 📡 Live Price Feed")
+        try:
+            ingester = get_feed_ingester()
+        except (ImportError, ValueError) as e:
+            st.error(f"Price feed unavailable: {e}")
+            ingester = False
+        if ingester is None:
+            st.caption("Price feed disabled (price_feed.enabled in config.yaml)")
+        elif ingester:
+            feed_stats = ingester.stats()
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Source", feed_stats['source'], "connected" if feed_stats['connected'] else "reconnecting",
+                          delta_color="normal" if feed_stats['connected'] else "inverse")
+            with col2:
+                st.metric("Ticks", f"{feed_stats['ticks']:,}")
+            with col3:
+                st.metric("Buffered", f"{feed_stats['buffered']:,}")
+            with col4:
+                st.metric("Overwritten", f"{feed_stats['dropped']:,}")
+            if feed_stats['last_error']:
+                st.caption(f"Last feed error: {feed_stats['last_error']}")
+    
+    else:  # Performance
+        st.subheader("⏱️ Performance")
+        
+        if not tracer.enabled:
+            st.info("Tracing is disabled (tracing.enabled in config.yaml or KASPA_TRACING)")
+            return
+        
+        runs = tracer.runs()
+        page_stats, span_stats = tracer.summary()
+        st.caption(f"Last {len(runs):,} script runs in this process (buffer holds {tracer.buffer_size:,})")
+        if not runs:
+            st.info("No runs recorded yet")
+            return
+        
+        def stats_table(stats, label):
+            # Explicit columns, so runs without any spans still give a (empty) table
+            return pd.DataFrame([
+                (key, entry['count'], round(entry[0.5] * 1000, 1), round(entry[0.95] * 1000, 1),
+                 round(entry[0.99] * 1000, 1), round(entry['sum'], 2))
+                for key, entry in stats.items()
+            ], columns=[label, 'Runs', 'p50 (ms)', 'p95 (ms)', 'p99 (ms)', 'Total (s)']).sort_values(
+                'p95 (ms)', ascending=False)
+        
+        st.markdown("#### 📄 Per Page")
+        st.dataframe(stats_table(page_stats, 'Page'), hide_index=True, use_container_width=True)
+        st.markdown("#### 🧩 Per Span")
+        if span_stats:
+            st.dataframe(stats_table(span_stats, 'Span'), hide_index=True, use_container_width=True)
+        else:
+            st.caption("No spans recorded in the buffered runs")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("📥 Prometheus Metrics", tracer.prometheus_text(),
+                               file_name="kaspa_metrics.prom", mime="text/plain", key="admin_metrics_download")
+        with col2:
+            if st.button("🗑️ Clear Timings", key="admin_clear_timings"):
+                tracer.clear()
+                st.rerun()
+        if tracer.textfile_path:
+            st.caption(f"Also written to {tracer.textfile_path} for scraping")
+
+# Chart skeletons - built and validated once per (page, tier), see get_figure_template
+def overview_chart_skeleton(subscription_level):
+    """Overview price chart (plus volume on a second axis for premium+)"""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(name='KAS Price', line=dict(color='#70C7BA', width=2)))
+    
+    # Add volume as secondary y-axis for premium+
+    if subscription_level in ['premium', 'pro']:
+        fig.add_trace(go.Scatter(name='Volume', yaxis='y2', opacity=0.3, line=dict(color='orange')))
+        fig.update_layout(
+            yaxis2=dict(
+                title="Volume",
+                overlaying='y',
+                side='right'
+            )
+        )
+    
+    fig.update_layout(
+        title="Kaspa Price History",
+        xaxis_title="Date",
+        yaxis_title="Price (USD)",
+        height=500,
+        template="plotly_white"
+    )
+    return fig
+
+def public_overview_chart_skeleton(subscription_level):
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(name='KAS Price', line=dict(color='#70C7BA', width=2)))
+    fig.update_layout(
+        title="Kaspa Price - Last 7 Days (Public View)",
+        xaxis_title="Date",
+        yaxis_title="Price (USD)",
+        height=400,
+        template="plotly_white"
+    )
+    return fig
+
+def public_price_chart_skeleton(subscription_level):
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(name='KAS Price', line=dict(color='#70C7BA')))
+    fig.update_layout(title=f"Kaspa Price - Last {PUBLIC_RETENTION_DAYS} Days Max (Public Access)", height=500)
+    return fig
+
+def price_line_chart_skeleton(subscription_level):
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(name='KAS Price', line=dict(color='#70C7BA')))
+    fig.update_layout(title="Kaspa Price", height=500, yaxis_title="Price (USD)")
+    return fig
+
+def candlestick_chart_skeleton(subscription_level):
+    """Candles over a volume subplot; the title (bar resolution) is set per render"""
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.75, 0.25], vertical_spacing=0.03)
+    fig.add_trace(go.Candlestick(name='KAS', increasing_line_color='#70C7BA', decreasing_line_color='#e74c3c'),
+                  row=1, col=1)
+    fig.add_trace(go.Bar(name='Volume', marker_color='#49A097'), row=2, col=1)
+    fig.update_layout(title="Kaspa Price", height=600, xaxis_rangeslider_visible=False, showlegend=False)
+    return fig
+
+def network_chart_skeleton(subscription_level):
+    """One network metric over time; the title (metric, resolution) is set per render"""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(name='Network', mode='lines', line=dict(color='#70C7BA', width=2),
+                             fill='tozeroy', fillcolor='rgba(112, 199, 186, 0.15)'))
+    fig.update_layout(title="Network Metrics", height=450, hovermode='x unified')
+    return fig
+
+CHART_SKELETONS = {
+    'overview': overview_chart_skeleton,
+    'public_overview': public_overview_chart_skeleton,
+    'public_price_charts': public_price_chart_skeleton,
+    'price_line': price_line_chart_skeleton,
+    'candlestick': candlestick_chart_skeleton,
+    'network': network_chart_skeleton,
+}
+
+@st.cache_resource
+def get_figure_template(page, subscription_level):
+    """Validated figure skeleton for a chart, shared by every session; renders only swap in data"""
+    return FigureTemplate(CHART_SKELETONS[page](subscription_level))
 
 # Authenticated user functions (same as before but with subscription checks)
+def overview_chart_points(chart_data, subscription_level, width_px=DEFAULT_CHART_WIDTH_PX, x_range=None):
+    """[price points, volume points (premium+)] for the overview chart"""
+    # Reduce the visible range to what the chart width can show
+    points = [downsample_for_chart(chart_data, 'price', width_px=width_px, x_range=x_range, method='lttb')]
+    if subscription_level in ['premium', 'pro']:
+        # Min/max per bucket so volume spikes survive downsampling
+        points.append(downsample_for_chart(chart_data, 'volume', width_px=width_px, x_range=x_range,
+                                           method='minmax'))
+    return points
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def get_overview_chart_points(version, subscription_level, width_px, x_range):
+    """Overview chart points for a range of the history, downsampled once per data version, width and range"""
+    return overview_chart_points(load_price_data(version), subscription_level, width_px, x_range)
+
+@tracer.traced('figure.overview')
+def build_overview_figure(points, subscription_level):
+    """Overview price chart (plus volume on a second axis for premium+) from overview_chart_points"""
+    traces = [{'x': frame['timestamp'].to_numpy(), 'y': frame[column].to_numpy()}
+              for frame, column in zip(points, ['price', 'volume'])]
+    return get_figure_template('overview', subscription_level).figure(*traces)
+
+def get_live_quote():
+    """Latest KAS price with its change since the previous tick, or None if no data is available.
+    
+    Read from the live feed's ring buffer; until the feed has delivered a tick
+    (or with the feed off) the newest stored row is used instead.
+    """
+    try:
+        ingester = get_feed_ingester()
+    except (ImportError, ValueError):
+        # Misconfigured feed (reported in the admin panel) - fall back to stored prices
+        ingester = None
+    quote = ingester.buffer.quote() if ingester is not None else None
+    if quote:
+        return quote
+    
+    metrics = get_price_metrics()
+    if not metrics:
+        return None
+    prices = metrics['windows'][7]['frame']['price']
+    previous = float(prices.iloc[-2]) if len(prices) > 1 else metrics['current_price']
+    return {
+        'price': metrics['current_price'],
+        'change_pct': (metrics['current_price'] / previous - 1) * 100,
+        'timestamp': metrics['current_timestamp'],
+    }
+
+@live_fragment('ticker', 5)
+def render_price_ticker():
+    """One-line live price ticker; reruns on its own every few seconds"""
+    quote = get_live_quote()
+    if not quote:
+        return
+    arrow = "🟢 ▲" if quote['change_pct'] >= 0 else "🔴 ▼"
+    st.markdown(f"**💎 KAS ${quote['price']:.4f}** {arrow} {quote['change_pct']:+.2f}% "
+                f"· last tick {quote['timestamp']:%Y-%m-%d %H:%M:%S} UTC")
+
 def render_overview(subscription_level):
-    """Enhanced overview page with different features based on subscription"""
+    """Enhanced overview page with different features based on subscription.
+    
+    Each panel is a fragment, so the ticker, metrics and chart refresh (and
+    the quick-action buttons rerun) without re-rendering the rest of the page.
+    """
     st.title("📊 Kaspa Market Overview")
     
-    df = fetch_kaspa_price_data()
-    if df.empty:
+    metrics = get_price_metrics()
+    if not metrics:
         st.error("Unable to load data")
         return
     
-    # Key metrics row
+    render_price_ticker()
+    render_overview_metrics(subscription_level)
+    render_overview_chart(subscription_level)
+    
+    # Market insights section
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        render_market_insights(subscription_level)
+    
+    with col2:
+        render_quick_actions(subscription_level)
+
+@live_fragment('metrics', 30)
+def render_overview_metrics(subscription_level):
+    """Key metrics row"""
+    metrics = get_price_metrics()
+    if not metrics:
+        return
+    
     col1, col2, col3, col4 = st.columns(4)
-    current_price = df['price'].iloc[-1]
-    price_change = ((df['price'].iloc[-1] - df['price'].iloc[-7]) / df['price'].iloc[-7]) * 100
+    # Live price from the feed, 7-day change against the stored week's first close
+    quote = get_live_quote()
+    current_price = quote['price']
+    price_change = (current_price / metrics['windows'][7]['first'] - 1) * 100
     
     with col1:
         st.metric("Current Price", f"${current_price:.4f}", f"{price_change:+.2f}%")
     with col2:
-        st.metric("24h Volume", f"${df['volume'].iloc[-1]:,.0f}")
+        st.metric("24h Volume", f"${metrics['current_volume']:,.0f}")
     with col3:
         st.metric("Market Cap", "$2.1B", "Est.")
     with col4:
-        if subscription_level in ['premium', 'pro']:
-            st.metric("Power Law", "Above Trend", "+15%")
+        fit = get_power_law_fit() if subscription_level in ['premium', 'pro'] else None
+        if fit is not None:
+            deviation = fit.deviation_pct([metrics['current_timestamp']], [current_price])[0]
+            st.metric("Power Law", "Above Trend" if deviation >= 0 else "Below Trend", f"{deviation:+.0f}%")
+        elif subscription_level in ['premium', 'pro']:
+            st.metric("Power Law", "N/A", "")
         else:
             st.metric("Power Law", "🔒 Premium", "Upgrade")
-    
-    # Chart section
+
+@live_fragment('chart', 300)
+def render_overview_chart(subscription_level):
+    """Price chart section"""
     st.subheader("📈 Price Chart")
     
     # Different data access based on subscription
     if subscription_level == 'free':
-        chart_data = df.tail(30)  # Last 30 days only
+        metrics = get_price_metrics()
+        if not metrics:
+            return
+        chart_data = metrics['windows'][30]['frame']  # Last 30 days only
         st.info("📊 Free users see last 30 days. Upgrade for full historical data!")
     else:
-        chart_data = df  # Full historical data
+        chart_data = fetch_kaspa_price_data()  # Full historical data
+        if chart_data.empty:
+            return
+        version = refresh_price_data()
+        x_range = select_time_range(get_price_index(version), get_retention_days(subscription_level),
+                                    key="overview_time_range", default='ALL')
     
     if PLOTLY_AVAILABLE:
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=chart_data['timestamp'], 
-            y=chart_data['price'], 
-            name='KAS Price',
-            line=dict(color='#70C7BA', width=2)
-        ))
-        
-        # Add volume as secondary y-axis for premium+
-        if subscription_level in ['premium', 'pro']:
-            fig.add_trace(go.Scatter(
-                x=chart_data['timestamp'],
-                y=chart_data['volume'],
-                name='Volume',
-                yaxis='y2',
-                opacity=0.3,
-                line=dict(color='orange')
-            ))
-            
-            fig.update_layout(
-                yaxis2=dict(
-                    title="Volume",
-                    overlaying='y',
-                    side='right'
-                )
-            )
-        
-        fig.update_layout(
-            title="Kaspa Price History",
-            xaxis_title="Date",
-            yaxis_title="Price (USD)",
-            height=500,
-            template="plotly_white"
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        if subscription_level == 'free':
+            points = overview_chart_points(chart_data, subscription_level, chart_width_px())
+        else:
+            points = get_overview_chart_points(version, subscription_level, chart_width_px(), x_range)
+        render_plotly_chart(build_overview_figure(points, subscription_level), use_container_width=True)
     else:
         st.line_chart(chart_data.set_index('timestamp')['price'])
+
+@live_fragment('insights', 300)
+def render_market_insights(subscription_level):
+    """Technical and on-chain insights (upgrade prompt for free users)"""
+    st.subheader("📈 Market Insights")
+    
+    if subscription_level in ['premium', 'pro']:
+        # Premium insights
+        st.markdown("#### 🔍 Technical Analysis")
+        technicals = get_technical_summary()
+        if technicals:
+            st.write(f"• RSI: {technicals['rsi']:.1f} ({technicals['rsi_label']})")
+            st.write(f"• MACD: {technicals['macd_label']}")
+            st.write(f"• Support: ${technicals['support']:.4f}")
+            st.write(f"• Resistance: ${technicals['resistance']:.4f}")
+        
+        st.markdown("#### 📊 On-chain Metrics")
+        _, network = get_network_metrics()
+        if network:
+            from kaspa_network import format_change, format_hashrate
+            change = format_change(network['hashrate_change_pct'])
+            st.write(f"• Hash Rate: {format_hashrate(network['hashrate'])}" + (f" ({change})" if change else ""))
+            st.write(f"• Active Addresses: {network['active_addresses']:,}")
+            st.write(f"• Transaction Count: {network['tx_count']:,} (24h)")
+    else:
+        # Free user upgrade prompt
+        show_upgrade_prompt(subscription_level, 'premium')
+
+@live_fragment('quick_actions')
+def render_quick_actions(subscription_level):
+    """Tier-specific shortcuts; clicking one reruns only this panel"""
+    st.subheader("🎯 Quick Actions")
     
-    # Market insights section
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("📈 Market Insights")
-        
-        if subscription_level in ['premium', 'pro']:
-            # Premium insights
-            st.markdown("#### 🔍 Technical Analysis")
-            st.write("• RSI: 65.2 (Neutral)")
-            st.write("• MACD: Bullish crossover")
-            st.write("• Support: $0.0245")
-            st.write("• Resistance: $0.0289")
-            
-            st.markdown("#### 📊 On-chain Metrics")
-            st.write("• Hash Rate: 1.2 EH/s (+5.2%)")
-            st.write("• Active Addresses: 45,231")
-            st.write("• Transaction Count: 892,123")
+    # Different actions based on subscription
+    if subscription_level == 'free':
+        st.button("📊 View Basic Charts", use_container_width=True)
+        st.button("📈 Simple Power Law", use_container_width=True)
+        st.button("⭐ Upgrade Account", type="primary", use_container_width=True)
+    elif subscription_level == 'premium':
+        st.button("📊 Advanced Analytics", use_container_width=True)
+        st.button("📈 Power Law Models", use_container_width=True)
+        st.button("📋 Export Data", use_container_width=True)
+        st.button("👑 Upgrade to Pro", type="primary", use_container_width=True)
+    else:  # pro
+        st.button("🔬 Research Workspace", use_container_width=True)
+        st.button("🤖 Custom Models", use_container_width=True)
+        if st.button("🔌 API Access", use_container_width=True):
+            st.session_state.show_api_key = not st.session_state.get('show_api_key', False)
+        st.button("📊 Admin Dashboard", use_container_width=True)
+        
+        if st.session_state.get('show_api_key'):
+            render_api_keys(subscription_level)
+
+def render_api_keys(subscription_level):
+    """The user's API keys: issue a new one (shown once), revoke any one, today's usage"""
+    from kaspa_api import MAX_API_KEYS, issue_api_key, load_api_settings
+    username = st.session_state.get('username')
+    user_store = get_user_store()
+    api_settings = load_api_settings(APP_CONFIG)
+    limit = get_tier_limits(APP_CONFIG, subscription_level).get('api_calls_per_day', 0)
+    
+    if st.button("➕ New API Key", use_container_width=True, key="issue_api_key"):
+        api_key = issue_api_key(user_store, username)
+        if api_key:
+            st.session_state.new_api_key = api_key
         else:
-            # Free user upgrade prompt
-            show_upgrade_prompt(subscription_level, 'premium')
+            st.warning(f"You already have {MAX_API_KEYS} keys - revoke one first")
     
-    with col2:
-        st.subheader("🎯 Quick Actions")
-        
-        # Different actions based on subscription
-        if subscription_level == 'free':
-            st.button("📊 View Basic Charts", use_container_width=True)
-            st.button("📈 Simple Power Law", use_container_width=True)
-            st.button("⭐ Upgrade Account", type="primary", use_container_width=True)
-        elif subscription_level == 'premium':
-            st.button("📊 Advanced Analytics", use_container_width=True)
-            st.button("📈 Power Law Models", use_container_width=True)
-            st.button("📋 Export Data", use_container_width=True)
-            st.button("👑 Upgrade to Pro", type="primary", use_container_width=True)
-        else:  # pro
-            st.button("🔬 Research Workspace", use_container_width=True)
-            st.button("🤖 Custom Models", use_container_width=True)
-            st.button("🔌 API Access", use_container_width=True)
-            st.button("📊 Admin Dashboard", use_container_width=True)
+    new_api_key = st.session_state.pop('new_api_key', None)
+    if new_api_key:
+        st.success("Copy your key now - it is stored hashed and cannot be shown again")
+        st.code(new_api_key, language=None)
+    
+    for key_info in user_store.api_keys(username):
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            st.caption(f"`{key_info['prefix']}…` created {key_info['created_at'][:16].replace('T', ' ')}")
+        with col2:
+            # Revoked in the click callback, so this run already lists the remaining keys
+            st.button("Revoke", key=f"revoke_{key_info['key_hash'][:16]}",
+                      on_click=user_store.revoke_api_key, args=(username, key_info['key_hash']))
+    
+    st.caption(f"{get_usage_meter().used(username, 'api_calls', 'day'):,} of {limit:,} calls used today")
+    st.code(f"curl -H 'Authorization: Bearer <key>' "
+            f"'http://{api_settings['host']}:{api_settings['port']}/v1/prices?start=2024-01-01'",
+            language='bash')
 
 # Additional authenticated functions (power law, network metrics, etc.) would be the same as before...
 # For brevity, I'll include just the main navigation and structure
@@ -1274,6 +1872,7 @@ def main():
     # Check if user wants to show auth page
     if st.session_state.get('show_auth'):
         # Show authentication page
+        tracer.set_page('auth')
         name, authentication_status, username = show_authentication_page()
         
         if authentication_status is True:
@@ -1293,6 +1892,7 @@ def main():
         
         # Public sidebar and navigation
         selected = render_public_sidebar()
+        tracer.set_page(f"public/{selected or 'overview'}")
         
         # Route public content
         if selected == 'overview':
@@ -1322,6 +1922,7 @@ def main():
         
         # Check if user wants to see profile
         if st.session_state.get('show_profile'):
+            tracer.set_page(f"{user['subscription']}/account")
             render_user_profile(user['name'], user['username'])
             return
         
@@ -1330,6 +1931,7 @@ def main():
         
         # Route authenticated content based on subscription
         subscription_level = user['subscription']
+        tracer.set_page(f"{subscription_level}/{selected or 'overview'}")
         
         if selected == 'account':
             render_user_profile(user['name'], user['username'])
@@ -1362,35 +1964,358 @@ def render_user_profile(name, username):
 
 def render_price_charts(subscription_level):
     st.title("📈 Price Charts")
+    retention_days = get_retention_days(subscription_level)
     if subscription_level == 'free':
-        st.info("Free users get basic charts. Upgrade for advanced features!")
+        st.info(f"Free users get basic charts of the last {retention_days} days. Upgrade for full history!")
     else:
         st.success("Advanced charting available!")
+    
+    try:
+        index = get_price_index(refresh_price_data())
+    except Exception as e:
+        st.error(f"Error fetching data: {e}")
+        return
+    if not len(index):
+        st.error("Unable to load data")
+        return
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        chart_types = ["Line"] if subscription_level == 'free' else ["Candlestick", "Line"]
+        chart_type = st.selectbox("Chart Type", chart_types, key="price_chart_type")
+    with col2:
+        start, end = select_time_range(index, retention_days, key="price_time_range",
+                                       default='30D' if subscription_level == 'free' else '1Y')
+    
+    if chart_type == "Candlestick" and PLOTLY_AVAILABLE:
+        # Bars come pre-aggregated from the level that fits the chart width
+        version = refresh_price_data()
+        bars, resolution = get_rollup_snapshot(version).select(start, end, width_px=chart_width_px())
+        if bars.empty:
+            st.info("No data in the selected range")
+            return
+        
+        with tracer.span('figure.price_charts'):
+            timestamps = bars['timestamp'].to_numpy()
+            fig = get_figure_template('candlestick', subscription_level).figure(
+                {'x': timestamps, 'open': bars['open'].to_numpy(), 'high': bars['high'].to_numpy(),
+                 'low': bars['low'].to_numpy(), 'close': bars['close'].to_numpy()},
+                {'x': timestamps, 'y': bars['volume'].to_numpy()},
+                layout={'title': {'text': f"Kaspa Price ({resolution} candles)"}}
+            )
+        render_plotly_chart(fig, use_container_width=True)
+        st.caption(f"{len(bars):,} {resolution} bars · {bars['timestamp'].iloc[0]:%Y-%m-%d} to {bars['timestamp'].iloc[-1]:%Y-%m-%d}")
+        return
+    
+    chart_data = index.frame(start, end)
+    if chart_data.empty:
+        st.info("No data in the selected range")
+        return
+    
+    if PLOTLY_AVAILABLE:
+        price_points = downsample_for_chart(chart_data, 'price', width_px=chart_width_px())
+        with tracer.span('figure.price_charts'):
+            fig = get_figure_template('price_line', subscription_level).figure(
+                {'x': price_points['timestamp'].to_numpy(), 'y': price_points['price'].to_numpy()})
+        render_plotly_chart(fig, use_container_width=True)
+    else:
+        st.line_chart(chart_data.set_index('timestamp')['price'])
+    
+    st.caption(f"{len(chart_data):,} points · {chart_data['timestamp'].iloc[0]:%Y-%m-%d} to {chart_data['timestamp'].iloc[-1]:%Y-%m-%d}")
 
 def render_power_law_basic(subscription_level):
     st.title("📊 Basic Power Law")
     st.info("Basic power law analysis for free users")
+    
+    metrics = get_price_metrics()
+    fit = get_power_law_fit()
+    if not metrics or fit is None:
+        st.error("Unable to load data")
+        return
+    
+    current_price = metrics['current_price']
+    trend_price = fit.predict([metrics['current_timestamp']])[0]
+    deviation = (current_price / trend_price - 1) * 100
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Power Law Exponent", f"{fit.slope:.2f}")
+    with col2:
+        st.metric("Fit Quality (R²)", f"{fit.r_squared:.3f}")
+    with col3:
+        st.metric("Trend Price", f"${trend_price:.4f}")
+    with col4:
+        st.metric("Deviation", "Above Trend" if deviation >= 0 else "Below Trend", f"{deviation:+.1f}%")
+    
+    # Last 30 days against the full-history trend
+    st.subheader("📈 Price vs Power Law Trend (Last 30 Days)")
+    chart_data = metrics['windows'][30]['frame']
+    trend = fit.predict(chart_data['timestamp'])
+    
+    if PLOTLY_AVAILABLE:
+        with tracer.span('figure.power_law_basic'):
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(x=chart_data['timestamp'], y=chart_data['price'],
+                                     name='KAS Price', line=dict(color='#70C7BA', width=2)))
+            fig.add_trace(go.Scatter(x=chart_data['timestamp'], y=trend,
+                                     name='Power Law Trend', line=dict(color='#49A097', dash='dash')))
+            fig.update_layout(
+                xaxis_title="Date",
+                yaxis_title="Price (USD)",
+                yaxis_type="log",
+                height=450,
+                template="plotly_white"
+            )
+        render_plotly_chart(fig, use_container_width=True)
+    else:
+        st.line_chart(pd.DataFrame({'price': chart_data['price'].to_numpy(), 'trend': trend},
+                                   index=chart_data['timestamp']))
+    
+    st.info("⭐ Upgrade to Premium for full-history fits, residual bands and rolling re-fits")
 
 def render_power_law_advanced(subscription_level):
     if subscription_level not in ['premium', 'pro']:
         show_upgrade_prompt(subscription_level, 'premium')
         return
     st.title("🔬 Advanced Power Law")
-    st.success("Advanced power law analysis!")
+    
+    df = fetch_kaspa_price_data()
+    fit = get_power_law_fit()
+    if df.empty or fit is None:
+        st.error("Unable to load data")
+        return
+    
+    deviation = fit.deviation_pct(df['timestamp'], df['price'])
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Power Law Exponent", f"{fit.slope:.3f}")
+    with col2:
+        st.metric("Fit Quality (R²)", f"{fit.r_squared:.4f}")
+    with col3:
+        st.metric("Residual σ (log10)", f"{fit.residual_std:.3f}")
+    with col4:
+        st.metric("Deviation from Trend", f"{deviation[-1]:+.1f}%")
+    
+    # Log-log fit with residual bands, downsampled to the chart budget
+    st.subheader("📈 Log-Log Fit with Residual Bands")
+    points = downsample_for_chart(df.assign(deviation=deviation), 'price', width_px=chart_width_px(), method='lttb')
+    days = days_since_genesis(points['timestamp'])
+    bands = fit.bands(points['timestamp'])
+    
+    if PLOTLY_AVAILABLE:
+        with tracer.span('figure.power_law_advanced'):
+            fig = go.Figure()
+            for label, color in [('+2σ', 'rgba(73, 160, 151, 0.25)'), ('+1σ', 'rgba(73, 160, 151, 0.5)'),
+                                 ('-1σ', 'rgba(73, 160, 151, 0.5)'), ('-2σ', 'rgba(73, 160, 151, 0.25)')]:
+                fig.add_trace(go.Scatter(x=days, y=bands[label], name=label,
+                                         line=dict(color=color, dash='dot')))
+            fig.add_trace(go.Scatter(x=days, y=bands['trend'], name='Power Law Trend',
+                                     line=dict(color='#49A097', dash='dash')))
+            fig.add_trace(go.Scatter(x=days, y=points['price'], name='KAS Price',
+                                     line=dict(color='#70C7BA', width=2)))
+            fig.update_layout(
+                xaxis_title="Days Since Genesis",
+                yaxis_title="Price (USD)",
+                xaxis_type="log",
+                yaxis_type="log",
+                height=500,
+                template="plotly_white"
+            )
+        render_plotly_chart(fig, use_container_width=True)
+    else:
+        st.line_chart(pd.DataFrame({'price': points['price'].to_numpy(), 'trend': bands['trend']}, index=days))
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("📊 Deviation from Trend")
+        if PLOTLY_AVAILABLE:
+            with tracer.span('figure.power_law_advanced'):
+                fig = go.Figure()
+                fig.add_trace(go.Scatter(x=points['timestamp'], y=points['deviation'],
+                                         name='Deviation', line=dict(color='#70C7BA')))
+                fig.add_hline(y=0, line=dict(color='gray', dash='dash'))
+                fig.update_layout(yaxis_title="Deviation (%)", height=350, template="plotly_white")
+            render_plotly_chart(fig, use_container_width=True)
+        else:
+            st.line_chart(points.set_index('timestamp')['deviation'])
+    
+    with col2:
+        st.subheader("🔄 Rolling Re-fit")
+        window = st.select_slider("Rolling window (days)", [90, 180, 365, 730], value=365, key="power_law_window")
+        rolling = get_rolling_power_law(refresh_price_data(), window).dropna()
+        rolling = downsample_for_chart(rolling, 'slope', width_px=chart_width_px(2), method='lttb')
+        if PLOTLY_AVAILABLE:
+            with tracer.span('figure.power_law_advanced'):
+                fig = go.Figure()
+                fig.add_trace(go.Scatter(x=rolling['timestamp'], y=rolling['slope'],
+                                         name='Rolling Exponent', line=dict(color='#8A2BE2')))
+                fig.add_hline(y=fit.slope, line=dict(color='gray', dash='dash'))
+                fig.update_layout(yaxis_title="Exponent", height=350, template="plotly_white")
+            render_plotly_chart(fig, use_container_width=True)
+        else:
+            st.line_chart(rolling.set_index('timestamp')['slope'])
+    
+    # Trend projections
+    st.subheader("🎯 Trend Projections")
+    last_timestamp = df['timestamp'].iloc[-1]
+    horizons = [30, 90, 180, 365]
+    future = [last_timestamp + timedelta(days=days_ahead) for days_ahead in horizons]
+    projected = fit.bands(future)
+    st.dataframe(pd.DataFrame({
+        'Horizon': [f"+{days_ahead}d" for days_ahead in horizons],
+        'Date': [ts.strftime('%Y-%m-%d') for ts in future],
+        'Trend': [f"${value:.4f}" for value in projected['trend']],
+        '-1σ': [f"${value:.4f}" for value in projected['-1σ']],
+        '+1σ': [f"${value:.4f}" for value in projected['+1σ']],
+    }), hide_index=True, use_container_width=True)
+
+NETWORK_CHART_METRICS = {
+    'Hash Rate': ('hashrate', 'H/s'),
+    'Block Rate': ('block_rate', 'blocks/s'),
+    'Transactions': ('tx_count', 'count'),
+    'Active Addresses': ('active_addresses', 'distinct'),
+}
 
 def render_network_metrics(subscription_level):
     if subscription_level not in ['premium', 'pro']:
         show_upgrade_prompt(subscription_level, 'premium')
         return
     st.title("🌐 Network Metrics")
-    st.success("Network metrics analysis!")
+    
+    from kaspa_network import format_change, format_hashrate
+    if current_network_version() is None:
+        refresher = get_network_refresher()
+        if refresher.last_error:
+            st.error(f"Unable to build network rollups: {refresher.last_error}")
+        else:
+            st.info("⏳ Network rollups are being built in the background - refresh in a moment.")
+        return
+    
+    rollups, network = get_network_metrics()
+    if not network:
+        st.error("Unable to load network data")
+        return
+    
+    # Everything below reads precomputed rollups - a few hundred rows, however many blocks they cover
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Hash Rate (24h)", format_hashrate(network['hashrate']), format_change(network['hashrate_change_pct']))
+    with col2:
+        st.metric("Block Rate (24h)", f"{network['block_rate']:.2f} BPS", format_change(network['block_rate_change_pct']))
+    with col3:
+        st.metric("Transactions (24h)", f"{network['tx_count']:,}", format_change(network['tx_count_change_pct']))
+    with col4:
+        st.metric("Active Addresses (1d)", f"{network['active_addresses']:,}",
+                  format_change(network['active_addresses_change_pct']))
+    st.caption(f"Rollups as of {network['as_of']:%Y-%m-%d %H:%M:%S} UTC")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        metric_label = st.selectbox("Metric", list(NETWORK_CHART_METRICS), key="network_metric")
+    with col2:
+        resolution = st.radio("Resolution", ["Hourly", "Daily"], horizontal=True, key="network_resolution")
+    
+    column, unit = NETWORK_CHART_METRICS[metric_label]
+    frame = rollups['1h' if resolution == "Hourly" else '1d']
+    retention_days = get_retention_days(subscription_level)
+    if retention_days and not frame.empty:
+        frame = frame[frame['timestamp'] >= frame['timestamp'].iloc[-1] - pd.Timedelta(days=retention_days)]
+    
+    if PLOTLY_AVAILABLE:
+        with tracer.span('figure.network_metrics'):
+            fig = get_figure_template('network', subscription_level).figure(
+                {'x': frame['timestamp'].to_numpy(), 'y': frame[column].to_numpy()},
+                layout={'title': {'text': f"{metric_label} ({unit}, {resolution.lower()})"}})
+        render_plotly_chart(fig, use_container_width=True)
+    else:
+        st.line_chart(frame.set_index('timestamp')[column])
+    st.caption("The latest bucket is still filling up.")
+    
+    if subscription_level == 'pro':
+        with st.expander("📋 Daily rollups"):
+            st.dataframe(rollups['1d'].assign(hashrate=rollups['1d']['hashrate'].map(format_hashrate)),
+                         hide_index=True, use_container_width=True)
 
 def render_data_export(subscription_level):
     if subscription_level not in ['premium', 'pro']:
         show_upgrade_prompt(subscription_level, 'premium')
         return
     st.title("📋 Data Export")
-    st.success("Data export functionality!")
+    
+    username = st.session_state.get('username')
+    limit = get_tier_limits(APP_CONFIG, subscription_level).get('export_limit_per_month', 0)
+    used = get_export_count(username)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Exports This Month", used)
+    with col2:
+        st.metric("Monthly Limit", f"{limit}" if limit else "Unlimited")
+    with col3:
+        st.metric("Remaining", f"{max(limit - used, 0)}" if limit else "Unlimited")
+    
+    try:
+        columns = get_price_columns(refresh_price_data())
+    except Exception as e:
+        st.error(f"Error fetching data: {e}")
+        return
+    if columns is None or not len(columns['timestamp']):
+        st.error("Unable to load data")
+        return
+    
+    first_day = pd.Timestamp(int(columns['timestamp'][0])).date()
+    last_day = pd.Timestamp(int(columns['timestamp'][-1])).date()
+    
+    # Parquet needs pyarrow, which is optional
+    formats = [fmt for fmt in EXPORT_FORMATS if fmt != 'Parquet' or importlib.util.find_spec('pyarrow')]
+    
+    with st.form("export_form"):
+        col1, col2 = st.columns(2)
+        with col1:
+            date_range = st.date_input("Date Range", value=(first_day, last_day),
+                                       min_value=first_day, max_value=last_day)
+        with col2:
+            export_format = st.selectbox("Format", formats)
+        
+        submit_export = st.form_submit_button("📦 Prepare Export", type="primary")
+    
+    if submit_export:
+        start_day, end_day = (date_range[0], date_range[-1]) if date_range else (first_day, last_day)
+        
+        quota_message = f"❌ Monthly export limit of {limit} reached. Upgrade to Pro for unlimited exports."
+        if limit and get_export_count(username) >= limit:
+            st.error(quota_message)
+            return
+        
+        # Rows are serialized chunk by chunk straight from the shared columns into an
+        # unbuffered temp file on disk; the only in-memory copy is the one Streamlit
+        # reads from it to serve the download
+        chunks = iter_price_chunks(columns, start_day, pd.Timestamp(end_day) + timedelta(days=1))
+        extension, mime = EXPORT_FORMATS[export_format]
+        
+        with tempfile.TemporaryFile(buffering=0) as export_file:
+            try:
+                for part in stream_export(chunks, export_format):
+                    export_file.write(part)
+            except Exception as e:
+                st.error(f"Export failed: {e}")
+                return
+            
+            # Only a finished export counts against the quota
+            if not record_export(username, subscription_level):
+                st.error(quota_message)
+                return
+            
+            st.success(f"✅ Export ready ({export_file.tell() / 1024:,.0f} KB)")
+            st.download_button(
+                "⬇️ Download",
+                data=export_file,
+                file_name=f"kaspa_prices_{start_day}_{end_day}.{extension}",
+                mime=mime,
+                key="export_download"
+            )
 
 def render_upgrade_page(subscription_level):
     st.title("⭐ Upgrade Your Account")
@@ -1398,4 +2323,5 @@ def render_upgrade_page(subscription_level):
 
 # Run the application
 if __name__ == "__main__":
-    main()
+    with tracer.run():
+        main()
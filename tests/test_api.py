@@ -0,0 +1,136 @@
+"""JSON API: API-key checks, ETag revalidation (not metered), gzip and the daily quota"""
+import asyncio
+import gzip
+import json
+
+import pytest
+
+from kaspa_api import KaspaAPI, hash_api_key, issue_api_key
+from kaspa_data import DATA_SETTINGS_ENV
+
+DAILY_LIMIT = 3
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    for env_name in [*DATA_SETTINGS_ENV.values(), 'KASPA_USER_DB']:
+        monkeypatch.delenv(env_name, raising=False)
+    api = KaspaAPI({
+        'data_source': {'provider': 'synthetic', 'store_path': str(tmp_path / 'price_store')},
+        'user_store': {'db_path': str(tmp_path / 'users.db')},
+        'metering': {'flush_interval_seconds': 3600},
+        'api': {'refresh_seconds': 3600},
+        'subscription_tiers': {
+            'free': {'limits': {'api_calls_per_day': 0}},
+            'premium': {'limits': {'api_calls_per_day': DAILY_LIMIT}},
+        },
+    })
+    api._setup()
+    yield api
+    api.meter.close()
+
+@pytest.fixture
+def keys(api):
+    keys = {}
+    for username, subscription in [('freeuser', 'free'), ('premiumuser', 'premium')]:
+        api.users.add_user(username, f'{username}@example.com', 'Test', 'User', 'not-a-hash', subscription)
+        keys[subscription] = issue_api_key(api.users, username)
+    return keys
+
+def get(api, path, query='', **headers):
+    status, response_headers, body = api.handle('GET', path, query, headers)
+    return status, dict(response_headers), body
+
+def bearer(key):
+    return {'authorization': f'Bearer {key}'}
+
+def test_health_needs_no_key(api):
+    status, headers, body = get(api, '/v1/health')
+    assert status == 200 and json.loads(body)['status'] == 'ok'
+
+@pytest.mark.parametrize('headers, status', [
+    ({}, 401),
+    ({'authorization': 'Bearer kas_not-a-real-key'}, 401),
+    ({'authorization': 'Basic dXNlcjpwYXNz'}, 401),
+])
+def test_requests_without_a_valid_key_are_rejected(api, keys, headers, status):
+    code, _, body = get(api, '/v1/prices', **headers)
+    assert code == status
+    assert json.loads(body) == {'error': "Missing or invalid API key"}
+
+def test_plan_without_api_access_is_forbidden(api, keys):
+    status, _, body = get(api, '/v1/prices', **bearer(keys['free']))
+    assert status == 403 and 'free plan' in json.loads(body)['error']
+
+def test_only_the_key_hash_is_stored(api, keys):
+    assert api.users.username_for_api_key(hash_api_key(keys['premium'])) == 'premiumuser'
+    assert [key['key_hash'] for key in api.users.api_keys('premiumuser')] == [hash_api_key(keys['premium'])]
+
+def test_bad_requests(api, keys):
+    assert api.handle('POST', '/v1/prices', '', bearer(keys['premium']))[0] == 405
+    assert get(api, '/v1/nothing', **bearer(keys['premium']))[0] == 404
+    status, _, body = get(api, '/v1/prices', 'start=yesterday-ish', **{'x-api-key': keys['premium']})
+    assert status == 400 and json.loads(body) == {'error': "Invalid start: yesterday-ish"}
+
+def test_etag_revalidates_with_an_empty_304(api, keys):
+    auth = bearer(keys['premium'])
+    status, headers, body = get(api, '/v1/prices', 'start=2024-01-01&end=2024-02-01', **auth)
+    assert status == 200 and json.loads(body)['rows'] == 31
+    etag = headers['etag']
+
+    # Parameter order does not change the ETag; a different query does
+    assert get(api, '/v1/prices', 'end=2024-02-01&start=2024-01-01', **auth)[1]['etag'] == etag
+    assert get(api, '/v1/prices', 'start=2024-01-02&end=2024-02-01', **auth)[1]['etag'] != etag
+
+    status, headers, body = get(api, '/v1/prices', 'start=2024-01-01&end=2024-02-01',
+                                **{'if-none-match': f'"stale", {etag}'}, **auth)
+    assert (status, body, headers['etag']) == (304, b'', etag)
+
+    # Revalidating still needs a valid key
+    assert get(api, '/v1/prices', 'start=2024-01-01&end=2024-02-01', **{'if-none-match': etag})[0] == 401
+
+def test_gzip_only_when_accepted_and_worth_it(api, keys):
+    auth = bearer(keys['premium'])
+    status, headers, compressed = get(api, '/v1/prices', **{'accept-encoding': 'gzip, br'}, **auth)
+    assert status == 200 and headers['content-encoding'] == 'gzip'
+    assert int(headers['content-length']) == len(compressed)
+
+    status, headers, plain = get(api, '/v1/prices', **auth)
+    assert 'content-encoding' not in headers
+    assert gzip.decompress(compressed) == plain
+    assert len(compressed) < len(plain) / 2
+
+    # Bodies under GZIP_MIN_BYTES go out as-is
+    _, headers, _ = get(api, '/v1/health', **{'accept-encoding': 'gzip'})
+    assert 'content-encoding' not in headers
+
+def test_only_responses_with_data_are_metered(api, keys):
+    auth = bearer(keys['premium'])
+    status, headers, _ = get(api, '/v1/prices', **auth)
+    etag = headers['etag']
+    for _ in range(5):
+        assert get(api, '/v1/prices', **{'if-none-match': etag}, **auth)[0] == 304
+    assert api.meter.used('premiumuser') == 1
+
+    assert get(api, '/v1/indicators', 'names=sma,rsi', **auth)[0] == 200
+    assert api.meter.used('premiumuser') == 2
+
+    assert get(api, '/v1/power-law', **auth)[0] == 200
+    status, _, body = get(api, '/v1/prices', 'start=2024-01-01', **auth)
+    assert status == 429 and json.loads(body) == {'error': f"Daily limit of {DAILY_LIMIT} API calls reached"}
+    assert api.meter.used('premiumuser') == DAILY_LIMIT
+
+    # Data the client already holds can still be revalidated at the limit
+    assert get(api, '/v1/prices', **{'if-none-match': etag}, **auth)[0] == 304
+
+def test_head_over_asgi_sends_headers_only(api, keys):
+    sent = []
+
+    async def receive():
+        return {'type': 'http.request'}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': 'HEAD', 'path': '/v1/health', 'query_string': b'', 'headers': []}
+    asyncio.run(api(scope, receive, send))
+    assert sent[0]['status'] == 200 and sent[1]['body'] == b''
@@ -0,0 +1,91 @@
+"""Chart helpers: downsampling within the point budget for the chart's width and range, and figure templates"""
+import copy
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from kaspa_charts import (DATA_KEYS, MIN_POINTS, FigureTemplate, chart_point_budget, downsample_for_chart, lttb_indices,
+                          minmax_indices)
+
+@pytest.fixture(scope='module')
+def history():
+    rng = np.random.default_rng(7)
+    n = 50_000
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2020-01-01', periods=n, freq='h'),
+        'price': np.exp(np.cumsum(rng.normal(0, 0.01, n))),
+        'volume': rng.lognormal(10, 1, n),
+    })
+
+@pytest.mark.parametrize('threshold', [MIN_POINTS, 10, 800, 4999])
+def test_lttb_keeps_endpoints_within_budget(history, threshold):
+    x = history['timestamp'].to_numpy().view('int64')
+    idx = lttb_indices(x, history['price'].to_numpy(), threshold)
+    assert len(idx) == threshold
+    assert idx[0] == 0 and idx[-1] == len(history) - 1
+    assert (np.diff(idx) > 0).all()
+
+def test_lttb_passes_short_series_through():
+    assert list(lttb_indices(np.arange(5), np.arange(5.0), 10)) == [0, 1, 2, 3, 4]
+
+def test_minmax_keeps_every_extreme(history):
+    y = history['volume'].to_numpy()
+    idx = minmax_indices(y, 400)
+    assert len(idx) <= 2 * 400 + 2
+    assert idx[0] == 0 and idx[-1] == len(y) - 1
+    assert y.argmax() in idx and y.argmin() in idx
+
+@pytest.mark.parametrize('width_px', [400, 1600])
+def test_budget_follows_chart_width(history, width_px):
+    budget = chart_point_budget(width_px)
+    price = downsample_for_chart(history, 'price', width_px=width_px, method='lttb')
+    volume = downsample_for_chart(history, 'volume', width_px=width_px, method='minmax')
+    assert len(price) == budget
+    assert len(volume) <= budget + 2
+    assert price['timestamp'].iloc[0] == history['timestamp'].iloc[0]
+    assert price['timestamp'].iloc[-1] == history['timestamp'].iloc[-1]
+
+def test_x_range_zooms_before_downsampling(history):
+    start, end = pd.Timestamp('2022-01-01'), pd.Timestamp('2022-03-01')
+    visible = history[(history['timestamp'] >= start) & (history['timestamp'] < end)]
+
+    # Epoch ns, as select_time_range returns, or timestamps; end is exclusive
+    for x_range in [(start.value, end.value), (start, end)]:
+        points = downsample_for_chart(history, 'price', width_px=800, x_range=x_range)
+        assert len(points) == chart_point_budget(800)
+        assert points['timestamp'].iloc[0] == visible['timestamp'].iloc[0]
+        assert points['timestamp'].iloc[-1] == visible['timestamp'].iloc[-1]
+
+    # Zoomed in far enough, every point fits the budget and nothing is dropped
+    narrow = (start, start + pd.Timedelta(days=7))
+    assert len(downsample_for_chart(history, 'price', width_px=800, x_range=narrow)) == 7 * 24
+
+def test_unknown_method_is_rejected(history):
+    with pytest.raises(ValueError, match='Unknown downsampling method'):
+        downsample_for_chart(history, 'price', width_px=400, method='mean')
+
+def test_figure_template_is_not_changed_by_its_figures():
+    go = pytest.importorskip('plotly.graph_objects')
+    skeleton = go.Figure()
+    skeleton.add_trace(go.Scatter(name='KAS Price', line=dict(color='#70C7BA', width=2)))
+    skeleton.add_trace(go.Bar(name='Volume', yaxis='y2', marker=dict(color='gray')))
+    skeleton.update_layout(title="Price", yaxis2=dict(overlaying='y', side='right'))
+    template = FigureTemplate(skeleton)
+    traces, layout = copy.deepcopy(template.traces), copy.deepcopy(template.layout)
+
+    x = pd.date_range('2024-01-01', periods=3).to_numpy()
+    fig = template.figure({'x': x, 'y': np.array([1.0, 2.0, 3.0])}, {'x': x, 'y': np.array([5.0, 6.0, 7.0])},
+                          layout={'title': {'text': "Zoomed"}})
+    assert fig.layout.title.text == "Zoomed"
+    assert list(fig.data[1].y) == [5.0, 6.0, 7.0]
+
+    # Renders restyle their own figure; the shared template must not see it
+    fig.update_layout(height=300, title_text="Changed", yaxis2_side='left')
+    fig.update_traces(line_color='red', selector=dict(type='scatter'))
+    fig.data[1].marker.color = 'blue'
+    template.figure({'x': x, 'y': np.zeros(3)})
+
+    assert template.traces == traces
+    assert template.layout == layout
+    assert all(key not in trace for trace in template.traces for key in DATA_KEYS)
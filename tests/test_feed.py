@@ -0,0 +1,124 @@
+"""Live price feed: ring buffer, settings overrides, replay, ingester state and the websocket round trip"""
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from kaspa_feed import (FeedIngester, PriceFeed, ReplayFeed, TickRingBuffer, create_price_feed, decode_tick,
+                        encode_tick, load_feed_settings)
+
+class ScriptedFeed(PriceFeed):
+    """Yields one tick, then holds the connection until released and fails"""
+    name = 'scripted'
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def ticks(self, stop):
+        yield time.time_ns(), 0.1, 1.0
+        self.release.wait(5)
+        raise ConnectionError("feed dropped")
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+def test_ring_buffer_keeps_the_newest_ticks_in_order():
+    buffer = TickRingBuffer(capacity=4)
+    assert buffer.quote() is None and len(buffer) == 0
+    for i in range(6):
+        buffer.append(i, 1.0 + i, 10.0 * i)
+
+    assert (len(buffer), buffer.written, buffer.dropped) == (4, 6, 2)
+    window = buffer.window()
+    assert list(window['timestamp']) == [2, 3, 4, 5]
+    assert list(window['price']) == [3.0, 4.0, 5.0, 6.0]
+    assert list(buffer.window(2)['volume']) == [40.0, 50.0]
+
+    quote = buffer.quote()
+    assert quote['price'] == 6.0
+    assert quote['change_pct'] == pytest.approx(20.0)
+
+def test_ticks_round_trip_the_wire_format():
+    timestamp_ns = pd.Timestamp('2024-05-01 12:00:00.5').value
+    assert decode_tick(encode_tick(timestamp_ns, 0.123, 456.0)) == (timestamp_ns, 0.123, 456.0)
+    # ISO timestamps and a missing volume are accepted
+    assert decode_tick('{"timestamp": "2024-05-01T12:00:00", "price": "0.2"}') == (
+        pd.Timestamp('2024-05-01 12:00').value, 0.2, 0.0)
+
+@pytest.mark.parametrize('value, enabled, source', [
+    ('', False, 'websocket'),
+    ('off', False, 'websocket'),
+    ('0', False, 'websocket'),
+    ('1', True, 'websocket'),
+    ('true', True, 'websocket'),
+    ('ON', True, 'websocket'),
+    ('replay', True, 'replay'),
+])
+def test_environment_overrides_the_config(monkeypatch, value, enabled, source):
+    monkeypatch.setenv('KASPA_PRICE_FEED', value)
+    monkeypatch.delenv('KASPA_PRICE_FEED_URL', raising=False)
+    settings = load_feed_settings({'price_feed': {'source': 'websocket'}})
+    assert (settings['enabled'], settings['source']) == (enabled, source)
+    # Switching the feed on never leaves a source create_price_feed rejects
+    if enabled:
+        assert settings['source'] in ('replay', 'websocket')
+
+def test_relative_replay_path_is_resolved_against_the_app(monkeypatch):
+    monkeypatch.delenv('KASPA_PRICE_FEED', raising=False)
+    monkeypatch.setenv('KASPA_PRICE_FEED_URL', 'ws://feed.example:9000')
+    settings = load_feed_settings({'price_feed': {'replay_path': 'data/ticks.csv'}})
+    assert settings['replay_path'].endswith('/data/ticks.csv') and settings['replay_path'].startswith('/')
+    assert settings['websocket_url'] == 'ws://feed.example:9000'
+
+def test_unknown_source_is_rejected():
+    with pytest.raises(ValueError, match='Unknown price feed source'):
+        create_price_feed({'source': 'carrier-pigeon'})
+
+def test_replay_is_anchored_and_continues_across_loops():
+    frame = pd.DataFrame({'price': [1.0, 2.0, 4.0], 'volume': [1.0, 1.0, 1.0]})
+    stop = threading.Event()
+    prices = []
+    for _, price, _ in ReplayFeed(frame, interval=0, anchor_price=0.5).ticks(stop):
+        prices.append(price)
+        if len(prices) == 5:
+            stop.set()
+    # Second pass starts from the last price: 2.0 -> x2 -> 4.0 -> x2 -> 8.0
+    assert prices == pytest.approx([0.5, 1.0, 2.0, 4.0, 8.0])
+
+def test_ingester_reports_disconnect_after_a_failure():
+    feed = ScriptedFeed()
+    ingester = FeedIngester(feed, TickRingBuffer(16), reconnect_max=60)
+    try:
+        wait_for(lambda: ingester.stats()['ticks'] == 1)
+        assert ingester.stats()['connected']
+
+        feed.release.set()
+        wait_for(lambda: ingester.last_error is not None)
+        wait_for(lambda: not ingester.stats()['connected'])
+        stats = ingester.stats()
+        assert stats['last_error'] == 'ConnectionError: feed dropped'
+        assert stats['connects'] == 1
+    finally:
+        ingester.close()
+
+def test_websocket_feed_round_trip():
+    pytest.importorskip('websockets')
+    from kaspa_feed import WebSocketFeed, start_feed_server
+
+    frame = pd.DataFrame({'price': np.linspace(1.0, 2.0, 50), 'volume': np.ones(50)})
+    server, url = start_feed_server(lambda: ReplayFeed(frame, interval=0.001, anchor_price=1.0), port=0)
+    buffer = TickRingBuffer(8)
+    ingester = FeedIngester(WebSocketFeed(url, max_queue=4), buffer)
+    try:
+        wait_for(lambda: buffer.written >= 10)
+        assert ingester.stats()['connected']
+        prices = buffer.window()['price']
+        assert (np.diff(prices) > 0).all() and prices[0] >= 1.0
+    finally:
+        ingester.close()
+        server.shutdown()
@@ -0,0 +1,87 @@
+"""HttpPriceProvider and the price store against the offline fixture server"""
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+
+from kaspa_data import (HttpPriceProvider, PriceStore, SyntheticPriceProvider, make_fixture_handler,
+                        normalize_price_frame, start_fixture_server)
+
+@pytest.fixture
+def history():
+    return SyntheticPriceProvider(start='2024-01-01').fetch().iloc[:120].reset_index(drop=True)
+
+@pytest.fixture
+def server(history):
+    server, url = start_fixture_server(history.iloc[:100])
+    yield server, url
+    server.shutdown()
+    server.server_close()
+
+def serve(server, df):
+    # Later requests see `df`, as if the source had published new rows
+    server.RequestHandlerClass = make_fixture_handler(normalize_price_frame(df))
+
+def test_fetch_returns_full_history(server, history):
+    _, url = server
+    df = HttpPriceProvider(url).fetch()
+    pd.testing.assert_frame_equal(df, history.iloc[:100])
+
+def test_fetch_since_returns_only_newer_rows(server, history):
+    srv, url = server
+    serve(srv, history)
+    provider = HttpPriceProvider(url)
+    stored = {'timestamp': history['timestamp'].iloc[:100].to_numpy().view('int64'),
+              'price': history['price'].to_numpy()[:100]}
+
+    df = provider.fetch_since(stored)
+
+    pd.testing.assert_frame_equal(df, history.iloc[100:].reset_index(drop=True))
+
+def test_store_resumes_from_last_row(server, history, tmp_path):
+    srv, url = server
+    store = PriceStore(str(tmp_path / 'store'))
+    provider = HttpPriceProvider(url)
+
+    assert store.refresh(provider, 0)['rows'] == 100
+    serve(srv, history)
+    meta = store.refresh(provider, 0)
+
+    assert meta['rows'] == 120 and meta['source'] == 'http'
+    np.testing.assert_array_equal(store.load()['price'].to_numpy(), history['price'].to_numpy())
+
+def test_store_without_new_rows_keeps_its_data(server, history, tmp_path):
+    _, url = server
+    store = PriceStore(str(tmp_path / 'store'))
+    provider = HttpPriceProvider(url)
+    store.refresh(provider, 0)
+
+    assert store.refresh(provider, 0)['rows'] == 100
+
+def test_unknown_path_raises(server):
+    _, url = server
+    with pytest.raises(requests.HTTPError):
+        HttpPriceProvider(url.replace('/prices', '/missing')).fetch()
+
+def test_unreachable_source_raises_on_empty_store(tmp_path):
+    server, url = start_fixture_server(SyntheticPriceProvider(start='2024-01-01').fetch().iloc[:10])
+    server.shutdown()
+    server.server_close()
+    store = PriceStore(str(tmp_path / 'store'))
+
+    with pytest.raises(requests.ConnectionError):
+        store.refresh(HttpPriceProvider(url, timeout=2), 0)
+    assert store.read_meta() is None
+
+def test_unreachable_source_serves_stale_history(server, tmp_path):
+    srv, url = server
+    store = PriceStore(str(tmp_path / 'store'))
+    provider = HttpPriceProvider(url, timeout=2)
+    store.refresh(provider, 0)
+    srv.shutdown()
+    srv.server_close()
+
+    meta = store.refresh(provider, 0)
+
+    assert meta['rows'] == 100
+    assert len(store.load()) == 100
@@ -0,0 +1,100 @@
+"""UsageMeter: quotas (0 = unlimited), the cached flushed totals, and flushing to SQLite"""
+import sqlite3
+
+import pytest
+
+from kaspa_metering import UsageMeter
+from kaspa_users import ConnectionPool
+
+@pytest.fixture
+def pool(tmp_path):
+    return ConnectionPool(str(tmp_path / 'usage.db'))
+
+@pytest.fixture
+def make_meter(pool):
+    meters = []
+
+    def make(shared_pool=pool):
+        # The flush thread never fires during a test; flushes are explicit
+        meter = UsageMeter(shared_pool, flush_interval=3600)
+        meters.append(meter)
+        return meter
+
+    yield make
+    for meter in meters:
+        meter.close()
+
+def stored_count(pool, meter, username, metric='api_calls'):
+    with pool.connection() as conn:
+        row = conn.execute("SELECT count FROM usage_counters WHERE period = ? AND metric = ? AND username = ?",
+                           (meter.period(), metric, username)).fetchone()
+    return row['count'] if row else 0
+
+def test_zero_limit_is_unlimited(make_meter):
+    meter = make_meter()
+    assert all(meter.try_consume('alice', 'pro', 0) for _ in range(1000))
+    assert meter.used('alice') == 1000
+
+def test_limit_rejects_without_counting(make_meter):
+    meter = make_meter()
+    assert [meter.try_consume('bob', 'free', 3) for _ in range(5)] == [True, True, True, False, False]
+    assert meter.used('bob') == 3
+    # A request for more units than are left is rejected whole
+    assert not make_meter().try_consume('carol', 'free', 3, n=4)
+
+def test_flush_persists_pending_counts(make_meter, pool):
+    meter = make_meter()
+    meter.record('alice', 'pro', n=2)
+    meter.record('alice', 'pro', metric='exports', period='month')
+    assert stored_count(pool, meter, 'alice') == 0
+
+    meter.flush()
+    assert stored_count(pool, meter, 'alice') == 2
+    assert meter.used('alice') == 2 and meter.used('alice', 'exports', 'month') == 1
+
+    # Flushing twice does not double count
+    meter.flush()
+    assert stored_count(pool, meter, 'alice') == 2
+
+def test_persisted_total_is_read_once_then_cached(make_meter, pool):
+    first = make_meter()
+    first.record('alice', 'pro', n=4)
+    first.flush()
+
+    # A new process picks up the persisted total on first sight of the user
+    second = make_meter()
+    assert second.used('alice') == 4
+    assert second.try_consume('alice', 'pro', 5)
+    assert not second.try_consume('alice', 'pro', 5)
+
+    # Later usage by another worker is not re-read on every check...
+    first.record('alice', 'pro', n=10)
+    first.flush()
+    assert second.used('alice') == 5
+    # ...but the next flush refreshes the cached total from the database
+    second.flush()
+    assert second.used('alice') == 15
+    assert stored_count(pool, second, 'alice') == 15
+
+def test_failed_flush_keeps_the_counts(make_meter, pool, monkeypatch):
+    meter = make_meter()
+    meter.record('alice', 'pro', n=3)
+
+    def broken_transaction():
+        raise sqlite3.OperationalError("database is locked")
+    monkeypatch.setattr(pool, 'transaction', broken_transaction)
+    meter.flush()
+    assert meter.used('alice') == 3
+
+    monkeypatch.undo()
+    meter.flush()
+    assert stored_count(pool, meter, 'alice') == 3 and meter.used('alice') == 3
+
+def test_aggregates_by_user_and_tier(make_meter):
+    for meter in (make_meter(), make_meter(shared_pool=None)):
+        meter.record('alice', 'pro', n=5)
+        meter.record('bob', 'premium', n=2)
+        meter.record('carol', 'premium', n=7)
+
+        assert meter.top_consumers(limit=2) == [('carol', 'premium', 7), ('alice', 'pro', 5)]
+        assert meter.tier_totals() == {'pro': {'users': 1, 'count': 5}, 'premium': {'users': 2, 'count': 9}}
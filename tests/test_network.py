@@ -0,0 +1,172 @@
+"""Network rollups: RollupAccumulator against pandas, incremental store refreshes and fixture CSV resume"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from kaspa_network import (ROLLUP_DTYPES, ROLLUP_RESOLUTIONS, FixtureBlockSource, NetworkStore, RollupAccumulator,
+                           SyntheticBlockSource, _slice_chunk, iter_rollups, rows_to_columns, write_fixture)
+
+HOUR = ROLLUP_RESOLUTIONS['1h']
+START = pd.Timestamp('2026-03-01').value
+
+@pytest.fixture(scope='module')
+def blocks():
+    rng = np.random.default_rng(5)
+    timestamps = START + np.sort(rng.integers(0, 5 * HOUR, 4000))
+    tx_count = rng.poisson(3, len(timestamps))
+    address_timestamp = np.repeat(timestamps, tx_count)
+    return {
+        'timestamp': timestamps,
+        'difficulty': rng.uniform(1e15, 2e15, len(timestamps)),
+        'tx_count': tx_count,
+        'address_timestamp': address_timestamp,
+        'address': rng.integers(0, 3000, len(address_timestamp)).astype(np.uint64),
+    }
+
+def expected_rollup(blocks, resolution):
+    frame = pd.DataFrame({'timestamp': blocks['timestamp'], 'work': 2 * blocks['difficulty'],
+                          'tx_count': blocks['tx_count']})
+    grouped = frame.groupby(frame['timestamp'] - frame['timestamp'] % resolution)
+    expected = pd.DataFrame({
+        'blocks': grouped.size(),
+        'tx_count': grouped['tx_count'].sum(),
+        'work': grouped['work'].sum(),
+        'first_block': grouped['timestamp'].min(),
+        'last_block': grouped['timestamp'].max(),
+    })
+    addresses = pd.Series(blocks['address'])
+    expected['active_addresses'] = addresses.groupby(
+        blocks['address_timestamp'] - blocks['address_timestamp'] % resolution).nunique()
+    return expected
+
+def split(blocks, cuts):
+    """Chunks of `blocks` cut at the given timestamps"""
+    bounds = [None, *cuts, None]
+    return [_slice_chunk(blocks, lo, hi) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+def accumulate(chunks, accumulator):
+    rows = [row for chunk in chunks for row in accumulator.feed(chunk)]
+    return rows, accumulator
+
+def assert_rollups_equal(actual, expected):
+    for column in ROLLUP_DTYPES:
+        if column == 'work':
+            # Summed in a different order
+            np.testing.assert_allclose(actual[column], expected[column], rtol=1e-9)
+        else:
+            np.testing.assert_array_equal(actual[column], expected[column])
+
+@pytest.mark.parametrize('resolution', [HOUR, 20 * 60 * 10**9])
+def test_accumulator_matches_pandas(blocks, resolution):
+    cuts = [START + HOUR // 3, START + HOUR, START + HOUR + 1, START + 4 * HOUR + 17]
+    rows, accumulator = accumulate(split(blocks, cuts), RollupAccumulator(resolution))
+    row, addresses = accumulator.open_bucket()
+    columns = rows_to_columns(rows + [row])
+
+    expected = expected_rollup(blocks, resolution)
+    np.testing.assert_array_equal(columns['timestamp'], expected.index.to_numpy())
+    for column in ['blocks', 'tx_count', 'first_block', 'last_block', 'active_addresses']:
+        np.testing.assert_array_equal(columns[column], expected[column].to_numpy())
+    np.testing.assert_allclose(columns['work'], expected['work'].to_numpy(), rtol=1e-9)
+    # The open bucket keeps its distinct addresses for the next refresh
+    assert len(addresses) == row['active_addresses'] and (np.diff(addresses.astype(np.int64)) > 0).all()
+
+def test_accumulator_resumes_from_its_open_bucket(blocks):
+    one_pass, accumulator = accumulate(split(blocks, [START + HOUR]), RollupAccumulator(HOUR))
+    one_pass.append(accumulator.open_bucket()[0])
+
+    # Stop mid-hour, then continue in a new accumulator from the saved open bucket
+    middle = START + 2 * HOUR + HOUR // 2
+    first, accumulator = accumulate(split(_slice_chunk(blocks, end=middle), [START + HOUR]), RollupAccumulator(HOUR))
+    row, addresses = accumulator.open_bucket()
+    rest, resumed = accumulate([_slice_chunk(blocks, start=middle)], RollupAccumulator(HOUR, row, addresses))
+    resumed_rows = first + rest + [resumed.open_bucket()[0]]
+
+    assert_rollups_equal(rows_to_columns(resumed_rows), rows_to_columns(one_pass))
+
+def test_iter_rollups_feeds_every_resolution(blocks):
+    accumulators = {name: RollupAccumulator(resolution) for name, resolution in ROLLUP_RESOLUTIONS.items()}
+    closed = {}
+    for name, rows in iter_rollups(split(blocks, [START + HOUR, START + 3 * HOUR]), accumulators):
+        closed.setdefault(name, []).extend(rows)
+    # Five hours in one day: four closed hours, the day still open
+    assert len(closed['1h']) == 4 and '1d' not in closed
+    assert accumulators['1d'].open_bucket()[0]['blocks'] == len(blocks['timestamp'])
+
+def parsed_rows(source, since):
+    """Rows a FixtureBlockSource parses from its CSV for a read from `since`"""
+    return sum(len(frame) for frame in source._csv_frames(since))
+
+def synthetic_source(hours, days=2):
+    # 180 blocks an hour keeps the history small
+    return SyntheticBlockSource(days=days, blocks_per_second=0.05, now=(START + hours * HOUR) / 1e9)
+
+def build(tmp_path, name, source):
+    store = NetworkStore(str(tmp_path / name))
+    return store, store.refresh(source, 0, force=True)
+
+def test_incremental_refresh_matches_a_full_build(tmp_path):
+    # History from START - 62h
+    source = synthetic_source(10.5, days=3)
+    store, meta = build(tmp_path, 'incremental', source)
+    # Later reads continue mid-hour and across the day boundary
+    for hours in (11.25, 13.0, 30.75):
+        source.now = (START + hours * HOUR) / 1e9
+        meta = store.refresh(source, 0, force=True)
+
+    # The same history in one read: the window is longer by the time that passed
+    _, full_meta = build(tmp_path, 'full', synthetic_source(30.75, days=92 / 24))
+    full = NetworkStore(str(tmp_path / 'full'))
+    assert meta['rows'] == full_meta['rows'] and meta['last_block'] == full_meta['last_block']
+    for name in ROLLUP_RESOLUTIONS:
+        assert_rollups_equal(store.columns(meta)[name], full.columns(full_meta)[name])
+        np.testing.assert_array_equal(store.open_addresses(meta, name), full.open_addresses(full_meta, name))
+
+def test_fixture_csv_resumes_from_the_byte_offset(tmp_path):
+    log = tmp_path / 'blocks.csv'
+    reference = tmp_path / 'reference.csv'
+    rows = write_fixture(str(reference), synthetic_source(20))
+    lines = reference.read_bytes().splitlines(keepends=True)
+    header, body = lines[0], lines[1:]
+    assert len(body) == rows
+
+    # The writer is mid-way through a line when the first refresh reads
+    cut = len(body) // 2
+    log.write_bytes(header + b''.join(body[:cut]) + body[cut][:10])
+    source = FixtureBlockSource(str(log), chunk_rows=500)
+    store, meta = build(tmp_path, 'resumed', source)
+    inode, offset, _ = source._resume
+    assert offset == len(header) + sum(map(len, body[:cut]))
+
+    with open(log, 'ab') as fh:
+        fh.write(body[cut][10:] + b''.join(body[cut + 1:]))
+    # Only the appended rows are parsed, not just the ones passed on
+    resume = source._resume
+    assert parsed_rows(source, meta['last_block'] + 1) == len(body) - cut
+    source._resume = resume
+    meta = store.refresh(source, 0, force=True)
+    assert source._resume[1] == log.stat().st_size
+
+    _, full_meta = build(tmp_path, 'full', FixtureBlockSource(str(reference)))
+    full = NetworkStore(str(tmp_path / 'full'))
+    for name in ROLLUP_RESOLUTIONS:
+        assert_rollups_equal(store.columns(meta)[name], full.columns(full_meta)[name])
+
+def test_replaced_or_truncated_fixture_is_read_from_the_start(tmp_path):
+    log = tmp_path / 'blocks.csv'
+    write_fixture(str(log), synthetic_source(6))
+    source = FixtureBlockSource(str(log))
+    last = max(int(chunk['timestamp'][-1]) for chunk in source.chunks())
+    assert parsed_rows(source, last + 1) == 0
+
+    # A new file (new inode) with the same history plus more
+    replacement = tmp_path / 'replacement.csv'
+    rows = write_fixture(str(replacement), synthetic_source(8))
+    os.replace(replacement, log)
+    assert parsed_rows(source, last + 1) == rows
+
+    # Truncated in place, below the saved offset
+    rows = write_fixture(str(log), synthetic_source(8, days=1))
+    assert parsed_rows(source, last + 1) == rows
@@ -0,0 +1,55 @@
+"""PasswordHasher: bcrypt in worker processes, overlapping concurrent logins"""
+import os
+import threading
+import time
+
+import bcrypt
+import pytest
+
+from kaspa_users import PasswordHasher, is_bcrypt_hash
+
+@pytest.fixture(scope='module')
+def hasher():
+    hasher = PasswordHasher(max_workers=2)
+    yield hasher
+    hasher.shutdown()
+
+def timed_check(password, hashed_password):
+    """bcrypt check that reports which process ran it and when"""
+    start = time.time()
+    ok = bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+    return os.getpid(), start, time.time(), ok
+
+def test_hash_and_check(hasher):
+    hashed = hasher.hash('hunter22')
+
+    assert is_bcrypt_hash(hashed)
+    assert hasher.hash(hashed) == hashed
+    assert hasher.check('hunter22', hashed)
+    assert not hasher.check('hunter23', hashed)
+
+def test_hash_many_skips_existing_hashes(hasher):
+    existing = hasher.hash('one')
+    hashed = hasher.hash_many([existing, 'two'])
+
+    assert hashed[0] == existing
+    assert hasher.check('two', hashed[1])
+
+def test_concurrent_logins_overlap_in_worker_processes(hasher):
+    hashed = hasher.hash('hunter22')
+    results = [None, None]
+
+    def login(i):
+        results[i] = hasher._executor.submit(timed_check, 'hunter22', hashed).result()
+
+    threads = [threading.Thread(target=login, args=(i,)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    (pid_a, start_a, end_a, ok_a), (pid_b, start_b, end_b, ok_b) = results
+    assert ok_a and ok_b
+    # Two worker processes, neither of them this one, checking at the same time
+    assert len({pid_a, pid_b, os.getpid()}) == 3
+    assert start_a < end_b and start_b < end_a
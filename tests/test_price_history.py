@@ -0,0 +1,73 @@
+"""CompactPriceHistory against TimeSeriesIndex: same range queries, float32 storage only"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from kaspa_analytics import IncrementalPowerLaw
+from kaspa_data import (COMPACT_RTOL, NS_PER_DAY, CompactPriceHistory, SyntheticPriceProvider, TimeRangeIndex,
+                        TimeSeriesIndex, price_columns)
+
+@pytest.fixture(scope='module')
+def columns():
+    return price_columns(SyntheticPriceProvider(start='2022-01-01').fetch())
+
+@pytest.fixture(scope='module')
+def indexes(columns):
+    return TimeSeriesIndex(columns), CompactPriceHistory.from_columns(columns)
+
+def test_both_implement_the_range_contract(indexes):
+    full, compact = indexes
+    assert isinstance(full, TimeRangeIndex) and isinstance(compact, TimeRangeIndex)
+    # The store index keeps its column attributes
+    assert full.timestamps is full.columns['timestamp']
+
+def test_range_queries_agree(indexes, columns):
+    full, compact = indexes
+    timestamps = columns['timestamp']
+    assert (len(full), full.start, full.end) == (len(compact), compact.start, compact.end)
+
+    probes = [None, int(timestamps[0]) - 1, int(timestamps[10]), int(timestamps[10]) + 1,
+              '2023-06-01', pd.Timestamp('2024-02-29 12:00'), int(timestamps[-1]) + 1]
+    for start in probes:
+        for end in probes:
+            assert full.bounds(start, end) == compact.bounds(start, end)
+
+    for days in (None, 7, 30, 365):
+        assert full.trailing(days) == compact.trailing(days)
+    for retention in (0, 7, 90):
+        assert full.retention_start(retention) == compact.retention_start(retention)
+
+def test_windows_match_the_original_columns(indexes, columns):
+    full, compact = indexes
+    start, end = full.trailing(90)
+    expected, window = full.window(start, end), compact.window(start, end)
+
+    np.testing.assert_array_equal(window['timestamp'], expected['timestamp'])
+    np.testing.assert_allclose(window['price'], expected['price'], rtol=COMPACT_RTOL)
+    np.testing.assert_allclose(window['volume'], expected['volume'], rtol=COMPACT_RTOL)
+
+def test_storage_is_narrowed_but_analytics_get_float64(indexes, columns):
+    _, compact = indexes
+    assert compact.price.dtype == np.float32 and compact.volume.dtype == np.float32
+    assert compact.nbytes < sum(values.nbytes for values in columns.values()) / 2
+
+    window = compact.window()
+    assert window['price'].dtype == np.float64 and window['volume'].dtype == np.float64
+    frame = compact.frame()
+    assert frame['price'].dtype == np.float64 and frame['volume'].dtype == np.float64
+
+def test_power_law_fit_on_compact_frame(indexes):
+    full, compact = indexes
+    expected = IncrementalPowerLaw().sync(full.frame())
+    fit = IncrementalPowerLaw().sync(compact.frame())
+
+    assert fit.slope == pytest.approx(expected.slope, rel=1e-6)
+    assert fit.intercept == pytest.approx(expected.intercept, rel=1e-6)
+
+def test_values_that_do_not_fit_float32_stay_float64():
+    timestamps = np.arange(3, dtype=np.int64) * NS_PER_DAY
+    price = np.array([0.1234567890123, 1e40, 5.0])
+    compact = CompactPriceHistory.from_columns({'timestamp': timestamps, 'price': price, 'volume': np.ones(3)})
+
+    assert compact.price.dtype == np.float64
+    np.testing.assert_array_equal(compact.window()['price'], price)
@@ -0,0 +1,136 @@
+"""PriceStore refreshes: failure backoff and appends under concurrent readers"""
+import logging
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from kaspa_data import PriceDataProvider, PriceStore, SyntheticPriceProvider
+
+class FlakyProvider(PriceDataProvider):
+    """Synthetic history that can be switched to fail; counts calls"""
+    name = 'flaky'
+
+    def __init__(self):
+        self.synthetic = SyntheticPriceProvider(start='2024-01-01')
+        self.failing = False
+        self.calls = 0
+
+    def fetch(self):
+        self.calls += 1
+        if self.failing:
+            raise ConnectionError("source down")
+        return self.synthetic.fetch()
+
+@pytest.fixture
+def store(tmp_path):
+    return PriceStore(str(tmp_path / 'store'), retry_seconds=60)
+
+def test_failure_is_recorded_and_logged(store, caplog):
+    provider = FlakyProvider()
+    version = store.refresh(provider, 0, incremental=False)['version']
+    provider.failing = True
+
+    with caplog.at_level(logging.WARNING, logger='kaspa_data'):
+        meta = store.refresh(provider, 0, incremental=False)
+
+    assert meta['version'] == version
+    assert meta['failures'] == 1 and meta['last_error'] == 'ConnectionError: source down'
+    assert store.read_meta()['failed_at'] == meta['failed_at']
+    assert 'source down' in caplog.text
+
+def test_stale_version_is_served_without_retrying_during_backoff(store):
+    provider = FlakyProvider()
+    store.refresh(provider, 0, incremental=False)
+    provider.failing = True
+    store.refresh(provider, 0, incremental=False)
+    calls = provider.calls
+
+    meta = store.refresh(provider, 0, incremental=False)
+
+    assert provider.calls == calls
+    assert meta['failures'] == 1
+
+def test_backoff_doubles_and_is_capped(store):
+    meta = {'failed_at': 1000.0, 'failures': 1}
+    assert store.retry_at(meta) == 1060.0
+    meta['failures'] = 3
+    assert store.retry_at(meta) == 1240.0
+    meta['failures'] = 20
+    assert store.retry_at(meta) == 1000.0 + store.max_retry_seconds
+    assert store.retry_at({'version': 1}) is None
+
+def test_retry_after_backoff_and_success_clears_failure(store):
+    provider = FlakyProvider()
+    store.refresh(provider, 0, incremental=False)
+    provider.failing = True
+    store.refresh(provider, 0, incremental=False)
+
+    store.retry_seconds = 0
+    assert store.refresh(provider, 0, incremental=False)['failures'] == 2
+
+    provider.failing = False
+    meta = store.refresh(provider, 0, incremental=False)
+    assert not any(key in meta for key in PriceStore.FAILURE_KEYS)
+    assert not any(key in store.read_meta() for key in PriceStore.FAILURE_KEYS)
+
+def test_force_ignores_backoff(store):
+    provider = FlakyProvider()
+    store.refresh(provider, 0, incremental=False)
+    provider.failing = True
+    store.refresh(provider, 0, incremental=False)
+    calls = provider.calls
+
+    store.refresh(provider, 0, incremental=False, force=True)
+
+    assert provider.calls == calls + 1
+
+def test_append_past_crashed_tail(store):
+    provider = FlakyProvider()
+    history = provider.fetch()
+    store.write(history.iloc[:100])
+    meta = store.read_meta()
+    # An append that wrote its rows but crashed before publishing CURRENT
+    with open(os.path.join(store.path, meta['dir'], 'price.bin'), 'ab') as fh:
+        fh.write(np.full(50, -1.0).tobytes())
+
+    assert len(store.load()) == 100
+    with store.lock():
+        store.append(history.iloc[100:130])
+
+    np.testing.assert_array_equal(store.load()['price'].to_numpy(), history['price'].to_numpy()[:130])
+
+def test_readers_see_consistent_history_during_appends(store):
+    history = FlakyProvider().fetch()
+    expected = history['price'].to_numpy()
+    store.write(history.iloc[:50])
+    done = threading.Event()
+    errors = []
+
+    def read():
+        # A separate instance, as another worker process would have
+        reader = PriceStore(store.path)
+        while not done.is_set():
+            try:
+                meta = reader.read_meta()
+                price = reader.columns(meta)['price']
+                assert len(price) == meta['rows']
+                np.testing.assert_array_equal(np.asarray(price), expected[:meta['rows']])
+            except Exception as e:
+                errors.append(e)
+                return
+
+    readers = [threading.Thread(target=read) for _ in range(3)]
+    for thread in readers:
+        thread.start()
+    rows = 50
+    while rows < len(history):
+        with store.lock():
+            rows = store.append(history.iloc[rows:rows + 5])['rows']
+    done.set()
+    for thread in readers:
+        thread.join()
+
+    assert errors == []
+    assert store.read_meta()['rows'] == len(history)
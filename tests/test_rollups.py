@@ -0,0 +1,101 @@
+"""RollupCube: bars match pandas aggregates of the ticks, sync is incremental, select fits the chart's bar budget"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from kaspa_charts import chart_point_budget
+from kaspa_rollups import PIXELS_PER_CANDLE, RollupCube
+
+DAYS = 30
+
+@pytest.fixture(scope='module')
+def columns():
+    rng = np.random.default_rng(3)
+    timestamps = pd.date_range('2024-03-01', periods=DAYS * 1440, freq='min').as_unit('ns')
+    n = len(timestamps)
+    return {
+        'timestamp': timestamps.asi8,
+        'price': np.exp(np.cumsum(rng.normal(0, 0.001, n))),
+        'volume': rng.lognormal(5, 1, n),
+    }
+
+@pytest.fixture(scope='module')
+def cube(columns):
+    return RollupCube().sync(columns)
+
+def ns(value):
+    return pd.Timestamp(value).value
+
+def expected_bars(columns, period):
+    """OHLCV per `period`, grouped by pandas; bins start on a Monday so weekly bars line up"""
+    index = pd.DatetimeIndex(columns['timestamp'].view('datetime64[ns]'))
+    starts = index - (index - pd.Timestamp('2024-02-26')) % pd.Timedelta(period)
+    ticks = pd.DataFrame({'price': columns['price'], 'volume': columns['volume']}, index=index)
+    grouped = ticks.groupby(starts)
+    bars = grouped['price'].agg(['first', 'max', 'min', 'last'])
+    bars.columns = ['open', 'high', 'low', 'close']
+    bars['volume'] = grouped['volume'].sum()
+    return bars
+
+@pytest.mark.parametrize('resolution, period', [('1h', '1h'), ('1d', '1D'), ('1w', '7D')])
+def test_bars_match_pandas(cube, columns, resolution, period):
+    bars, used = cube.select(ns('2024-01-01'), ns('2030-01-01'), resolution=resolution)
+    assert used == resolution
+    expected = expected_bars(columns, period)
+    assert list(bars['timestamp']) == list(expected.index)
+    for field in ['open', 'high', 'low', 'close', 'volume']:
+        np.testing.assert_allclose(bars[field].to_numpy(), expected[field].to_numpy(), rtol=1e-12)
+    if resolution == '1w':
+        assert (bars['timestamp'].dt.dayofweek == 0).all()
+
+def test_incremental_sync_matches_a_full_build(cube, columns):
+    grown = RollupCube()
+    # Cuts mid-bar at every level
+    for cut in [1000, 1001, 20_000, 30_017, len(columns['timestamp'])]:
+        grown.sync({name: values[:cut] for name, values in columns.items()})
+    assert grown.rows == cube.rows
+    for name in cube.resolutions:
+        full, part = cube.levels[name], grown.levels[name]
+        assert full.size == part.size
+        full_frame, part_frame = full.frame(0, full.size), part.frame(0, part.size)
+        pd.testing.assert_frame_equal(full_frame.drop(columns='volume'), part_frame.drop(columns='volume'))
+        np.testing.assert_allclose(full_frame['volume'], part_frame['volume'], rtol=1e-12)
+
+def test_rewritten_history_rebuilds(columns):
+    cube = RollupCube(['1d']).sync(columns)
+    shifted = {name: values[1440:] for name, values in columns.items()}
+    cube.sync(shifted)
+    assert cube.rows == len(shifted['timestamp']) and cube.levels['1d'].size == DAYS - 1
+
+@pytest.mark.parametrize('start, end, width_px, resolution', [
+    # 1600 px fits 400 candles
+    ('2024-03-10', '2024-03-10 06:00', 1600, '1m'),   # 360 minutes
+    ('2024-03-10', '2024-03-11', 1600, '1h'),         # 1,440 minutes, 24 hours
+    ('2024-03-03', '2024-03-17', 1600, '1h'),         # 336 hours
+    ('2024-03-01', '2024-03-31', 1600, '1d'),         # 720 hours, 30 days
+    # A narrower chart steps down to coarser bars for the same range
+    ('2024-03-10', '2024-03-10 06:00', 800, '1h'),    # 200 candles: 360 minutes no longer fit
+    ('2024-03-03', '2024-03-17', 400, '1d'),          # 100 candles
+    # Nothing fits: the coarsest level is the best there is
+    ('2024-03-01', '2024-03-31', 12, '1w'),
+])
+def test_select_picks_the_finest_level_within_budget(cube, start, end, width_px, resolution):
+    bars, used = cube.select(ns(start), ns(end), width_px=width_px)
+    assert used == resolution
+    budget = chart_point_budget(width_px, 1 / PIXELS_PER_CANDLE)
+    if resolution != '1w':
+        assert 0 < len(bars) <= budget
+    # The bars overlap [start, end): the first may start before it, none at or after its end
+    assert bars['timestamp'].iloc[0] <= pd.Timestamp(start) < bars['timestamp'].iloc[1]
+    assert bars['timestamp'].iloc[-1] < pd.Timestamp(end)
+
+def test_levels_without_extra_detail_lose_the_tie():
+    # Daily ticks: minute and hourly bars are the daily bars again
+    timestamps = pd.date_range('2024-01-01', periods=60, freq='D').as_unit('ns').asi8
+    cube = RollupCube().sync({'timestamp': timestamps, 'price': np.linspace(1, 2, 60), 'volume': np.ones(60)})
+    bars, used = cube.select(ns('2024-01-01'), ns('2024-03-01'))
+    assert (used, len(bars)) == ('1d', 60)
+
+def test_forced_resolution_ignores_the_budget(cube):
+    bars, used = cube.select(ns('2024-03-01'), ns('2024-03-02'), width_px=12, resolution='1m')
+    assert (used, len(bars)) == ('1m', 1440)
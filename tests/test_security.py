@@ -0,0 +1,94 @@
+"""Login rate limiting: token buckets, sliding-window failure counts and persisted lockouts"""
+import pytest
+
+import kaspa_security
+from kaspa_security import LoginRateLimiter, SlidingWindowCounter, TokenBucket
+from kaspa_users import ConnectionPool
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(kaspa_security.time, 'time', clock)
+    return clock
+
+def test_token_bucket_allows_a_burst_then_the_rate():
+    bucket = TokenBucket(3, now=0.0)
+    assert [bucket.take(3, 0.5, 0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.take(3, 0.5, 0.0) == pytest.approx(2.0)
+    assert bucket.take(3, 0.5, 2.0) == 0.0
+    assert not bucket.is_full(3, 0.5, 7.0) and bucket.is_full(3, 0.5, 8.0)
+
+def test_sliding_window_weights_the_previous_window():
+    counter = SlidingWindowCounter(60, now=0.0)
+    for _ in range(4):
+        counter.add(60, 10.0)
+    assert counter.count(60, 59.0) == 4
+    # A quarter into the next window, three quarters of the last one still count
+    assert counter.count(60, 75.0) == pytest.approx(3.0)
+    # Two windows on, nothing is left
+    assert counter.count(60, 185.0) == 0
+
+def test_burst_then_throttle_per_username_and_ip(clock):
+    limiter = LoginRateLimiter(burst=3, attempts_per_minute=6)
+    assert [limiter.acquire('alice', '10.0.0.1') for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire('alice', '10.0.0.1') == pytest.approx(10.0)
+
+    # The IP is out of tokens whatever username it tries next
+    assert limiter.acquire('bob', '10.0.0.1') == pytest.approx(10.0)
+    # The username is throttled from another IP, and without a known IP
+    assert limiter.acquire('ALICE ', '10.0.0.2') > 0
+    assert limiter.acquire('carol', None) == 0.0
+
+    clock.now += 10
+    assert limiter.acquire('dave', '10.0.0.1') == 0.0
+
+def test_repeated_failures_lock_the_key_out(clock):
+    limiter = LoginRateLimiter(max_failed_attempts=3, lockout_seconds=600)
+    assert limiter.record_failure('alice', '10.0.0.1') == 0
+    assert limiter.record_failure('alice', '10.0.0.1') == 0
+    assert limiter.record_failure('alice', '10.0.0.1') == 600
+
+    assert limiter.acquire('alice', '10.0.0.9') == pytest.approx(600)
+    assert limiter.acquire('bob', '10.0.0.1') == pytest.approx(600)
+    assert set(limiter.active_lockouts()) == {'user:alice', 'ip:10.0.0.1'}
+
+    clock.now += 601
+    assert limiter.acquire('alice', '10.0.0.9') == 0.0
+    assert limiter.active_lockouts() == {}
+
+def test_success_clears_the_username_but_not_the_ip(clock):
+    limiter = LoginRateLimiter(max_failed_attempts=3, lockout_seconds=600)
+    for _ in range(2):
+        limiter.record_failure('alice', '10.0.0.1')
+    limiter.record_success('alice', '10.0.0.1')
+
+    assert limiter.record_failure('alice', '10.0.0.1') == 600
+    assert set(limiter.active_lockouts()) == {'ip:10.0.0.1'}
+
+def test_lockouts_survive_a_restart_until_unlocked(clock, tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'users.db'))
+    limiter = LoginRateLimiter(max_failed_attempts=1, lockout_seconds=600, pool=pool)
+    limiter.record_failure('alice')
+
+    restarted = LoginRateLimiter(max_failed_attempts=1, lockout_seconds=600, pool=pool)
+    assert restarted.locked_for(restarted.keys('alice')) == pytest.approx(600)
+
+    restarted.unlock('Alice')
+    assert restarted.acquire('alice') == 0.0
+    assert LoginRateLimiter(pool=pool).active_lockouts() == {}
+
+def test_idle_keys_are_swept(clock):
+    limiter = LoginRateLimiter(burst=2, attempts_per_minute=60, max_keys=10)
+    for i in range(10):
+        limiter.acquire(f'user{i}')
+    clock.now += 60
+    # The next new key tips it over; every refilled bucket is dropped
+    limiter.acquire('newcomer')
+    assert list(limiter._buckets) == ['user:newcomer']
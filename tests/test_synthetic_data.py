@@ -0,0 +1,39 @@
+"""The vectorized synthetic price generator must reproduce the original per-day loop"""
+import numpy as np
+import pandas as pd
+
+from kaspa_data import HISTORY_START, generate_synthetic_price_data
+
+def loop_price_data(dates, seed=42, base_price=0.02):
+    """The per-day loop generate_synthetic_price_data replaced"""
+    rng = np.random.RandomState(seed)
+    prices = []
+    current_price = base_price
+    for i in range(len(dates)):
+        trend = 0.001 * np.sin(i / 50) + 0.0005
+        volatility = rng.normal(0, 0.05)
+        current_price *= (1 + trend + volatility)
+        prices.append(max(current_price, 0.001))
+    volumes = rng.lognormal(15, 1, len(dates))
+    return np.array(prices), volumes
+
+def test_matches_loop_at_seed_42():
+    dates = pd.date_range(start=HISTORY_START, end='2026-10-18', freq='D')
+    prices, volumes = loop_price_data(dates)
+
+    df = generate_synthetic_price_data(dates, seed=42)
+
+    assert list(df.columns) == ['timestamp', 'price', 'volume']
+    assert (df['timestamp'] == dates).all()
+    np.testing.assert_array_equal(df['price'].to_numpy(), prices)
+    np.testing.assert_array_equal(df['volume'].to_numpy(), volumes)
+
+def test_price_floor_matches_loop():
+    # Starting below the 0.001 floor exercises the clamp
+    dates = pd.date_range(start=HISTORY_START, periods=200, freq='D')
+    prices, _ = loop_price_data(dates, base_price=0.0005)
+
+    df = generate_synthetic_price_data(dates, seed=42, base_price=0.0005)
+
+    np.testing.assert_array_equal(df['price'].to_numpy(), prices)
+    assert df['price'].min() >= 0.001
@@ -0,0 +1,80 @@
+"""TimeSeriesIndex: binary-search range queries against boolean masks, views not copies, retention limits"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from kaspa_data import NS_PER_DAY, TIME_RANGE_DAYS, TimeSeriesIndex
+
+@pytest.fixture(scope='module')
+def columns():
+    rng = np.random.default_rng(9)
+    # Irregular gaps, including repeated timestamps
+    timestamps = pd.Timestamp('2024-01-01').value + np.cumsum(rng.integers(0, 3 * 3600, 5000)) * 10**9
+    return {
+        'timestamp': timestamps.astype(np.int64),
+        'price': rng.uniform(0.01, 0.2, len(timestamps)),
+        'volume': rng.uniform(1e6, 1e7, len(timestamps)),
+    }
+
+@pytest.fixture(scope='module')
+def index(columns):
+    return TimeSeriesIndex(columns)
+
+def test_bounds_match_a_boolean_mask(index, columns):
+    timestamps = columns['timestamp']
+    rng = np.random.default_rng(1)
+    probes = np.concatenate((timestamps[[0, 1, 2500, 2501, -1]], timestamps[[0, -1]] + [-1, 1],
+                             rng.integers(timestamps[0] - NS_PER_DAY, timestamps[-1] + NS_PER_DAY, 20)))
+    for start in probes:
+        for end in probes[::3]:
+            lo, hi = index.bounds(int(start), int(end))
+            mask = (timestamps >= start) & (timestamps < end)
+            assert hi - lo == mask.sum()
+            if mask.any():
+                assert (lo, hi) == (mask.argmax(), len(mask) - mask[::-1].argmax())
+
+def test_bounds_accept_dates_and_open_ends(index, columns):
+    timestamps = columns['timestamp']
+    assert index.bounds() == (0, len(timestamps))
+    lo, hi = index.bounds('2024-02-01', pd.Timestamp('2024-03-01'))
+    assert lo == np.searchsorted(timestamps, pd.Timestamp('2024-02-01').value)
+    assert hi == np.searchsorted(timestamps, pd.Timestamp('2024-03-01').value)
+    assert index.bounds(start='2024-02-01')[1] == len(timestamps)
+
+def test_windows_are_views(index, columns):
+    start, end = index.trailing(30)
+    window = index.window(start, end)
+    for name in ['timestamp', 'price', 'volume']:
+        assert np.shares_memory(window[name], columns[name])
+    assert window['timestamp'][0] >= start and window['timestamp'][-1] < end
+
+    frame = index.frame(start, end)
+    assert frame['timestamp'].iloc[-1].value == columns['timestamp'][-1]
+    assert len(frame) == len(window['timestamp'])
+
+def test_end_is_exclusive_past_the_last_row(index, columns):
+    assert index.start == columns['timestamp'][0]
+    assert index.end == columns['timestamp'][-1] + 1
+    assert index.bounds(*index.trailing(None)) == (0, len(columns['timestamp']))
+
+@pytest.mark.parametrize('label', list(TIME_RANGE_DAYS))
+def test_trailing_ranges_respect_retention(index, label):
+    days = TIME_RANGE_DAYS[label]
+    floor = index.retention_start(30)
+    start, end = index.trailing(days, floor)
+    assert end == index.end
+    assert start >= floor
+    if days is not None and days <= 30:
+        assert start == index.end - days * NS_PER_DAY
+
+def test_retention_start(index):
+    assert index.retention_start(0) == index.retention_start(None) == index.start
+    assert index.retention_start(7) == index.end - 7 * NS_PER_DAY
+    # Longer than the history: everything is visible
+    assert index.retention_start(100_000) == index.start
+
+def test_empty_index():
+    index = TimeSeriesIndex({name: np.empty(0, dtype) for name, dtype in
+                             [('timestamp', np.int64), ('price', np.float64), ('volume', np.float64)]})
+    assert len(index) == 0 and index.retention_start(30) is None
+    assert index.bounds('2024-01-01', '2025-01-01') == (0, 0)
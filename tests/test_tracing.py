@@ -0,0 +1,131 @@
+"""Rerun tracing: span timing, the bounded run buffer and the Prometheus export"""
+import threading
+
+import pytest
+
+from kaspa_tracing import NULL_SPAN, QUANTILES, Tracer, load_tracing_settings
+
+def samples(text):
+    """{'metric{labels}': value} from Prometheus text, comments skipped"""
+    return {line.rsplit(' ', 1)[0]: float(line.rsplit(' ', 1)[1])
+            for line in text.splitlines() if line and not line.startswith('#')}
+
+def test_spans_accumulate_within_a_run():
+    tracer = Tracer()
+
+    @tracer.traced('figure')
+    def build():
+        return 'fig'
+
+    with tracer.run('overview'):
+        with tracer.span('fetch'):
+            pass
+        assert build() == 'fig' and build() == 'fig'
+        # A fragment inside the full run is counted by the outer run only
+        with tracer.run('fragment/chart'):
+            pass
+
+    (_, page, total, spans), = tracer.runs()
+    assert page == 'overview'
+    assert set(spans) == {'fetch', 'figure'}
+    assert sum(spans.values()) <= total
+
+def test_runs_without_a_page_and_disabled_tracing_record_nothing():
+    tracer = Tracer()
+    with tracer.run():
+        pass
+    with tracer.run():
+        tracer.set_page('pricing')
+    assert [page for _, page, _, _ in tracer.runs()] == ['pricing']
+
+    assert tracer.span('outside a run') is NULL_SPAN
+    disabled = Tracer(enabled=False)
+    assert disabled.run('overview') is NULL_SPAN
+    with disabled.run('overview'):
+        assert disabled.span('fetch') is NULL_SPAN
+    assert disabled.runs() == []
+
+def test_each_thread_traces_its_own_run():
+    tracer = Tracer()
+    ready = threading.Barrier(2)
+
+    def session(page):
+        with tracer.run(page):
+            ready.wait(5)
+            with tracer.span(f'{page}.step'):
+                pass
+
+    threads = [threading.Thread(target=session, args=(page,)) for page in ('a', 'b')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted((page, list(spans)) for _, page, _, spans in tracer.runs()) == [('a', ['a.step']),
+                                                                                   ('b', ['b.step'])]
+
+def test_ring_buffer_keeps_the_last_runs():
+    tracer = Tracer(buffer_size=3)
+    for i in range(5):
+        tracer.record('overview', float(i), {'fetch': i / 10})
+
+    assert [total for _, _, total, _ in tracer.runs()] == [2.0, 3.0, 4.0]
+    pages, spans = tracer.summary()
+    assert pages['overview']['count'] == 3 and pages['overview']['sum'] == pytest.approx(9.0)
+    assert pages['overview'][0.5] == pytest.approx(3.0)
+    assert spans['fetch']['count'] == 3
+
+def test_prometheus_counters_are_cumulative():
+    tracer = Tracer(buffer_size=2)
+    for total in (1.0, 2.0, 3.0):
+        tracer.record('overview', total, {'figure.overview': total / 2})
+
+    text = tracer.prometheus_text()
+    assert '# TYPE kaspa_page_render_seconds summary' in text
+    values = samples(text)
+    # Quantiles cover the buffer; _sum/_count everything since start
+    assert values['kaspa_page_render_seconds{page="overview",quantile="0.5"}'] == pytest.approx(2.5)
+    assert values['kaspa_page_render_seconds_count{page="overview"}'] == 3
+    assert values['kaspa_page_render_seconds_sum{page="overview"}'] == pytest.approx(6.0)
+    assert values['kaspa_span_seconds_count{span="figure.overview"}'] == 3
+
+    # Clearing the buffer drops the quantiles but never resets the counters
+    tracer.clear()
+    tracer.record('overview', 4.0, {})
+    values = samples(tracer.prometheus_text())
+    assert values['kaspa_page_render_seconds_count{page="overview"}'] == 4
+    assert values['kaspa_page_render_seconds_sum{page="overview"}'] == pytest.approx(10.0)
+    assert 'kaspa_span_seconds{span="figure.overview",quantile="0.5"}' not in values
+    assert values['kaspa_span_seconds_count{span="figure.overview"}'] == 3
+
+def test_prometheus_labels_are_escaped():
+    tracer = Tracer()
+    tracer.record('say "hi"\\\n', 0.5, {})
+    lines = [line for line in tracer.prometheus_text().splitlines() if line.startswith('kaspa_page_render_seconds{')]
+    assert len(lines) == len(QUANTILES)
+    assert lines[0].startswith('kaspa_page_render_seconds{page="say \\"hi\\"\\\\\\n",quantile="0.5"}')
+
+def test_textfile_export(tmp_path):
+    path = tmp_path / 'metrics' / 'kaspa.prom'
+    tracer = Tracer(textfile_path=str(path), textfile_interval=3600)
+    tracer.record('overview', 1.0, {})
+    assert samples(path.read_text())['kaspa_page_render_seconds_count{page="overview"}'] == 1
+
+    # Rewritten at most once per interval
+    tracer.record('overview', 1.0, {})
+    assert samples(path.read_text())['kaspa_page_render_seconds_count{page="overview"}'] == 1
+    tracer.write_textfile(str(path))
+    assert samples(path.read_text())['kaspa_page_render_seconds_count{page="overview"}'] == 2
+    assert [p.name for p in path.parent.iterdir()] == ['kaspa.prom']
+
+    # An unwritable target is ignored rather than breaking the render
+    blocker = tmp_path / 'file'
+    blocker.write_text('')
+    tracer.write_textfile(str(blocker / 'kaspa.prom'))
+
+def test_settings_environment_switch(monkeypatch):
+    monkeypatch.setenv('KASPA_TRACING', 'off')
+    settings = load_tracing_settings({'tracing': {'buffer_size': 10, 'textfile_path': 'data/kaspa.prom'}})
+    assert not settings['enabled'] and settings['buffer_size'] == 10
+    assert settings['textfile_path'].endswith('/data/kaspa.prom') and settings['textfile_path'].startswith('/')
+    monkeypatch.setenv('KASPA_TRACING', '1')
+    assert load_tracing_settings({'tracing': {'enabled': False}})['enabled']